@@ -1,6 +1,6 @@
 # File: ai_analysis/ai_performance_tracker.py
 
-from typing import Dict, Any
+from typing import Dict, Any, List
 from datetime import datetime, timedelta
 
 class AIPerformanceTracker:
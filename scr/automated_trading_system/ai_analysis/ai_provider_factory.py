@@ -2,10 +2,12 @@
 
 from typing import Dict, Any
 from abc import ABC, abstractmethod
+import time
 from langchain.llms import AzureOpenAI
 from langchain.chat_models import ChatAnthropic
 from langchain.prompts import PromptTemplate
 from langchain.chains import LLMChain
+from .response_cache import ResponseCache
 
 class AIProvider(ABC):
     @abstractmethod
@@ -117,6 +119,23 @@ class ClaudeProvider(AIProvider):
             'stop_loss': float(parsed_response.get('stop loss', 0))
         }
 
+class CachedAIProvider(AIProvider):
+    # Serves repeated prompts from the response cache instead of calling the LLM again
+    def __init__(self, provider_name: str, provider: AIProvider, response_cache: ResponseCache):
+        self.provider_name = provider_name
+        self.provider = provider
+        self.response_cache = response_cache
+
+    async def generate_recommendation(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        key = self.response_cache.key(self.provider_name, data)
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            return cached
+        start = time.perf_counter()
+        recommendation = await self.provider.generate_recommendation(data)
+        self.response_cache.set(key, recommendation, time.perf_counter() - start)
+        return recommendation
+
 class AIProviderFactory:
     @staticmethod
     def create(provider_name: str, config: Dict[str, Any]) -> AIProvider:
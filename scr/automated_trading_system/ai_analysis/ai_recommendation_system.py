@@ -1,25 +1,136 @@
 # File: ai_analysis/ai_recommendation_system.py
 
 from typing import Dict, Any, List
-from .ai_provider_factory import AIProviderFactory, AIProvider
+import asyncio
+import time
+from .ai_provider_factory import AIProviderFactory, AIProvider, CachedAIProvider
+from .response_cache import ResponseCache
 
 class AIRecommendationSystem:
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.ai_providers: Dict[str, AIProvider] = {}
+        self.request_mode = config.get('ai_request_mode', 'fanout')
+        self.provider_timeout = config.get('ai_provider_timeout', 30)
+        self.hedge_delay = config.get('ai_hedge_delay', 5)
+        self.provider_stats: Dict[str, Dict[str, Any]] = {}
+        self.hedge_stats = {'requests': 0, 'hedged': 0, 'hedge_wins': 0}
+        cache_config = config.get('ai_response_cache', {})
+        self.response_cache = ResponseCache(cache_config) if cache_config.get('enabled', False) else None
 
     async def initialize(self):
         for provider_config in self.config.get('ai_providers', []):
             provider = AIProviderFactory.create(provider_config['name'], provider_config)
+            if self.response_cache is not None:
+                provider = CachedAIProvider(provider_config['name'], provider, self.response_cache)
             self.ai_providers[provider_config['name']] = provider
 
     async def get_recommendations(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        recommendations = {}
-        for provider_name, provider in self.ai_providers.items():
-            recommendations[provider_name] = await provider.generate_recommendation(data)
-        return recommendations
+        outcome = await self.collect_recommendations(data)
+        return outcome['recommendations']
+
+    async def collect_recommendations(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        # Returns whatever arrived before the deadlines, plus the providers that timed out or failed
+        if self.request_mode == 'hedged':
+            return await self._hedged_recommendations(data)
+        elif self.request_mode == 'fanout':
+            return await self._fanout_recommendations(data)
+        else:
+            raise ValueError(f"Unsupported AI request mode: {self.request_mode}")
+
+    async def _fanout_recommendations(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        outcome = {'recommendations': {}, 'timed_out': [], 'failed': [], 'hedged': False}
+        names = list(self.ai_providers)
+        results = await asyncio.gather(*(self._request(name, data) for name in names), return_exceptions=True)
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                self._record_failure(outcome, name, result)
+            else:
+                outcome['recommendations'][name] = result
+        return outcome
+
+    async def _hedged_recommendations(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        # Ask the first provider; every hedge_delay without an answer, reissue to the next one.
+        # The first successful answer wins and the remaining requests are cancelled.
+        outcome = {'recommendations': {}, 'timed_out': [], 'failed': [], 'hedged': False}
+        backups = list(self.ai_providers)
+        if not backups:
+            return outcome
+        self.hedge_stats['requests'] += 1
+        primary = backups.pop(0)
+        pending = {asyncio.ensure_future(self._request(primary, data)): primary}
+
+        while pending:
+            done, _ = await asyncio.wait(pending, timeout=self.hedge_delay if backups else None,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = pending.pop(task)
+                if task.exception() is None:
+                    outcome['recommendations'][name] = task.result()
+                    if name != primary:
+                        self.hedge_stats['hedge_wins'] += 1
+                    for other in pending:
+                        other.cancel()
+                    await asyncio.gather(*pending, return_exceptions=True)
+                    return outcome
+                self._record_failure(outcome, name, task.exception())
+            if backups and (not done or not pending):
+                if not outcome['hedged']:
+                    self.hedge_stats['hedged'] += 1
+                outcome['hedged'] = True
+                backup = backups.pop(0)
+                pending[asyncio.ensure_future(self._request(backup, data))] = backup
+        return outcome
+
+    async def _request(self, provider_name: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        stats = self.provider_stats.setdefault(provider_name, {'requests': 0, 'succeeded': 0, 'timeouts': 0,
+                                                               'errors': 0, 'total_latency': 0.0, 'max_latency': 0.0})
+        stats['requests'] += 1
+        start = time.perf_counter()
+        try:
+            recommendation = await asyncio.wait_for(self.ai_providers[provider_name].generate_recommendation(data),
+                                                    timeout=self.provider_timeout)
+        except asyncio.TimeoutError:
+            stats['timeouts'] += 1
+            raise
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            stats['errors'] += 1
+            raise
+        latency = time.perf_counter() - start
+        stats['succeeded'] += 1
+        stats['total_latency'] += latency
+        stats['max_latency'] = max(stats['max_latency'], latency)
+        return recommendation
+
+    def _record_failure(self, outcome: Dict[str, Any], provider_name: str, error: BaseException):
+        if isinstance(error, asyncio.TimeoutError):
+            outcome['timed_out'].append(provider_name)
+        else:
+            outcome['failed'].append(provider_name)
+
+    def get_provider_stats(self) -> Dict[str, Any]:
+        stats = {}
+        for name, provider_stats in self.provider_stats.items():
+            succeeded = provider_stats['succeeded']
+            stats[name] = dict(provider_stats, avg_latency=provider_stats['total_latency'] / succeeded if succeeded else 0.0)
+        return {'providers': stats, 'hedging': dict(self.hedge_stats)}
+
+    def get_response_cache_stats(self) -> Dict[str, Any]:
+        return self.response_cache.get_stats() if self.response_cache is not None else {}
 
     def aggregate_recommendations(self, recommendations: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        if not recommendations:
+            return {
+                'action': 'HOLD',
+                'confidence': 0.0,
+                'target_price': 0,
+                'stop_loss': 0,
+                'reasoning': 'No AI provider responded in time',
+                'individual_recommendations': {}
+            }
+
         actions = [rec['action'] for rec in recommendations.values()]
         confidences = [rec['confidence'] for rec in recommendations.values()]
         
@@ -10,9 +10,10 @@ class DataPreparation:
         self.config = config
         self.scaler = MinMaxScaler()
 
-    def prepare_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    def prepare_data(self, data: Dict[str, Any], normalize: bool = True) -> Dict[str, Any]:
         df = pd.DataFrame(data['market_data'])
-        df = self.normalize_data(df)
+        if normalize:
+            df = self.normalize_data(df)
         df = self.engineer_features(df)
         
         prepared_data = {
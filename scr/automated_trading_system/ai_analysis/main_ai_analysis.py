@@ -1,10 +1,11 @@
 # File: ai_analysis/main_ai_analysis.py
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 import numpy as np
 from .data_preparation import DataPreparation
 from .ai_recommendation_system import AIRecommendationSystem
 from .ai_performance_tracker import AIPerformanceTracker
+from .prompt_compaction import PromptCompactor
 from infrastructure.logging_service import LoggingService
 
 class MainAIAnalysis:
@@ -17,6 +18,8 @@ class MainAIAnalysis:
         self.recommendation_system = recommendation_system
         self.performance_tracker = performance_tracker
         self.logging_service = logging_service
+        compaction_config = config.get('prompt_compaction', {})
+        self.prompt_compactor = PromptCompactor(compaction_config) if compaction_config.get('enabled', False) else None
 
     async def initialize(self):
         try:
@@ -28,18 +31,37 @@ class MainAIAnalysis:
 
     async def analyze(self, market_data: Dict[str, Any], news_data: List[Dict[str, Any]], analysis_results: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            prepared_data = self.data_preparation.prepare_data(market_data, news_data, analysis_results)
-            recommendations = await self.recommendation_system.get_recommendations(prepared_data)
+            # Compacted prompts summarize raw prices and returns; min-max scaled series would show 0-1
+            # values and put the lowest close at zero
+            prepared_data = self.data_preparation.prepare_data({
+                'market_data': market_data,
+                'technical_indicators': analysis_results.get('technical', {}),
+                'sentiment_score': analysis_results.get('sentiment', {}).get('overall_sentiment', 0),
+                'intermarket_data': analysis_results.get('intermarket', {})
+            }, normalize=self.prompt_compactor is None)
+            if self.prompt_compactor is not None:
+                prepared_data = self.prompt_compactor.compact(prepared_data)
+            outcome = await self.recommendation_system.collect_recommendations(prepared_data)
+            recommendations = outcome['recommendations']
+            if outcome['timed_out'] or outcome['failed']:
+                await self.logging_service.log_warning(
+                    f"AI providers without a recommendation: timed out {outcome['timed_out']}, failed {outcome['failed']}")
             aggregated_recommendation = self.recommendation_system.aggregate_recommendations(recommendations)
             
             return {
                 'recommendations': recommendations,
-                'aggregated_recommendation': aggregated_recommendation
+                'aggregated_recommendation': aggregated_recommendation,
+                'timed_out_providers': outcome['timed_out'],
+                'failed_providers': outcome['failed'],
+                'hedged': outcome['hedged']
             }
         except Exception as e:
             await self.logging_service.log_error(f"Error in MainAIAnalysis.analyze: {str(e)}")
             raise
 
+    def get_prompt_compaction_stats(self) -> Dict[str, Any]:
+        return self.prompt_compactor.get_stats() if self.prompt_compactor is not None else {}
+
     async def track_performance(self, analysis_results: Dict[str, Any], actual_outcome: Dict[str, Any]):
         try:
             for provider, recommendation in analysis_results['recommendations'].items():
@@ -64,7 +86,7 @@ class MainAIAnalysis:
             # 1. Analyze market breadth
             advancing_stocks = sum(1 for stock in market_overview['stocks'] if stock['price_change'] > 0)
             declining_stocks = sum(1 for stock in market_overview['stocks'] if stock['price_change'] < 0)
-            market_breadth = advancing_stocks / (advancing_stocks + declining_stocks)
+            market_breadth = advancing_stocks / (advancing_stocks + declining_stocks) if advancing_stocks + declining_stocks else 0.5
 
             # 2. Analyze sector performance
             sector_performance = self._analyze_sector_performance(market_overview['stocks'])
@@ -119,6 +141,8 @@ class MainAIAnalysis:
         return {sector: np.mean(performances) for sector, performances in sector_performance.items()}
 
     def _identify_market_trend(self, index_data: List[float]) -> str:
+        if not len(index_data):
+            return 'Neutral'
         short_term_ma = np.mean(index_data[-10:])
         long_term_ma = np.mean(index_data[-30:])
         
@@ -130,6 +154,8 @@ class MainAIAnalysis:
             return 'Neutral'
 
     def _analyze_volume_trend(self, volume_data: List[int]) -> str:
+        if len(volume_data) <= 5:
+            return 'Stable'
         recent_volume = np.mean(volume_data[-5:])
         historical_volume = np.mean(volume_data[:-5])
         
@@ -147,6 +173,8 @@ class MainAIAnalysis:
         return top_performers, bottom_performers
 
     def _analyze_market_sentiment(self, news_sentiment: List[float]) -> str:
+        if not len(news_sentiment):
+            return 'Neutral'
         avg_sentiment = np.mean(news_sentiment)
         if avg_sentiment > 0.2:
             return 'Positive'
@@ -169,10 +197,11 @@ class MainAIAnalysis:
                                  bottom_performers: List[str], market_sentiment: str, anomalies: List[str]) -> str:
         summary = f"The market is currently showing a {market_trend} trend with {volume_trend} volume. "
         summary += f"Market breadth is {'positive' if market_breadth > 0.5 else 'negative'} at {market_breadth:.2f}. "
-        best_sector = max(sector_performance, key=sector_performance.get)
-        worst_sector = min(sector_performance, key=sector_performance.get)
-        summary += f"The best performing sector is {best_sector} at {sector_performance[best_sector]:.2f}%, "
-        summary += f"while the worst is {worst_sector} at {sector_performance[worst_sector]:.2f}%. "
+        if sector_performance:
+            best_sector = max(sector_performance, key=sector_performance.get)
+            worst_sector = min(sector_performance, key=sector_performance.get)
+            summary += f"The best performing sector is {best_sector} at {sector_performance[best_sector]:.2f}%, "
+            summary += f"while the worst is {worst_sector} at {sector_performance[worst_sector]:.2f}%. "
         summary += f"Top performers include {', '.join(top_performers)}, "
         summary += f"while {', '.join(bottom_performers)} are underperforming. "
         summary += f"Overall market sentiment based on news is {market_sentiment}. "
@@ -0,0 +1,128 @@
+# File: ai_analysis/prompt_compaction.py
+
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+
+DEFAULT_PRIORITY = ['close', 'volume', 'returns', 'volatility', 'RSI', 'MACD', 'MACD_Signal', 'ATR', 'SMA_20', 'SMA_50',
+                    'EMA_20', 'BB_Upper', 'BB_Lower', 'MFI', 'high', 'low', 'open']
+DEFAULT_EXCLUDE = ['timestamp', 'time_series', 'symbol']
+COMPACTED_SECTIONS = ['market_data', 'technical_indicators']
+
+def estimate_tokens(text: str) -> int:
+    # Rough provider-independent estimate, about four characters per token
+    return (len(text) + 3) // 4
+
+def format_number(value: float) -> str:
+    return f"{value:.4g}"
+
+class PromptCompactor:
+    # Replaces full series in the prompt inputs with fixed-size summaries that fit a token budget
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.token_budget = config.get('token_budget', 600)
+        self.slope_window = config.get('slope_window', 20)
+        self.quantiles = config.get('quantiles', [0.1, 0.5, 0.9])
+        self.priority = config.get('priority', DEFAULT_PRIORITY)
+        self.exclude = set(config.get('exclude', DEFAULT_EXCLUDE))
+        self.stats = {'prompts': 0, 'tokens': 0, 'over_budget': 0, 'dropped_series': 0}
+
+    def compact(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        series = {}
+        scalars = {}
+        for section in COMPACTED_SECTIONS:
+            self._collect(data.get(section) or {}, section, '', series, scalars)
+
+        market_summary, indicator_summary = self._fit_budget(series, scalars)
+        tokens = estimate_tokens(market_summary) + estimate_tokens(indicator_summary)
+
+        self.stats['prompts'] += 1
+        self.stats['tokens'] += tokens
+        if tokens > self.token_budget:
+            self.stats['over_budget'] += 1
+        return dict(data, market_data=market_summary, technical_indicators=indicator_summary)
+
+    def _collect(self, values: Dict[str, Any], section: str, prefix: str,
+                 series: Dict[Tuple[str, str], np.ndarray], scalars: Dict[Tuple[str, str], Any]):
+        for name, value in values.items():
+            if name in self.exclude:
+                continue
+            key = f"{prefix}{name}"
+            if isinstance(value, dict):
+                self._collect(value, section, f"{key}.", series, scalars)
+            elif isinstance(value, str) or (isinstance(value, (int, float, np.number)) and not isinstance(value, bool)):
+                scalars[(section, key)] = value
+            else:
+                numeric = self._as_numeric(value)
+                if numeric is not None and len(numeric):
+                    series[(section, key)] = numeric
+
+    def _as_numeric(self, value: Any) -> Optional[np.ndarray]:
+        try:
+            array = np.asarray(value, dtype=np.float64)
+        except (TypeError, ValueError):
+            return None
+        if array.ndim != 1:
+            return None
+        # Drops the warm-up NaNs of indicators and any inf from a division by a zero price
+        return array[np.isfinite(array)]
+
+    def summarize_series(self, values: np.ndarray, detail: int) -> str:
+        parts = [f"last={format_number(values[-1])}"]
+        if detail >= 1 and len(values) > 1:
+            recent = values[-self.slope_window:]
+            slope = np.polyfit(np.arange(len(recent)), recent, 1)[0]
+            scale = np.mean(np.abs(recent)) or 1.0
+            parts.append(f"slope={slope / scale * 100:+.3f}%/bar")
+        if detail >= 2:
+            for q, value in zip(self.quantiles, np.quantile(values, self.quantiles)):
+                parts.append(f"q{int(q * 100)}={format_number(value)}")
+        return ' '.join(parts)
+
+    def detect_regime(self, close: np.ndarray) -> str:
+        if len(close) < 3:
+            return 'unknown'
+        recent = close[-self.slope_window:]
+        returns = np.diff(close) / close[:-1]
+        recent_returns = returns[-self.slope_window:]
+        move = recent[-1] / recent[0] - 1
+        noise = np.std(recent_returns) * np.sqrt(len(recent_returns))
+        if np.std(returns) > 0 and np.std(recent_returns) > 1.5 * np.std(returns):
+            return 'volatile'
+        if noise > 0 and abs(move) > noise:
+            return 'uptrend' if move > 0 else 'downtrend'
+        return 'range-bound'
+
+    def _ordered(self, keys: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        rank = {name: index for index, name in enumerate(self.priority)}
+        return sorted(keys, key=lambda key: (rank.get(key[1].split('.')[-1], len(rank)), key))
+
+    def _render(self, series: Dict[Tuple[str, str], np.ndarray], scalars: Dict[Tuple[str, str], Any],
+                keys: List[Tuple[str, str]], detail: int) -> Tuple[str, str]:
+        lines = {section: [] for section in COMPACTED_SECTIONS}
+        close = series.get(('market_data', 'close'))
+        if close is not None:
+            lines['market_data'].append(f"bars={len(close)} regime={self.detect_regime(close)}")
+        for section, name in keys:
+            lines[section].append(f"{name}: {self.summarize_series(series[(section, name)], detail)}")
+        for (section, name), value in scalars.items():
+            lines[section].append(f"{name}: {value if isinstance(value, str) else format_number(value)}")
+        return '\n'.join(lines['market_data']), '\n'.join(lines['technical_indicators'])
+
+    def _fit_budget(self, series: Dict[Tuple[str, str], np.ndarray], scalars: Dict[Tuple[str, str], Any]) -> Tuple[str, str]:
+        # Lower the detail level first, then drop the lowest-priority series until the summary fits
+        keys = self._ordered(list(series))
+        for detail in (2, 1, 0):
+            market_summary, indicator_summary = self._render(series, scalars, keys, detail)
+            if estimate_tokens(market_summary) + estimate_tokens(indicator_summary) <= self.token_budget:
+                return market_summary, indicator_summary
+        while keys:
+            keys = keys[:-1]
+            self.stats['dropped_series'] += 1
+            market_summary, indicator_summary = self._render(series, scalars, keys, 0)
+            if estimate_tokens(market_summary) + estimate_tokens(indicator_summary) <= self.token_budget:
+                break
+        return market_summary, indicator_summary
+
+    def get_stats(self) -> Dict[str, Any]:
+        prompts = self.stats['prompts']
+        return dict(self.stats, token_budget=self.token_budget, avg_tokens=self.stats['tokens'] / prompts if prompts else 0.0)
@@ -0,0 +1,167 @@
+# File: ai_analysis/response_cache.py
+
+from typing import Dict, Any, Optional
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+import hashlib
+import json
+import math
+import os
+import time
+import numpy as np
+
+PROMPT_INPUTS = ['market_data', 'technical_indicators', 'sentiment_score', 'intermarket_data']
+
+def normalize_value(value: Any, precision: int) -> Any:
+    # Rounds to significant digits so inputs that only moved in the noise share a key
+    if isinstance(value, dict):
+        return {str(key): normalize_value(item, precision) for key, item in sorted(value.items(), key=lambda item: str(item[0]))}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [normalize_value(item, precision) for item in value]
+    if hasattr(value, 'tolist'):
+        return normalize_value(value.tolist(), precision)
+    if isinstance(value, bool) or value is None or isinstance(value, (int, str)):
+        return value
+    if isinstance(value, float):
+        if math.isnan(value) or math.isinf(value):
+            return None
+        return float(f"{value:.{precision}g}")
+    return str(value)
+
+def prompt_key(provider_name: str, data: Dict[str, Any], precision: int = 6) -> str:
+    inputs = {name: normalize_value(data.get(name), precision) for name in PROMPT_INPUTS}
+    payload = json.dumps({'provider': provider_name, 'inputs': inputs}, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class ResponseCacheBackend(ABC):
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, entry: Dict[str, Any]):
+        pass
+
+    @abstractmethod
+    def delete(self, key: str):
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+class MemoryResponseCache(ResponseCacheBackend):
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries: OrderedDict = OrderedDict()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: Dict[str, Any]):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def delete(self, key: str):
+        self.entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+class DiskResponseCache(ResponseCacheBackend):
+    # One JSON file per key; the LRU order is kept in memory and rebuilt from file mtimes on start
+    def __init__(self, directory: str, max_entries: int):
+        self.directory = directory
+        self.max_entries = max_entries
+        os.makedirs(directory, exist_ok=True)
+        files = [name for name in os.listdir(directory) if name.endswith('.json')]
+        files.sort(key=lambda name: os.path.getmtime(os.path.join(directory, name)))
+        self.index: OrderedDict = OrderedDict((name[:-len('.json')], None) for name in files)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if key not in self.index:
+            return None
+        try:
+            with open(self._path(key), 'r') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.delete(key)
+            return None
+        self.index.move_to_end(key)
+        os.utime(self._path(key))
+        return entry
+
+    def set(self, key: str, entry: Dict[str, Any]):
+        path = self._path(key)
+        with open(f"{path}.tmp", 'w') as f:
+            json.dump(entry, f)
+        os.replace(f"{path}.tmp", path)
+        self.index[key] = None
+        self.index.move_to_end(key)
+        while len(self.index) > self.max_entries:
+            oldest, _ = self.index.popitem(last=False)
+            self._remove_file(oldest)
+
+    def delete(self, key: str):
+        self.index.pop(key, None)
+        self._remove_file(key)
+
+    def _remove_file(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+class ResponseCache:
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.ttl = config.get('ttl', 300)
+        self.precision = config.get('precision', 6)
+        self.backend = self._create_backend(config)
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'saved_latency': 0.0}
+
+    def _create_backend(self, config: Dict[str, Any]) -> ResponseCacheBackend:
+        backend_type = config.get('backend', 'memory')
+        max_entries = config.get('max_entries', 1000)
+        if backend_type == 'memory':
+            return MemoryResponseCache(max_entries)
+        elif backend_type == 'disk':
+            return DiskResponseCache(config.get('directory', '.cache/llm_responses'), max_entries)
+        else:
+            raise ValueError(f"Unsupported response cache backend: {backend_type}")
+
+    def key(self, provider_name: str, data: Dict[str, Any]) -> str:
+        return prompt_key(provider_name, data, self.precision)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.backend.get(key)
+        if entry is not None and time.time() - entry['created'] > self.ttl:
+            self.backend.delete(key)
+            self.stats['expired'] += 1
+            entry = None
+        if entry is None:
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        # A hit saves the latency the original call took
+        self.stats['saved_latency'] += entry['latency']
+        return entry['response']
+
+    def set(self, key: str, response: Dict[str, Any], latency: float):
+        self.backend.set(key, {'response': response, 'latency': latency, 'created': time.time()})
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats['hits'] + self.stats['misses']
+        return dict(self.stats, entries=len(self.backend), ttl=self.ttl,
+                    hit_rate=self.stats['hits'] / lookups if lookups else 0.0)
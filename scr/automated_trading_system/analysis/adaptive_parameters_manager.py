@@ -1,12 +1,14 @@
 # File: analysis/adaptive_parameters_manager.py
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 import numpy as np
 from scipy.stats import linregress
+from .indicator_cache import IndicatorCache, indicator_scope
 
 class AdaptiveParametersManager:
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], indicator_cache: IndicatorCache = None):
         self.config = config
+        self.indicator_cache = indicator_cache
         self.default_parameters = {
             'rsi_period': 14,
             'macd_fast': 12,
@@ -17,10 +19,11 @@ class AdaptiveParametersManager:
         }
         self.current_parameters = self.default_parameters.copy()
 
-    async def adjust_parameters(self, market_data: Dict[str, Any], performance_data: Dict[str, Any]) -> Dict[str, Any]:
-        volatility = self._calculate_volatility(market_data['close'])
+    async def adjust_parameters(self, market_data: Dict[str, Any], performance_data: Dict[str, Any] = None) -> Dict[str, Any]:
+        scope = indicator_scope(self.indicator_cache, {'market_data': market_data})
+        volatility = scope.get('volatility', {}, lambda: self._calculate_volatility(market_data['close']))
         trend_strength = self._calculate_trend_strength(market_data['close'])
-        recent_performance = performance_data.get('recent_return', 0)
+        recent_performance = (performance_data or {}).get('recent_return', 0)
 
         self.current_parameters['rsi_period'] = self._adjust_rsi_period(volatility)
         self.current_parameters['macd_fast'], self.current_parameters['macd_slow'] = self._adjust_macd_parameters(trend_strength)
@@ -0,0 +1,106 @@
+# File: analysis/cross_sectional_analysis.py
+
+from typing import Dict, Any, List, Tuple
+import time
+import numpy as np
+from .indicator_cache import IndicatorCache, indicator_scope
+
+BATCH_COLUMNS = ['high', 'low', 'close', 'volume']
+
+class CrossSectionalAnalysis:
+    # Computes per-symbol features that are plain vectorized math for the whole watchlist at once.
+    # Symbols are stacked into (symbols x time) arrays; only symbols sharing an identical timestamp
+    # axis are batched, so every row matches what the per-symbol path would have computed.
+    def __init__(self, config: Dict[str, Any], indicator_cache: IndicatorCache = None):
+        self.config = config
+        self.indicator_cache = indicator_cache
+        self.anomaly_threshold = config.get('anomaly_z_threshold', 3)
+        self.stats = {'batches': 0, 'symbols': 0, 'excluded': 0, 'duration': 0.0}
+
+    def stack(self, market_data_by_symbol: Dict[str, Dict[str, Any]]) -> Tuple[List[str], Dict[str, np.ndarray], List[str]]:
+        candidates = {symbol: market_data for symbol, market_data in market_data_by_symbol.items()
+                      if market_data.get('timestamp') is not None and len(market_data.get('close', [])) > 2}
+        if not candidates:
+            return [], {}, list(market_data_by_symbol)
+
+        # The reference axis is the most common one, so a few lagging symbols don't shrink the batch
+        axes = {symbol: np.asarray(market_data['timestamp']) for symbol, market_data in candidates.items()}
+        keys = {symbol: (len(axis), axis[-1]) for symbol, axis in axes.items()}
+        counts: Dict[Tuple, int] = {}
+        for key in keys.values():
+            counts[key] = counts.get(key, 0) + 1
+        reference_key = max(counts, key=counts.get)
+        reference = next(axes[symbol] for symbol, key in keys.items() if key == reference_key)
+
+        symbols = [symbol for symbol, axis in axes.items()
+                   if keys[symbol] == reference_key and np.array_equal(axis, reference)]
+        excluded = [symbol for symbol in market_data_by_symbol if symbol not in symbols]
+        arrays = {column: np.vstack([np.asarray(candidates[symbol][column], dtype=np.float64) for symbol in symbols])
+                  for column in BATCH_COLUMNS}
+        return symbols, arrays, excluded
+
+    def compute(self, arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        close, volume = arrays['close'], arrays['volume']
+        returns = np.diff(close, axis=1) / close[:, :-1]
+
+        mean = np.mean(returns, axis=1, keepdims=True)
+        std = np.std(returns, axis=1, keepdims=True)
+        z_scores = (returns - mean) / std
+
+        # Same operation order as the per-symbol VolumeAnalysis so the rows are bit-identical
+        typical_price = (arrays['high'] + arrays['low'] + close) / 3
+        vwap = np.cumsum(typical_price * volume, axis=1) / np.cumsum(volume, axis=1)
+
+        signed_volume = np.empty_like(volume)
+        signed_volume[:, 0] = volume[:, 0]
+        signed_volume[:, 1:] = np.sign(np.diff(close, axis=1)) * volume[:, 1:]
+        obv = np.cumsum(signed_volume, axis=1)
+
+        vpt = np.full_like(close, np.nan)
+        vpt[:, 1:] = np.cumsum(volume[:, 1:] * returns, axis=1)
+
+        return {
+            'returns': returns,
+            'volatility': std[:, 0],
+            'anomalies': np.abs(z_scores) > self.anomaly_threshold,
+            'VWAP': vwap,
+            'OBV': obv,
+            'VPT': vpt
+        }
+
+    def split(self, symbols: List[str], features: Dict[str, np.ndarray]) -> Dict[str, Dict[str, Any]]:
+        results = {}
+        for row, symbol in enumerate(symbols):
+            results[symbol] = {
+                'returns': features['returns'][row],
+                'volatility': float(features['volatility'][row]),
+                'anomalies': np.flatnonzero(features['anomalies'][row]).tolist(),
+                'VWAP': features['VWAP'][row],
+                'OBV': features['OBV'][row],
+                'VPT': features['VPT'][row]
+            }
+        return results
+
+    def analyze_batch(self, market_data_by_symbol: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        start = time.perf_counter()
+        symbols, arrays, excluded = self.stack(market_data_by_symbol)
+        results = self.split(symbols, self.compute(arrays)) if symbols else {}
+
+        if self.indicator_cache is not None:
+            # Seed the shared cache so per-symbol analyzers pick the batch rows up as hits
+            for symbol, features in results.items():
+                scope = indicator_scope(self.indicator_cache, {'market_data': market_data_by_symbol[symbol], 'symbol': symbol})
+                scope.get('volatility', {}, lambda: features['volatility'])
+                scope.get('anomalies', {'threshold': self.anomaly_threshold}, lambda: features['anomalies'])
+                scope.get('OBV', {}, lambda: features['OBV'])
+                scope.get('VWAP', {}, lambda: features['VWAP'])
+                scope.get('VPT', {}, lambda: features['VPT'])
+
+        self.stats['batches'] += 1
+        self.stats['symbols'] += len(symbols)
+        self.stats['excluded'] += len(excluded)
+        self.stats['duration'] += time.perf_counter() - start
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats)
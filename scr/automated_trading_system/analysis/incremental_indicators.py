@@ -0,0 +1,551 @@
+# File: analysis/incremental_indicators.py
+
+import math
+from collections import deque
+from typing import Dict, Any, Optional
+import numpy as np
+
+NAN = float('nan')
+
+def _is_zero(value: float) -> bool:
+    # Same tolerance talib uses when guarding its divisions
+    return -1e-8 < value < 1e-8
+
+class SeriesBuffer:
+    # Ring buffer over the last `capacity` values. Every value is written twice, at i and i + capacity,
+    # so the window is always one contiguous slice and view() never copies.
+    def __init__(self, capacity: int = 256):
+        self.capacity = capacity
+        self._data = np.empty(2 * capacity, dtype=np.float64)
+        self._start = 0
+        self._size = 0
+        self._evicted = None
+
+    def append(self, value: float):
+        if self._size == self.capacity:
+            self._evicted = self._data[self._start]
+            self._start = (self._start + 1) % self.capacity
+        else:
+            self._evicted = None
+            self._size += 1
+        end = (self._start + self._size - 1) % self.capacity
+        self._data[end] = self._data[end + self.capacity] = value
+
+    def pop(self):
+        # Undoes the last append, restoring the value it pushed out of a full window
+        if self._evicted is None:
+            self._size -= 1
+        else:
+            self._start = (self._start - 1) % self.capacity
+            self._data[self._start] = self._data[self._start + self.capacity] = self._evicted
+            self._evicted = None
+
+    def view(self) -> np.ndarray:
+        return self._data[self._start:self._start + self._size]
+
+    def __len__(self) -> int:
+        return self._size
+
+class IncrementalIndicator:
+    # save() captures the scalar state before a bar and restore() rewinds to it, so a still-forming
+    # bar can be revised without copying the indicator. The windows below undo their last push
+    # themselves, which is all a revision ever needs.
+    def save(self) -> Dict[str, Any]:
+        return {name: value.save() if isinstance(value, IncrementalIndicator) else value
+                for name, value in vars(self).items()}
+
+    def restore(self, state: Dict[str, Any]):
+        for name, value in state.items():
+            current = getattr(self, name)
+            if isinstance(current, IncrementalIndicator):
+                current.restore(value)
+            else:
+                setattr(self, name, value)
+
+class RollingWindow(IncrementalIndicator):
+    def __init__(self, period: int):
+        self.period = period
+        self.values = deque(maxlen=period)
+        self.total = 0.0
+        self.count = 0
+        self.evicted = None
+
+    def push(self, value: float):
+        self.evicted = self.values[0] if len(self.values) == self.period else None
+        if self.evicted is not None:
+            self.total -= self.evicted
+        self.values.append(value)
+        self.total += value
+        self.count += 1
+
+    def save(self) -> tuple:
+        return self.count, self.total
+
+    def restore(self, state: tuple):
+        count, total = state
+        if self.count > count:
+            self.values.pop()
+            if self.evicted is not None:
+                self.values.appendleft(self.evicted)
+        self.count, self.total = count, total
+
+    def is_full(self) -> bool:
+        return len(self.values) == self.period
+
+class RollingExtreme(IncrementalIndicator):
+    # Monotonic deque giving the rolling max (or min) in amortised O(1)
+    def __init__(self, period: int, is_max: bool):
+        self.period = period
+        self.is_max = is_max
+        self.index = -1
+        self.candidates = deque()
+        self.dominated = []
+        self.expired = None
+
+    def push(self, value: float) -> float:
+        self.index += 1
+        self.dominated = []
+        while self.candidates and (self.candidates[-1][1] <= value if self.is_max else self.candidates[-1][1] >= value):
+            self.dominated.append(self.candidates.pop())
+        self.candidates.append((self.index, value))
+        self.expired = self.candidates.popleft() if self.candidates[0][0] <= self.index - self.period else None
+        return self.candidates[0][1]
+
+    def save(self) -> int:
+        return self.index
+
+    def restore(self, index: int):
+        if self.index > index:
+            if self.expired is not None:
+                self.candidates.appendleft(self.expired)
+            self.candidates.pop()
+            self.candidates.extend(reversed(self.dominated))
+            self.index = index
+
+    def is_full(self) -> bool:
+        return self.index >= self.period - 1
+
+class SMA(IncrementalIndicator):
+    def __init__(self, period: int):
+        self.window = RollingWindow(period)
+
+    def update(self, value: float) -> float:
+        self.window.push(value)
+        return self.window.total / self.window.period if self.window.is_full() else NAN
+
+class EMA(IncrementalIndicator):
+    # Seeded with the SMA of the first `period` values, as talib does
+    def __init__(self, period: int):
+        self.period = period
+        self.k = 2.0 / (period + 1)
+        self.seed_total = 0.0
+        self.count = 0
+        self.value = NAN
+
+    def update(self, value: float) -> float:
+        self.count += 1
+        if self.count < self.period:
+            self.seed_total += value
+            return NAN
+        if self.count == self.period:
+            self.value = (self.seed_total + value) / self.period
+        else:
+            self.value = (value - self.value) * self.k + self.value
+        return self.value
+
+class RSI(IncrementalIndicator):
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev_close = None
+        self.count = 0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+
+    def update(self, close: float) -> float:
+        if self.prev_close is None:
+            self.prev_close = close
+            return NAN
+        change = close - self.prev_close
+        self.prev_close = close
+        self.count += 1
+        if self.count <= self.period:
+            if change < 0:
+                self.avg_loss -= change
+            else:
+                self.avg_gain += change
+            if self.count < self.period:
+                return NAN
+            self.avg_gain /= self.period
+            self.avg_loss /= self.period
+        else:
+            self.avg_gain *= self.period - 1
+            self.avg_loss *= self.period - 1
+            if change < 0:
+                self.avg_loss -= change
+            else:
+                self.avg_gain += change
+            self.avg_gain /= self.period
+            self.avg_loss /= self.period
+        total = self.avg_gain + self.avg_loss
+        return 100.0 * (self.avg_gain / total) if not _is_zero(total) else 0.0
+
+class MACD(IncrementalIndicator):
+    def __init__(self, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9):
+        if slow_period < fast_period:
+            fast_period, slow_period = slow_period, fast_period
+        # talib starts the fast EMA late so both EMAs produce their first value on the same bar
+        self.fast_offset = slow_period - fast_period
+        self.fast = EMA(fast_period)
+        self.slow = EMA(slow_period)
+        self.signal = EMA(signal_period)
+        self.count = 0
+
+    def update(self, close: float) -> tuple:
+        self.count += 1
+        slow_value = self.slow.update(close)
+        fast_value = self.fast.update(close) if self.count > self.fast_offset else NAN
+        if math.isnan(slow_value):
+            return NAN, NAN, NAN
+        macd = fast_value - slow_value
+        signal = self.signal.update(macd)
+        if math.isnan(signal):
+            return NAN, NAN, NAN
+        return macd, signal, macd - signal
+
+class BollingerBands(IncrementalIndicator):
+    def __init__(self, period: int = 20, nb_dev_up: float = 2.0, nb_dev_down: float = 2.0):
+        self.window = RollingWindow(period)
+        self.squares = RollingWindow(period)
+        self.nb_dev_up = nb_dev_up
+        self.nb_dev_down = nb_dev_down
+
+    def update(self, close: float) -> tuple:
+        self.window.push(close)
+        self.squares.push(close * close)
+        if not self.window.is_full():
+            return NAN, NAN, NAN
+        period = self.window.period
+        middle = self.window.total / period
+        variance = self.squares.total / period - middle * middle
+        std_dev = math.sqrt(variance) if not _is_zero(variance) and variance > 0 else 0.0
+        return middle + self.nb_dev_up * std_dev, middle, middle - self.nb_dev_down * std_dev
+
+class Stochastic(IncrementalIndicator):
+    def __init__(self, fastk_period: int = 5, slowk_period: int = 3, slowd_period: int = 3):
+        self.highest = RollingExtreme(fastk_period, is_max=True)
+        self.lowest = RollingExtreme(fastk_period, is_max=False)
+        self.slow_k = SMA(slowk_period)
+        self.slow_d = SMA(slowd_period)
+
+    def update(self, high: float, low: float, close: float) -> tuple:
+        highest = self.highest.push(high)
+        lowest = self.lowest.push(low)
+        if not self.highest.is_full():
+            return NAN, NAN
+        diff = (highest - lowest) / 100.0
+        fast_k = (close - lowest) / diff if diff != 0 else 0.0
+        slow_k = self.slow_k.update(fast_k)
+        if math.isnan(slow_k):
+            return NAN, NAN
+        slow_d = self.slow_d.update(slow_k)
+        # talib only reports %K once %D is available
+        return (slow_k, slow_d) if not math.isnan(slow_d) else (NAN, NAN)
+
+class ATR(IncrementalIndicator):
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev_close = None
+        self.count = 0
+        self.value = 0.0
+
+    def update(self, high: float, low: float, close: float) -> float:
+        if self.prev_close is None:
+            self.prev_close = close
+            return NAN
+        true_range = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        self.count += 1
+        if self.count < self.period:
+            self.value += true_range
+            return NAN
+        if self.count == self.period:
+            self.value = (self.value + true_range) / self.period
+        else:
+            self.value = (self.value * (self.period - 1) + true_range) / self.period
+        return self.value
+
+class CCI(IncrementalIndicator):
+    # The mean deviation needs the whole window, so an update is O(period) rather than O(history)
+    def __init__(self, period: int = 14):
+        self.window = RollingWindow(period)
+
+    def update(self, high: float, low: float, close: float) -> float:
+        typical_price = (high + low + close) / 3
+        self.window.push(typical_price)
+        if not self.window.is_full():
+            return NAN
+        period = self.window.period
+        average = sum(self.window.values) / period
+        mean_deviation = sum(abs(value - average) for value in self.window.values) / period
+        deviation = typical_price - average
+        if deviation != 0.0 and mean_deviation != 0.0:
+            return deviation / (0.015 * mean_deviation)
+        return 0.0
+
+class ParabolicSAR(IncrementalIndicator):
+    def __init__(self, acceleration: float = 0.02, maximum: float = 0.2):
+        self.acceleration = min(acceleration, maximum)
+        self.maximum = maximum
+        self.first_bar = None
+        self.is_long = None
+        self.af = self.acceleration
+        self.ep = NAN
+        self.sar = NAN
+        self.new_high = NAN
+        self.new_low = NAN
+
+    def update(self, high: float, low: float) -> float:
+        if self.first_bar is None:
+            self.first_bar = (high, low)
+            return NAN
+        if self.is_long is None:
+            prev_high, prev_low = self.first_bar
+            diff_plus = high - prev_high
+            diff_minus = prev_low - low
+            self.is_long = not (diff_minus > 0 and diff_plus < diff_minus)
+            if self.is_long:
+                self.ep, self.sar = high, prev_low
+            else:
+                self.ep, self.sar = low, prev_high
+            self.new_high, self.new_low = high, low
+
+        prev_high, prev_low = self.new_high, self.new_low
+        self.new_high, self.new_low = high, low
+
+        if self.is_long:
+            if low <= self.sar:
+                self.is_long = False
+                self.sar = max(self.ep, prev_high, high)
+                output = self.sar
+                self.af = self.acceleration
+                self.ep = low
+                self.sar = max(self.sar + self.af * (self.ep - self.sar), prev_high, high)
+            else:
+                output = self.sar
+                if high > self.ep:
+                    self.ep = high
+                    self.af = min(self.af + self.acceleration, self.maximum)
+                self.sar = min(self.sar + self.af * (self.ep - self.sar), prev_low, low)
+        else:
+            if high >= self.sar:
+                self.is_long = True
+                self.sar = min(self.ep, prev_low, low)
+                output = self.sar
+                self.af = self.acceleration
+                self.ep = high
+                self.sar = min(self.sar + self.af * (self.ep - self.sar), prev_low, low)
+            else:
+                output = self.sar
+                if low < self.ep:
+                    self.ep = low
+                    self.af = min(self.af + self.acceleration, self.maximum)
+                self.sar = max(self.sar + self.af * (self.ep - self.sar), prev_high, high)
+        return output
+
+class MFI(IncrementalIndicator):
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev_typical_price = None
+        self.positive = RollingWindow(period)
+        self.negative = RollingWindow(period)
+
+    def update(self, high: float, low: float, close: float, volume: float) -> float:
+        typical_price = (high + low + close) / 3
+        if self.prev_typical_price is None:
+            self.prev_typical_price = typical_price
+            return NAN
+        money_flow = typical_price * volume
+        self.positive.push(money_flow if typical_price > self.prev_typical_price else 0.0)
+        self.negative.push(money_flow if typical_price < self.prev_typical_price else 0.0)
+        self.prev_typical_price = typical_price
+        if not self.positive.is_full():
+            return NAN
+        total = self.positive.total + self.negative.total
+        return 100.0 * (self.positive.total / total) if total >= 1.0 else 0.0
+
+class ADOSC(IncrementalIndicator):
+    # Chaikin A/D oscillator; both EMAs are seeded with the first A/D value, as talib does
+    def __init__(self, fast_period: int = 3, slow_period: int = 10):
+        self.fast_k = 2.0 / (fast_period + 1)
+        self.slow_k = 2.0 / (slow_period + 1)
+        self.lookback = max(fast_period, slow_period) - 1
+        self.ad = 0.0
+        self.fast_ema = NAN
+        self.slow_ema = NAN
+        self.count = 0
+
+    def update(self, high: float, low: float, close: float, volume: float) -> float:
+        spread = high - low
+        if spread > 0.0:
+            self.ad += (((close - low) - (high - close)) / spread) * volume
+        self.count += 1
+        if self.count == 1:
+            self.fast_ema = self.slow_ema = self.ad
+        else:
+            self.fast_ema = self.fast_k * self.ad + (1.0 - self.fast_k) * self.fast_ema
+            self.slow_ema = self.slow_k * self.ad + (1.0 - self.slow_k) * self.slow_ema
+        return self.fast_ema - self.slow_ema if self.count > self.lookback else NAN
+
+class Midpoint(IncrementalIndicator):
+    def __init__(self, period: int):
+        self.highest = RollingExtreme(period, is_max=True)
+        self.lowest = RollingExtreme(period, is_max=False)
+
+    def update(self, high: float, low: float) -> float:
+        highest = self.highest.push(high)
+        lowest = self.lowest.push(low)
+        return (highest + lowest) / 2 if self.highest.is_full() else NAN
+
+class Ichimoku(IncrementalIndicator):
+    def __init__(self, conversion_period: int = 9, base_period: int = 26, span_b_period: int = 52):
+        self.conversion = Midpoint(conversion_period)
+        self.base = Midpoint(base_period)
+        self.span_b = Midpoint(span_b_period)
+
+    def update(self, high: float, low: float) -> tuple:
+        conversion = self.conversion.update(high, low)
+        base = self.base.update(high, low)
+        return conversion, base, (conversion + base) / 2, self.span_b.update(high, low)
+
+class IndicatorSet:
+    # Per-symbol state: the indicator objects are small, the output buffers hold the analysis window
+    SERIES = ['SMA_10', 'SMA_20', 'SMA_50', 'EMA_10', 'EMA_20', 'EMA_50', 'RSI',
+              'MACD', 'MACD_Signal', 'MACD_Hist', 'BB_Upper', 'BB_Middle', 'BB_Lower',
+              'STOCH_K', 'STOCH_D', 'ATR', 'Ichimoku_Conversion', 'Ichimoku_Base',
+              'Ichimoku_SpanA', 'Ichimoku_SpanB', 'MFI', 'CMF', 'CCI', 'SAR']
+
+    def __init__(self, window: int):
+        self.window = window
+        self.indicators = {
+            'SMA_10': SMA(10), 'SMA_20': SMA(20), 'SMA_50': SMA(50),
+            'EMA_10': EMA(10), 'EMA_20': EMA(20), 'EMA_50': EMA(50),
+            'RSI': RSI(14), 'MACD': MACD(), 'BBANDS': BollingerBands(),
+            'STOCH': Stochastic(), 'ATR': ATR(14), 'ICHIMOKU': Ichimoku(),
+            'MFI': MFI(14), 'CMF': ADOSC(), 'CCI': CCI(14), 'SAR': ParabolicSAR(),
+        }
+        self.outputs = {name: SeriesBuffer(window) for name in self.SERIES}
+        # Fibonacci levels span the window's extremes, as on the TA-Lib path, not the all-time range
+        self.highs = SeriesBuffer(window)
+        self.lows = SeriesBuffer(window)
+        self.last_timestamp = None
+        self.last_bar = None
+        self.snapshot = None
+
+    def __len__(self) -> int:
+        return len(self.outputs['SMA_10'])
+
+    def push(self, timestamp: Any, open_: float, high: float, low: float, close: float, volume: float, keep_snapshot: bool = False):
+        # Keep the state as it was before the newest bar so a still-forming bar can be revised
+        self.snapshot = {name: indicator.save() for name, indicator in self.indicators.items()} if keep_snapshot else None
+        self._apply(high, low, close, volume)
+        self.last_timestamp = timestamp
+        self.last_bar = (open_, high, low, close, volume)
+
+    def can_revise(self) -> bool:
+        return self.snapshot is not None
+
+    def revise_last(self, open_: float, high: float, low: float, close: float, volume: float):
+        for name, state in self.snapshot.items():
+            self.indicators[name].restore(state)
+        for buffer in [*self.outputs.values(), self.highs, self.lows]:
+            buffer.pop()
+        self._apply(high, low, close, volume)
+        self.last_bar = (open_, high, low, close, volume)
+
+    def _apply(self, high: float, low: float, close: float, volume: float):
+        ind = self.indicators
+        values = {
+            'SMA_10': ind['SMA_10'].update(close), 'SMA_20': ind['SMA_20'].update(close),
+            'SMA_50': ind['SMA_50'].update(close), 'EMA_10': ind['EMA_10'].update(close),
+            'EMA_20': ind['EMA_20'].update(close), 'EMA_50': ind['EMA_50'].update(close),
+            'RSI': ind['RSI'].update(close),
+            'ATR': ind['ATR'].update(high, low, close),
+            'MFI': ind['MFI'].update(high, low, close, volume),
+            'CMF': ind['CMF'].update(high, low, close, volume),
+            'CCI': ind['CCI'].update(high, low, close),
+            'SAR': ind['SAR'].update(high, low),
+        }
+        values['MACD'], values['MACD_Signal'], values['MACD_Hist'] = ind['MACD'].update(close)
+        values['BB_Upper'], values['BB_Middle'], values['BB_Lower'] = ind['BBANDS'].update(close)
+        values['STOCH_K'], values['STOCH_D'] = ind['STOCH'].update(high, low, close)
+        (values['Ichimoku_Conversion'], values['Ichimoku_Base'],
+         values['Ichimoku_SpanA'], values['Ichimoku_SpanB']) = ind['ICHIMOKU'].update(high, low)
+        for name, value in values.items():
+            self.outputs[name].append(value)
+        self.highs.append(high)
+        self.lows.append(low)
+
+    def results(self, length: int) -> Dict[str, Any]:
+        # Copies, since the next bar overwrites the oldest slot of each ring buffer
+        results = {name: buffer.view()[-length:].copy() for name, buffer in self.outputs.items()}
+        high = self.highs.view()[-length:].max()
+        low = self.lows.view()[-length:].min()
+        diff = high - low
+        results['Fib_23.6'] = high - 0.236 * diff
+        results['Fib_38.2'] = high - 0.382 * diff
+        results['Fib_50.0'] = high - 0.5 * diff
+        results['Fib_61.8'] = high - 0.618 * diff
+        return results
+
+class IncrementalIndicatorEngine:
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        # Market data comes from the bar store, so its capacity is the longest window an update sees
+        self.window = config.get('bar_store_capacity', 1000)
+        self.states: Dict[str, IndicatorSet] = {}
+        self.stats = {'bars_applied': 0, 'bars_revised': 0, 'rebuilds': 0}
+
+    def update(self, symbol: str, market_data: Dict[str, Any]) -> Dict[str, Any]:
+        closes = market_data['close']
+        timestamps = market_data.get('timestamp')
+        if timestamps is None:
+            timestamps = range(len(closes))
+        state = self.states.get(symbol)
+        # A window longer than the buffers can't be served from them, so it rebuilds into larger ones
+        resumable = state is not None and len(closes) <= state.window
+        start = self._find_resume_index(state, market_data, timestamps) if resumable else None
+        if start is None:
+            state = IndicatorSet(max(self.window, len(closes)))
+            self.states[symbol] = state
+            start = 0
+            self.stats['rebuilds'] += 1
+
+        opens, highs, lows, volumes = market_data['open'], market_data['high'], market_data['low'], market_data['volume']
+        last = len(closes) - 1
+        for i in range(start, len(closes)):
+            state.push(timestamps[i], float(opens[i]), float(highs[i]), float(lows[i]), float(closes[i]),
+                       float(volumes[i]), keep_snapshot=(i == last))
+        self.stats['bars_applied'] += len(closes) - start
+        return state.results(len(closes))
+
+    def _find_resume_index(self, state: IndicatorSet, market_data: Dict[str, Any], timestamps: Any) -> Optional[int]:
+        # Walk back from the newest bar to the last one this state has seen, so a normal cycle only touches the tail
+        for i in range(len(timestamps) - 1, -1, -1):
+            if timestamps[i] == state.last_timestamp:
+                bar = tuple(float(market_data[column][i]) for column in ('open', 'high', 'low', 'close', 'volume'))
+                if bar != state.last_bar:
+                    if not state.can_revise():
+                        return None
+                    state.revise_last(*bar)
+                    self.stats['bars_revised'] += 1
+                return i + 1
+        return None
+
+    def reset(self, symbol: str = None):
+        if symbol is None:
+            self.states.clear()
+        else:
+            self.states.pop(symbol, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, 'symbols': len(self.states)}
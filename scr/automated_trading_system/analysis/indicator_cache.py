@@ -0,0 +1,78 @@
+# File: analysis/indicator_cache.py
+
+from typing import Dict, Any, Callable, Tuple
+import threading
+
+def data_version(market_data: Dict[str, Any]) -> Tuple:
+    # Cheap fingerprint of a bar series: a new or revised bar changes at least one of these
+    closes = market_data['close']
+    timestamps = market_data.get('timestamp')
+    last_timestamp = timestamps[-1] if timestamps is not None and len(timestamps) else None
+    return (len(closes), last_timestamp, float(closes[-1]) if len(closes) else None)
+
+class IndicatorCache:
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.entries: Dict[Tuple, Any] = {}
+        self.hits = 0
+        self.misses = 0
+        self.cycle = 0
+        # Thread-mode analysis stages share the cache; compute runs outside the lock so
+        # workers don't serialize on each other's indicators
+        self.lock = threading.Lock()
+
+    def get_or_compute(self, key: Tuple, compute: Callable[[], Any]) -> Any:
+        with self.lock:
+            if key in self.entries:
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+        value = compute()
+        with self.lock:
+            # Two workers racing on the same key both compute; the first stored value wins
+            return self.entries.setdefault(key, value)
+
+    def merge(self, entries: Dict[Tuple, Any]):
+        # Entries computed elsewhere (a process-pool worker) become hits for later lookups this cycle
+        with self.lock:
+            for key, value in entries.items():
+                self.entries.setdefault(key, value)
+
+    def begin_cycle(self):
+        with self.lock:
+            self.entries.clear()
+            self.cycle += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            lookups = self.hits + self.misses
+            entries = len(self.entries)
+        return {
+            'cycle': self.cycle,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': entries
+        }
+
+class IndicatorScope:
+    # Binds symbol, timeframe and data version so analyzers only name the indicator and its parameters
+    def __init__(self, cache: IndicatorCache, symbol: str, timeframe: str, version: Tuple):
+        self.cache = cache
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.version = version
+
+    def get(self, indicator: str, params: Dict[str, Any], compute: Callable[[], Any]) -> Any:
+        if self.cache is None:
+            return compute()
+        key = (self.symbol, indicator, tuple(sorted(params.items())), self.timeframe, self.version)
+        return self.cache.get_or_compute(key, compute)
+
+def indicator_scope(cache: IndicatorCache, data: Dict[str, Any]) -> IndicatorScope:
+    market_data = data['market_data']
+    symbol = data.get('symbol', market_data.get('symbol'))
+    if cache is None or symbol is None:
+        # Without a symbol there is no safe key, so the scope computes straight through
+        return IndicatorScope(None, symbol, None, None)
+    return IndicatorScope(cache, symbol, data.get('timeframe', 'base'), data_version(market_data))
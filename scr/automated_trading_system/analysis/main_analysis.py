@@ -1,4 +1,8 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
+import copy
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+import asyncio
+import time
 import numpy as np
 from .technical_analysis import TechnicalAnalysis
 from .sentiment_analysis import SentimentAnalysis
@@ -8,22 +12,57 @@ from .volume_analysis import VolumeAnalysis
 from .trend_analysis import TrendAnalysis
 from .multi_timeframe_analysis import MultiTimeframeAnalysis
 from .adaptive_parameters_manager import AdaptiveParametersManager
+from .indicator_cache import IndicatorCache, indicator_scope
+from .cross_sectional_analysis import CrossSectionalAnalysis
 from data.vector_database_enhancement import VectorDatabaseEnhancement
 from infrastructure.logging_service import LoggingService
 
+CPU_BOUND_ANALYZERS = ['technical', 'trend', 'multi_timeframe', 'patterns']
+
+def _last(values: Any, default: Any = None) -> Any:
+    # Indicator outputs are pandas Series on the TA-Lib path and arrays on the incremental one
+    values = np.asarray(values if values is not None else [])
+    return values[-1].item() if len(values) else default
+
+def _run_analyzer(analyzer: Any, data: Any) -> Dict[str, Any]:
+    # Entry point for pool workers, which have no running event loop of their own
+    return asyncio.run(analyzer.analyze(data))
+
+def _with_cache(analyzer: Any, cache: IndicatorCache) -> Any:
+    # Shallow copy of the analyzer (and the technical analyzer nested in multi-timeframe) using `cache`
+    clone = copy.copy(analyzer)
+    if hasattr(clone, 'indicator_cache'):
+        clone.indicator_cache = cache
+    if getattr(clone, 'technical_analysis', None) is not None:
+        clone.technical_analysis = _with_cache(clone.technical_analysis, cache)
+    return clone
+
+def _run_detached(analyzer: Any, data: Any) -> Tuple[Dict[str, Any], Dict[Tuple, Any]]:
+    # Process-pool entry point. The analyzer arrives without the parent's cache, computes into a
+    # worker-local one, and hands its entries back for the parent to merge
+    cache = IndicatorCache({})
+    result = asyncio.run(_with_cache(analyzer, cache).analyze(data))
+    return result, cache.entries
+
 class MainAnalysis:
     def __init__(self, config: Dict[str, Any], logging_service: LoggingService, vector_db_enhancement: VectorDatabaseEnhancement):
         self.config = config
         self.logging_service = logging_service
-        self.technical_analysis = TechnicalAnalysis(config)
+        self.indicator_cache = IndicatorCache(config)
+        self.technical_analysis = TechnicalAnalysis(config, self.indicator_cache)
         self.sentiment_analysis = SentimentAnalysis(config)
         self.intermarket_analysis = IntermarketAnalysis(config)
         self.pattern_analysis = PatternAnalysis(config)
-        self.volume_analysis = VolumeAnalysis(config)
-        self.trend_analysis = TrendAnalysis(config)
-        self.multi_timeframe_analysis = MultiTimeframeAnalysis(config)
-        self.adaptive_parameters_manager = AdaptiveParametersManager(config)
+        self.volume_analysis = VolumeAnalysis(config, self.indicator_cache)
+        self.trend_analysis = TrendAnalysis(config, self.indicator_cache)
+        self.multi_timeframe_analysis = MultiTimeframeAnalysis(config, self.indicator_cache)
+        self.adaptive_parameters_manager = AdaptiveParametersManager(config, self.indicator_cache)
+        self.cross_sectional_analysis = CrossSectionalAnalysis(config, self.indicator_cache)
+        self.anomaly_threshold = config.get('anomaly_z_threshold', 3)
         self.vector_db_enhancement = vector_db_enhancement
+        self.execution_mode = config.get('analysis_execution_mode', 'sequential')
+        self.cpu_bound_analyzers = config.get('cpu_bound_analyzers', CPU_BOUND_ANALYZERS)
+        self.executor: Executor = None
 
     async def initialize(self):
         try:
@@ -35,7 +74,9 @@ class MainAnalysis:
             await self.trend_analysis.initialize()
             await self.multi_timeframe_analysis.initialize()
             await self.adaptive_parameters_manager.initialize()
-            await self.logging_service.log_info("MainAnalysis initialized successfully")
+            if self.execution_mode == 'concurrent' and self.executor is None:
+                self.executor = self._create_executor()
+            await self.logging_service.log_info(f"MainAnalysis initialized successfully in {self.execution_mode} mode")
         except Exception as e:
             await self.logging_service.log_error(f"Error initializing MainAnalysis: {str(e)}")
             raise
@@ -45,29 +86,22 @@ class MainAnalysis:
             adapted_parameters = await self.adaptive_parameters_manager.adjust_parameters(market_data)
             self.config.update(adapted_parameters)
 
-            technical_results = await self.technical_analysis.analyze(market_data)
-            sentiment_results = await self.sentiment_analysis.analyze(news_data)
-            intermarket_results = await self.intermarket_analysis.analyze(market_data)
-            pattern_results = await self.pattern_analysis.analyze(market_data)
-            volume_results = await self.volume_analysis.analyze(market_data)
-            trend_results = await self.trend_analysis.analyze(market_data)
-            multi_timeframe_results = await self.multi_timeframe_analysis.analyze(market_data)
-
-            advanced_results = await self.perform_advanced_analysis(market_data, technical_results, sentiment_results)
-
-            combined_results = {
-                'technical': technical_results,
-                'sentiment': sentiment_results,
-                'intermarket': intermarket_results,
-                'patterns': pattern_results,
-                'volume': volume_results,
-                'trend': trend_results,
-                'multi_timeframe': multi_timeframe_results,
-                'advanced': advanced_results,
-                'adapted_parameters': adapted_parameters
-            }
+            stages = self._get_analysis_stages(market_data, news_data)
+            if self.execution_mode == 'concurrent':
+                stage_results = await asyncio.gather(*(self._run_stage(name, analyzer, data) for name, (analyzer, data) in stages.items()))
+            else:
+                stage_results = [await self._run_stage(name, analyzer, data) for name, (analyzer, data) in stages.items()]
+            combined_results = {name: result for name, result, _ in stage_results}
+            timings = {name: elapsed for name, _, elapsed in stage_results}
+
+            advanced_start = time.perf_counter()
+            advanced_results = await self.perform_advanced_analysis(market_data, combined_results['technical'], combined_results['sentiment'])
+            timings['advanced'] = time.perf_counter() - advanced_start
 
-            await self.vector_db_enhancement.enhance_database(combined_results)
+            combined_results['advanced'] = advanced_results
+            combined_results['adapted_parameters'] = adapted_parameters
+            combined_results['timings'] = timings
+            combined_results['critical_path'] = max(stages, key=timings.get)
 
             analysis_summary = self.get_analysis_summary(combined_results)
             combined_results['summary'] = analysis_summary
@@ -78,6 +112,67 @@ class MainAnalysis:
             await self.logging_service.log_error(f"Error in MainAnalysis.analyze: {str(e)}")
             raise
 
+    def _get_analysis_stages(self, market_data: Dict[str, Any], news_data: List[Dict[str, Any]]) -> Dict[str, Tuple[Any, Any]]:
+        # Each analyzer takes its own input shape
+        wrapped = {'market_data': market_data, 'symbol': market_data.get('symbol')}
+        news = ' '.join(f"{item.get('title', '')} {item.get('content', '')}" for item in news_data)
+        return {
+            'technical': (self.technical_analysis, wrapped),
+            'sentiment': (self.sentiment_analysis, {'news': news, 'market_data': market_data}),
+            'intermarket': (self.intermarket_analysis, {'main_market': market_data,
+                                                        'related_markets': market_data.get('related_markets', {}),
+                                                        'sector_data': market_data.get('sector_data', {})}),
+            'patterns': (self.pattern_analysis, market_data),
+            'volume': (self.volume_analysis, wrapped),
+            'trend': (self.trend_analysis, wrapped),
+            'multi_timeframe': (self.multi_timeframe_analysis, wrapped),
+        }
+
+    async def _run_stage(self, name: str, analyzer: Any, data: Any) -> Tuple[str, Dict[str, Any], float]:
+        start = time.perf_counter()
+        # Incremental indicators keep per-symbol state in this process, and an update is O(1) anyway
+        offload = (self.executor is not None and name in self.cpu_bound_analyzers
+                   and getattr(analyzer, 'incremental_engine', None) is None)
+        if offload and isinstance(self.executor, ProcessPoolExecutor):
+            loop = asyncio.get_running_loop()
+            result, entries = await loop.run_in_executor(self.executor, _run_detached, _with_cache(analyzer, None), data)
+            self.indicator_cache.merge(entries)
+        elif offload:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.executor, _run_analyzer, analyzer, data)
+        else:
+            result = await analyzer.analyze(data)
+        return name, result, time.perf_counter() - start
+
+    def _create_executor(self) -> Executor:
+        executor_type = self.config.get('analysis_executor', 'thread')
+        max_workers = self.config.get('analysis_max_workers')
+        if executor_type == 'process':
+            return ProcessPoolExecutor(max_workers=max_workers)
+        elif executor_type == 'thread':
+            return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analysis')
+        else:
+            raise ValueError(f"Unsupported analysis executor: {executor_type}")
+
+    def begin_cycle(self):
+        self.indicator_cache.begin_cycle()
+
+    def get_indicator_cache_stats(self) -> Dict[str, Any]:
+        return self.indicator_cache.get_stats()
+
+    async def analyze_batch(self, market_data_by_symbol: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        # Run once per cycle after begin_cycle; per-symbol analyze calls then read the batch features from the cache
+        try:
+            results = self.cross_sectional_analysis.analyze_batch(market_data_by_symbol)
+            await self.logging_service.log_info(f"Batch analysis computed features for {len(results)} of {len(market_data_by_symbol)} symbols")
+            return results
+        except Exception as e:
+            await self.logging_service.log_error(f"Error in MainAnalysis.analyze_batch: {str(e)}")
+            raise
+
+    def get_batch_stats(self) -> Dict[str, Any]:
+        return self.cross_sectional_analysis.get_stats()
+
     async def perform_advanced_analysis(self, market_data: Dict[str, Any], technical_results: Dict[str, Any], sentiment_results: Dict[str, Any]) -> Dict[str, Any]:
         try:
             market_regime = self.detect_market_regime(technical_results, sentiment_results)
@@ -106,11 +201,15 @@ class MainAnalysis:
             return "mean-reverting"
 
     def detect_anomalies(self, market_data: Dict[str, Any]) -> List[int]:
+        scope = indicator_scope(self.indicator_cache, {'market_data': market_data})
+        return scope.get('anomalies', {'threshold': self.anomaly_threshold}, lambda: self._calculate_anomalies(market_data))
+
+    def _calculate_anomalies(self, market_data: Dict[str, Any]) -> List[int]:
         returns = np.diff(market_data['close']) / market_data['close'][:-1]
         mean = np.mean(returns)
         std = np.std(returns)
         z_scores = (returns - mean) / std
-        return [i for i, z in enumerate(z_scores) if abs(z) > 3]
+        return [i for i, z in enumerate(z_scores) if abs(z) > self.anomaly_threshold]
 
     def get_analysis_summary(self, analysis_results: Dict[str, Any]) -> Dict[str, Any]:
         summary = {
@@ -122,9 +221,9 @@ class MainAnalysis:
         return summary
 
     def _determine_overall_trend(self, analysis_results: Dict[str, Any]) -> str:
-        technical_trend = analysis_results['technical']['trend']
-        sentiment = analysis_results['sentiment']['overall_sentiment']
-        volume_trend = analysis_results['volume']['volume_trend']
+        technical_trend = analysis_results['technical'].get('trend') or self._moving_average_trend(analysis_results['technical'])
+        sentiment = analysis_results['sentiment'].get('overall_sentiment', 0)
+        volume_trend = analysis_results['volume'].get('volume_trend', '')
         
         trend_score = 0
         trend_score += 1 if technical_trend == 'bullish' else -1 if technical_trend == 'bearish' else 0
@@ -138,9 +237,15 @@ class MainAnalysis:
         else:
             return 'neutral'
 
+    def _moving_average_trend(self, technical_results: Dict[str, Any]) -> str:
+        fast, slow = _last(technical_results.get('SMA_20')), _last(technical_results.get('SMA_50'))
+        if fast is None or slow is None or np.isnan(fast) or np.isnan(slow):
+            return 'neutral'
+        return 'bullish' if fast > slow else 'bearish' if fast < slow else 'neutral'
+
     def _assess_risk_level(self, analysis_results: Dict[str, Any]) -> str:
         volatility = analysis_results['technical'].get('volatility', 0)
-        rsi = analysis_results['technical'].get('RSI', [50])[-1]
+        rsi = _last(analysis_results['technical'].get('RSI'), 50)
         sentiment_volatility = analysis_results['sentiment'].get('sentiment_volatility', 0)
         market_breadth = analysis_results['intermarket'].get('market_breadth', 0.5)
         
@@ -186,14 +291,16 @@ class MainAnalysis:
         return max(0, min(1, weighted_score))
 
     def _extract_key_indicators(self, analysis_results: Dict[str, Any]) -> Dict[str, Any]:
+        prediction = analysis_results['advanced'].get('prediction')
         return {
-            'rsi': analysis_results['technical'].get('RSI', [])[-1],
-            'macd': analysis_results['technical'].get('MACD', [])[-1],
-            'bollinger_bandwidth': analysis_results['technical'].get('BB_Bandwidth', [])[-1],
+            'rsi': _last(analysis_results['technical'].get('RSI')),
+            'macd': _last(analysis_results['technical'].get('MACD')),
+            'bollinger_bandwidth': _last(analysis_results['technical'].get('BB_Bandwidth')),
             'sentiment_score': analysis_results['sentiment'].get('overall_sentiment', 0),
             'volume_trend': analysis_results['volume'].get('volume_trend', ''),
             'market_regime': analysis_results['advanced'].get('market_regime', ''),
-            'pattern_prediction': analysis_results['advanced'].get('prediction', {}).get('predicted_movement', '')
+            # find_similar_patterns returns a list of neighbours, not a prediction
+            'pattern_prediction': prediction.get('predicted_movement', '') if isinstance(prediction, dict) else ''
         }
 
     async def update_with_post_trade_analysis(self, post_trade_results: Dict[str, Any]):
@@ -202,4 +309,11 @@ class MainAnalysis:
             await self.vector_db_enhancement.update_pattern(post_trade_results)
             await self.logging_service.log_info("MainAnalysis updated with post-trade analysis results")
         except Exception as e:
-            await self.logging_service.log_error(f"Error in update_with_post_trade_analysis: {str(e)}")
\ No newline at end of file
+            await self.logging_service.log_error(f"Error in update_with_post_trade_analysis: {str(e)}")
+
+    async def close(self):
+        if self.executor is not None:
+            # Waiting for in-flight stages blocks, so it happens off the event loop
+            await asyncio.to_thread(self.executor.shutdown, wait=True)
+            self.executor = None
+            await self.logging_service.log_info("MainAnalysis executor shut down")
@@ -4,37 +4,52 @@ from typing import Dict, Any, List
 import pandas as pd
 import numpy as np
 from .technical_analysis import TechnicalAnalysis
+from .indicator_cache import IndicatorCache
+
+# Pandas offset aliases for our timeframe names ('1m' would mean month-end to pandas)
+RESAMPLE_RULES = {'1m': '1min', '5m': '5min', '15m': '15min', '1h': '1h', '4h': '4h', '1d': '1D'}
+
+def _tail(values: Any, n: int) -> np.ndarray:
+    # Indicator outputs are pandas Series on the TA-Lib path and arrays on the incremental one
+    values = np.asarray(values, dtype=np.float64)[-n:]
+    return values[~np.isnan(values)]
 
 class MultiTimeframeAnalysis:
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], indicator_cache: IndicatorCache = None):
         self.config = config
-        self.technical_analysis = TechnicalAnalysis(config)
+        self.technical_analysis = TechnicalAnalysis(config, indicator_cache)
         self.timeframes = ['1m', '5m', '15m', '1h', '4h', '1d']
 
     async def analyze(self, data: Dict[str, Any]) -> Dict[str, Any]:
         results = {}
+        symbol = data.get('symbol', data['market_data'].get('symbol'))
         
         for timeframe in self.timeframes:
             timeframe_data = self._resample_data(data['market_data'], timeframe)
-            results[timeframe] = await self.technical_analysis.analyze({'market_data': timeframe_data})
+            results[timeframe] = await self.technical_analysis.analyze({'market_data': timeframe_data, 'symbol': symbol, 'timeframe': timeframe})
         
-        results['trend_confluence'] = self._analyze_trend_confluence(results)
+        trend_confluence = self._analyze_trend_confluence(results)
         results['support_resistance'] = self._analyze_support_resistance(results)
+        results['trend_confluence'] = trend_confluence
         
         return results
 
     def _resample_data(self, data: Dict[str, List[float]], timeframe: str) -> Dict[str, List[float]]:
-        df = pd.DataFrame(data)
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
+        df = pd.DataFrame({column: data[column] for column in ['timestamp', 'open', 'high', 'low', 'close', 'volume']})
+        # Bar-store timestamps are epoch seconds; provider ones are date strings
+        unit = 's' if np.issubdtype(df['timestamp'].dtype, np.number) else None
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit=unit)
         df.set_index('timestamp', inplace=True)
         
-        resampled = df.resample(timeframe).agg({
+        resampled = df.resample(RESAMPLE_RULES.get(timeframe, timeframe)).agg({
             'open': 'first',
             'high': 'max',
             'low': 'min',
             'close': 'last',
             'volume': 'sum'
         })
+        # Resampling finer than the source bars leaves empty intervals
+        resampled = resampled.dropna(subset=['close'])
         
         return resampled.to_dict('list')
 
@@ -42,9 +57,12 @@ class MultiTimeframeAnalysis:
         trend_signals = {}
         
         for timeframe, analysis in results.items():
-            if analysis['SMA_50'][-1] > analysis['SMA_200'][-1]:
+            # SMA_20 against SMA_50, the longest average the technical analysis computes; timeframes
+            # too short for SMA_50 count as neutral
+            fast, slow = _tail(analysis['SMA_20'], 1), _tail(analysis['SMA_50'], 1)
+            if len(fast) and len(slow) and fast[0] > slow[0]:
                 trend_signals[timeframe] = 'bullish'
-            elif analysis['SMA_50'][-1] < analysis['SMA_200'][-1]:
+            elif len(fast) and len(slow) and fast[0] < slow[0]:
                 trend_signals[timeframe] = 'bearish'
             else:
                 trend_signals[timeframe] = 'neutral'
@@ -61,8 +79,8 @@ class MultiTimeframeAnalysis:
         resistance_levels = []
         
         for timeframe, analysis in results.items():
-            support_levels.extend(analysis['BB_Lower'][-5:])
-            resistance_levels.extend(analysis['BB_Upper'][-5:])
+            support_levels.extend(_tail(analysis['BB_Lower'], 5).tolist())
+            resistance_levels.extend(_tail(analysis['BB_Upper'], 5).tolist())
         
         support_levels = sorted(set(support_levels))
         resistance_levels = sorted(set(resistance_levels))
@@ -1,16 +1,20 @@
 # File: analysis/sentiment_analysis.py
 
 from typing import Dict, Any
+import asyncio
 from azure.ai.textanalytics import TextAnalyticsClient
 from azure.core.credentials import AzureKeyCredential
 import requests
 import pandas as pd
 import numpy as np
+from infrastructure.blocking_executor import BlockingExecutor
 
 class SentimentAnalysis:
     def __init__(self, config):
         self.config = config
         self.client = self._initialize_client()
+        # The Text Analytics client is synchronous; calls run on their own bounded pool with a deadline
+        self.executor = BlockingExecutor.from_config(config, 'text_analytics')
 
     def _initialize_client(self):
         key = self.config['sentiment_analysis']['azure_text_analytics']['key']
@@ -25,8 +29,8 @@ class SentimentAnalysis:
         results = {}
         
         # Azure Text Analytics sentiment analysis
-        results['news_sentiment'] = self._analyze_text_sentiment(news_text)
-        results['social_media_sentiment'] = self._analyze_text_sentiment(social_media_text)
+        results['news_sentiment'], results['social_media_sentiment'] = await asyncio.gather(
+            self._analyze_text_sentiment(news_text), self._analyze_text_sentiment(social_media_text))
         
         # Fear and Greed Index
         results['fear_greed_index'] = self._calculate_fear_greed_index(market_data)
@@ -45,9 +49,9 @@ class SentimentAnalysis:
 
         return results
 
-    def _analyze_text_sentiment(self, text: str) -> Dict[str, float]:
+    async def _analyze_text_sentiment(self, text: str) -> Dict[str, float]:
         try:
-            response = self.client.analyze_sentiment([text])[0]
+            response = (await self.executor.run(self.client.analyze_sentiment, [text]))[0]
             return {
                 'sentiment': response.sentiment,
                 'positive_score': response.confidence_scores.positive,
@@ -101,4 +105,7 @@ class SentimentAnalysis:
         return {
             'net_commercial_position': cot_data.get('commercial_long', 0) - cot_data.get('commercial_short', 0),
             'net_non_commercial_position': cot_data.get('non_commercial_long', 0) - cot_data.get('non_commercial_short', 0)
-        }
\ No newline at end of file
+        }
+
+    def get_executor_stats(self) -> Dict[str, Any]:
+        return self.executor.get_stats()
\ No newline at end of file
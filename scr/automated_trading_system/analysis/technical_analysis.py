@@ -4,35 +4,46 @@ import numpy as np
 import pandas as pd
 import talib
 from typing import Dict, Any
+from .incremental_indicators import IncrementalIndicatorEngine
+from .indicator_cache import IndicatorCache, indicator_scope
 
 class TechnicalAnalysis:
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], indicator_cache: IndicatorCache = None):
         self.config = config
+        self.indicator_cache = indicator_cache
+        self.incremental_engine = IncrementalIndicatorEngine(config) if config.get('incremental_indicators', False) else None
 
     async def analyze(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        df = pd.DataFrame(data['market_data'])
+        market_data = data['market_data']
+        symbol = data.get('symbol', market_data.get('symbol'))
+        # Incremental state follows the base series only; resampled timeframes are recomputed
+        if self.incremental_engine is not None and symbol is not None and 'timeframe' not in data:
+            return self.incremental_engine.update(symbol, market_data)
+
+        df = pd.DataFrame(market_data)
+        scope = indicator_scope(self.indicator_cache, data)
         
         results = {}
         
         # Moving Averages
-        results['SMA_10'] = talib.SMA(df['close'], timeperiod=10)
-        results['SMA_20'] = talib.SMA(df['close'], timeperiod=20)
-        results['SMA_50'] = talib.SMA(df['close'], timeperiod=50)
-        results['EMA_10'] = talib.EMA(df['close'], timeperiod=10)
-        results['EMA_20'] = talib.EMA(df['close'], timeperiod=20)
-        results['EMA_50'] = talib.EMA(df['close'], timeperiod=50)
+        results['SMA_10'] = scope.get('SMA', {'timeperiod': 10}, lambda: talib.SMA(df['close'], timeperiod=10))
+        results['SMA_20'] = scope.get('SMA', {'timeperiod': 20}, lambda: talib.SMA(df['close'], timeperiod=20))
+        results['SMA_50'] = scope.get('SMA', {'timeperiod': 50}, lambda: talib.SMA(df['close'], timeperiod=50))
+        results['EMA_10'] = scope.get('EMA', {'timeperiod': 10}, lambda: talib.EMA(df['close'], timeperiod=10))
+        results['EMA_20'] = scope.get('EMA', {'timeperiod': 20}, lambda: talib.EMA(df['close'], timeperiod=20))
+        results['EMA_50'] = scope.get('EMA', {'timeperiod': 50}, lambda: talib.EMA(df['close'], timeperiod=50))
 
         # RSI
-        results['RSI'] = talib.RSI(df['close'], timeperiod=14)
+        results['RSI'] = scope.get('RSI', {'timeperiod': 14}, lambda: talib.RSI(df['close'], timeperiod=14))
 
         # MACD
-        results['MACD'], results['MACD_Signal'], results['MACD_Hist'] = talib.MACD(df['close'])
+        results['MACD'], results['MACD_Signal'], results['MACD_Hist'] = scope.get('MACD', {}, lambda: talib.MACD(df['close']))
 
         # Bollinger Bands
-        results['BB_Upper'], results['BB_Middle'], results['BB_Lower'] = talib.BBANDS(df['close'])
+        results['BB_Upper'], results['BB_Middle'], results['BB_Lower'] = scope.get('BBANDS', {'timeperiod': 20}, lambda: talib.BBANDS(df['close'], timeperiod=20))
 
         # Stochastic Oscillator
-        results['STOCH_K'], results['STOCH_D'] = talib.STOCH(df['high'], df['low'], df['close'])
+        results['STOCH_K'], results['STOCH_D'] = scope.get('STOCH', {}, lambda: talib.STOCH(df['high'], df['low'], df['close']))
 
         # Fibonacci Retracement Levels
         high = df['high'].max()
@@ -44,21 +55,29 @@ class TechnicalAnalysis:
         results['Fib_61.8'] = high - 0.618 * diff
 
         # ATR
-        results['ATR'] = talib.ATR(df['high'], df['low'], df['close'])
+        results['ATR'] = scope.get('ATR', {'timeperiod': 14}, lambda: talib.ATR(df['high'], df['low'], df['close'], timeperiod=14))
 
-        # Ichimoku Cloud
-        results['Ichimoku_Conversion'], results['Ichimoku_Base'], results['Ichimoku_SpanA'], results['Ichimoku_SpanB'] = talib.ICHIMOKU(df['high'], df['low'], df['close'])
+        # Ichimoku Cloud (TA-Lib has no Ichimoku function)
+        results['Ichimoku_Conversion'], results['Ichimoku_Base'], results['Ichimoku_SpanA'], results['Ichimoku_SpanB'] = scope.get('ICHIMOKU', {}, lambda: self._ichimoku(df))
 
         # MFI
-        results['MFI'] = talib.MFI(df['high'], df['low'], df['close'], df['volume'])
+        results['MFI'] = scope.get('MFI', {'timeperiod': 14}, lambda: talib.MFI(df['high'], df['low'], df['close'], df['volume'], timeperiod=14))
 
         # CMF
-        results['CMF'] = talib.ADOSC(df['high'], df['low'], df['close'], df['volume'])
+        results['CMF'] = scope.get('ADOSC', {}, lambda: talib.ADOSC(df['high'], df['low'], df['close'], df['volume']))
 
         # CCI
-        results['CCI'] = talib.CCI(df['high'], df['low'], df['close'])
+        results['CCI'] = scope.get('CCI', {'timeperiod': 14}, lambda: talib.CCI(df['high'], df['low'], df['close'], timeperiod=14))
 
         # Parabolic SAR
-        results['SAR'] = talib.SAR(df['high'], df['low'])
+        results['SAR'] = scope.get('SAR', {}, lambda: talib.SAR(df['high'], df['low']))
+
+        return results
 
-        return results
\ No newline at end of file
+    def _ichimoku(self, df: pd.DataFrame, conversion_period: int = 9, base_period: int = 26, span_b_period: int = 52) -> tuple:
+        # Spans are left unshifted, matching the incremental engine
+        def midpoint(period: int) -> pd.Series:
+            return (df['high'].rolling(period).max() + df['low'].rolling(period).min()) / 2
+        conversion = midpoint(conversion_period)
+        base = midpoint(base_period)
+        return conversion, base, (conversion + base) / 2, midpoint(span_b_period)
@@ -2,29 +2,39 @@
 
 import numpy as np
 import pandas as pd
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 from scipy.signal import argrelextrema
+from .indicator_cache import IndicatorCache, IndicatorScope, indicator_scope
+
+COMPARATORS = {
+    'greater': np.greater,
+    'greater_equal': np.greater_equal,
+    'less': np.less,
+    'less_equal': np.less_equal,
+}
 
 class TrendAnalysis:
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], indicator_cache: IndicatorCache = None):
         self.config = config
+        self.indicator_cache = indicator_cache
 
     async def analyze(self, data: Dict[str, Any]) -> Dict[str, Any]:
         df = pd.DataFrame(data['market_data'])
+        scope = indicator_scope(self.indicator_cache, data)
         
         results = {}
         
         # Trendlines
-        results['uptrend_line'], results['downtrend_line'] = self.calculate_trendlines(df)
+        results['uptrend_line'], results['downtrend_line'] = self.calculate_trendlines(scope, df)
 
         # Support and Resistance levels
-        results['support_levels'], results['resistance_levels'] = self.calculate_support_resistance(df)
+        results['support_levels'], results['resistance_levels'] = self.calculate_support_resistance(scope, df)
 
         # Chart patterns
-        results['chart_patterns'] = self.identify_chart_patterns(df)
+        results['chart_patterns'] = self.identify_chart_patterns(scope, df)
 
         # Fractal analysis
-        results['fractals'] = self.calculate_fractals(df)
+        results['fractals'] = self.calculate_fractals(scope, df)
 
         # Elliott Wave Theory (simplified)
         results['elliott_wave'] = self.identify_elliott_waves(df)
@@ -34,37 +44,42 @@ class TrendAnalysis:
 
         return results
 
-    def calculate_trendlines(self, df: pd.DataFrame) -> Tuple[List[float], List[float]]:
+    def find_extrema(self, scope: IndicatorScope, df: pd.DataFrame, column: str, comparator: str, order: int) -> np.ndarray:
+        # Several pattern checks scan the same series, so extrema are computed once per cycle
+        params = {'column': column, 'comparator': comparator, 'order': order}
+        return scope.get('argrelextrema', params, lambda: argrelextrema(df[column].values, COMPARATORS[comparator], order=order)[0])
+
+    def calculate_trendlines(self, scope: IndicatorScope, df: pd.DataFrame) -> Tuple[List[float], List[float]]:
         # Simplified trendline calculation
-        highs = argrelextrema(df['high'].values, np.greater_equal, order=5)[0]
-        lows = argrelextrema(df['low'].values, np.less_equal, order=5)[0]
+        highs = self.find_extrema(scope, df, 'high', 'greater_equal', 5)
+        lows = self.find_extrema(scope, df, 'low', 'less_equal', 5)
         
         uptrend = np.polyfit(lows, df['low'].iloc[lows], 1)
         downtrend = np.polyfit(highs, df['high'].iloc[highs], 1)
         
         return list(np.poly1d(uptrend)(range(len(df)))), list(np.poly1d(downtrend)(range(len(df))))
 
-    def calculate_support_resistance(self, df: pd.DataFrame) -> Tuple[List[float], List[float]]:
-        pivots = argrelextrema(df['close'].values, np.greater_equal, order=5)[0]
+    def calculate_support_resistance(self, scope: IndicatorScope, df: pd.DataFrame) -> Tuple[List[float], List[float]]:
+        pivots = self.find_extrema(scope, df, 'close', 'greater_equal', 5)
         support = df['low'].rolling(window=10, center=True).min()
         resistance = df['high'].rolling(window=10, center=True).max()
         return list(support[pivots]), list(resistance[pivots])
 
-    def identify_chart_patterns(self, df: pd.DataFrame) -> List[str]:
+    def identify_chart_patterns(self, scope: IndicatorScope, df: pd.DataFrame) -> List[str]:
         # Simplified pattern recognition
         patterns = []
-        if self.is_head_and_shoulders(df):
+        if self.is_head_and_shoulders(scope, df):
             patterns.append('Head and Shoulders')
-        if self.is_double_top(df):
+        if self.is_double_top(scope, df):
             patterns.append('Double Top')
-        if self.is_double_bottom(df):
+        if self.is_double_bottom(scope, df):
             patterns.append('Double Bottom')
         return patterns
 
-    def calculate_fractals(self, df: pd.DataFrame) -> Dict[str, List[int]]:
+    def calculate_fractals(self, scope: IndicatorScope, df: pd.DataFrame) -> Dict[str, List[int]]:
         # Williams' Fractal indicator
-        up_fractals = argrelextrema(df['high'].values, np.greater, order=2)[0]
-        down_fractals = argrelextrema(df['low'].values, np.less, order=2)[0]
+        up_fractals = self.find_extrema(scope, df, 'high', 'greater', 2)
+        down_fractals = self.find_extrema(scope, df, 'low', 'less', 2)
         return {'up': list(up_fractals), 'down': list(down_fractals)}
 
     def identify_elliott_waves(self, df: pd.DataFrame) -> List[str]:
@@ -85,25 +100,25 @@ class TrendAnalysis:
         ha_low = df[['low', 'open', 'close']].min(axis=1)
         return pd.DataFrame({'open': ha_open, 'high': ha_high, 'low': ha_low, 'close': ha_close})
 
-    def is_head_and_shoulders(self, df: pd.DataFrame) -> bool:
+    def is_head_and_shoulders(self, scope: IndicatorScope, df: pd.DataFrame) -> bool:
         # Simplified head and shoulders pattern recognition
-        peaks = argrelextrema(df['high'].values, np.greater, order=5)[0]
+        peaks = self.find_extrema(scope, df, 'high', 'greater', 5)
         if len(peaks) >= 3:
             if df['high'].iloc[peaks[1]] > df['high'].iloc[peaks[0]] and df['high'].iloc[peaks[1]] > df['high'].iloc[peaks[2]]:
                 return True
         return False
 
-    def is_double_top(self, df: pd.DataFrame) -> bool:
+    def is_double_top(self, scope: IndicatorScope, df: pd.DataFrame) -> bool:
         # Simplified double top pattern recognition
-        peaks = argrelextrema(df['high'].values, np.greater, order=5)[0]
+        peaks = self.find_extrema(scope, df, 'high', 'greater', 5)
         if len(peaks) >= 2:
             if abs(df['high'].iloc[peaks[-1]] - df['high'].iloc[peaks[-2]]) / df['high'].iloc[peaks[-2]] < 0.02:
                 return True
         return False
 
-    def is_double_bottom(self, df: pd.DataFrame) -> bool:
+    def is_double_bottom(self, scope: IndicatorScope, df: pd.DataFrame) -> bool:
         # Simplified double bottom pattern recognition
-        troughs = argrelextrema(df['low'].values, np.less, order=5)[0]
+        troughs = self.find_extrema(scope, df, 'low', 'less', 5)
         if len(troughs) >= 2:
             if abs(df['low'].iloc[troughs[-1]] - df['low'].iloc[troughs[-2]]) / df['low'].iloc[troughs[-2]] < 0.02:
                 return True
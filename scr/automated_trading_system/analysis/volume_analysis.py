@@ -3,34 +3,37 @@
 import numpy as np
 import pandas as pd
 import talib
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
+from .indicator_cache import IndicatorCache, indicator_scope
 
 class VolumeAnalysis:
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], indicator_cache: IndicatorCache = None):
         self.config = config
+        self.indicator_cache = indicator_cache
 
     async def analyze(self, data: Dict[str, Any]) -> Dict[str, Any]:
         df = pd.DataFrame(data['market_data'])
+        scope = indicator_scope(self.indicator_cache, data)
         
         results = {}
         
         # On-Balance Volume (OBV)
-        results['OBV'] = talib.OBV(df['close'], df['volume'])
+        results['OBV'] = scope.get('OBV', {}, lambda: talib.OBV(df['close'], df['volume']))
 
         # Volume Price Trend (VPT)
-        results['VPT'] = self.calculate_vpt(df)
+        results['VPT'] = scope.get('VPT', {}, lambda: self.calculate_vpt(df))
 
         # Volume Weighted Average Price (VWAP)
-        results['VWAP'] = self.calculate_vwap(df)
+        results['VWAP'] = scope.get('VWAP', {}, lambda: self.calculate_vwap(df))
 
         # Accumulation/Distribution Line (A/D Line)
-        results['AD'] = talib.AD(df['high'], df['low'], df['close'], df['volume'])
+        results['AD'] = scope.get('AD', {}, lambda: talib.AD(df['high'], df['low'], df['close'], df['volume']))
 
         # Negative Volume Index (NVI) and Positive Volume Index (PVI)
         results['NVI'], results['PVI'] = self.calculate_nvi_pvi(df)
 
-        # Money Flow Index (MFI)
-        results['MFI'] = talib.MFI(df['high'], df['low'], df['close'], df['volume'])
+        # Money Flow Index (MFI), shared with TechnicalAnalysis through the indicator cache
+        results['MFI'] = scope.get('MFI', {'timeperiod': 14}, lambda: talib.MFI(df['high'], df['low'], df['close'], df['volume'], timeperiod=14))
 
         return results
 
@@ -40,7 +43,7 @@ class VolumeAnalysis:
 
     def calculate_vwap(self, df: pd.DataFrame) -> np.ndarray:
         v = df['volume'].values
-        tp = (df['high'] + df['low'] + df['close']) / 3
+        tp = ((df['high'] + df['low'] + df['close']) / 3).values
         return (tp * v).cumsum() / v.cumsum()
 
     def calculate_nvi_pvi(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
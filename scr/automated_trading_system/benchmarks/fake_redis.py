@@ -0,0 +1,76 @@
+# File: benchmarks/fake_redis.py
+
+# In-memory stand-in for the subset of redis.asyncio the shared market data cache uses. Clients
+# created on the same FakeRedisServer see the same keys and channels, like processes sharing a Redis.
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
+import fnmatch
+import time
+
+class FakeRedisServer:
+    def __init__(self):
+        self.values: Dict[str, Tuple[bytes, Optional[float]]] = {}
+        self.subscribers: Dict[str, List[asyncio.Queue]] = {}
+
+    def get(self, key: str) -> Optional[bytes]:
+        value, expires_at = self.values.get(key, (None, None))
+        if expires_at is not None and time.time() >= expires_at:
+            del self.values[key]
+            return None
+        return value
+
+class FakePubSub:
+    def __init__(self, server: FakeRedisServer):
+        self.server = server
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.channels: List[str] = []
+
+    async def subscribe(self, *channels: str):
+        for channel in channels:
+            # Like Redis, subscribing to a channel twice delivers its messages once
+            if channel not in self.channels:
+                self.server.subscribers.setdefault(channel, []).append(self.queue)
+                self.channels.append(channel)
+            await self.queue.put({'type': 'subscribe', 'channel': channel.encode(), 'data': len(self.channels)})
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+    async def aclose(self):
+        for channel in self.channels:
+            self.server.subscribers[channel].remove(self.queue)
+        self.channels = []
+
+class FakeRedis:
+    def __init__(self, server: FakeRedisServer = None):
+        self.server = server or FakeRedisServer()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.server.get(key)
+
+    async def set(self, key: str, value: Any, ex: float = None):
+        self.server.values[key] = (bytes(value), time.time() + ex if ex else None)
+
+    async def delete(self, *keys: Any) -> int:
+        # Keys come back from scan_iter as bytes, as they do from a real server
+        keys = [key.decode() if isinstance(key, bytes) else key for key in keys]
+        return sum(self.server.values.pop(key, None) is not None for key in keys)
+
+    async def scan_iter(self, match: str = '*'):
+        for key in list(self.server.values):
+            if fnmatch.fnmatchcase(key, match):
+                yield key.encode()
+
+    async def publish(self, channel: str, message: Any) -> int:
+        data = message.encode() if isinstance(message, str) else message
+        queues = self.server.subscribers.get(channel, [])
+        for queue in queues:
+            await queue.put({'type': 'message', 'channel': channel.encode(), 'data': data})
+        return len(queues)
+
+    def pubsub(self) -> FakePubSub:
+        return FakePubSub(self.server)
+
+    async def aclose(self):
+        pass
@@ -0,0 +1,79 @@
+# File: benchmarks/replay_server.py
+
+# Local stand-in for a broker WebSocket feed: replays recorded ticks to subscribed clients using the
+# same protocol StreamingStrategy speaks, so the streaming path can be tested and benchmarked offline
+from typing import Dict, Any, List
+import asyncio
+from aiohttp import web, WSMsgType
+
+class ReplayServer:
+    # speed is market seconds replayed per wall-clock second; 0 replays as fast as possible.
+    # The replay position is shared across connections, so a client that reconnects picks up
+    # the feed where it is now rather than from the start. disconnect_after drops the first
+    # connection after that many ticks, to exercise reconnects.
+    def __init__(self, ticks: List[Dict[str, Any]], speed: float = 0.0, disconnect_after: int = None):
+        self.ticks = sorted(ticks, key=lambda tick: tick['timestamp'])
+        self.speed = speed
+        self.disconnect_after = disconnect_after
+        self.position = 0
+        self.connections = 0
+        self.sent = 0
+        self.finished = asyncio.Event()
+        self.runner: web.AppRunner = None
+        self.url = None
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        app = web.Application()
+        app.router.add_get('/stream', self._handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, host, port).start()
+        bound_host, bound_port = self.runner.addresses[0][:2]
+        self.url = f"ws://{bound_host}:{bound_port}/stream"
+        return self.url
+
+    async def stop(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    async def _handle(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections += 1
+        subscriptions = set()
+        subscribed = asyncio.Event()
+        replay = asyncio.create_task(self._replay(ws, subscriptions, subscribed, self.connections == 1))
+        try:
+            async for message in ws:
+                if message.type != WSMsgType.TEXT:
+                    continue
+                command = message.json()
+                if command.get('action') == 'subscribe':
+                    subscriptions.update(command.get('symbols', []))
+                    subscribed.set()
+                elif command.get('action') == 'unsubscribe':
+                    subscriptions.difference_update(command.get('symbols', []))
+        finally:
+            replay.cancel()
+            await asyncio.gather(replay, return_exceptions=True)
+        return ws
+
+    async def _replay(self, ws: web.WebSocketResponse, subscriptions: set, subscribed: asyncio.Event, first: bool):
+        await subscribed.wait()
+        sent_on_connection = 0
+        while self.position < len(self.ticks):
+            tick = self.ticks[self.position]
+            if self.speed and self.position > 0:
+                await asyncio.sleep((tick['timestamp'] - self.ticks[self.position - 1]['timestamp']) / self.speed)
+            if first and self.disconnect_after is not None and sent_on_connection >= self.disconnect_after:
+                await ws.close()
+                return
+            self.position += 1
+            if tick['symbol'] in subscriptions:
+                await ws.send_json(tick)
+                self.sent += 1
+                sent_on_connection += 1
+            else:
+                await asyncio.sleep(0)
+        self.finished.set()
@@ -0,0 +1,307 @@
+# File: benchmarks/run_benchmarks.py
+#
+# Drives the analyzers, MainAnalysis.analyze and TradingEngine.trading_cycle over seeded synthetic
+# watchlists, with local stand-ins for the data provider, LLMs, vector database and broker.
+#
+#   python -m benchmarks.run_benchmarks --symbols 10 100 --bars 500 --output results.json
+#   python -m benchmarks.run_benchmarks --baseline results.json   # compare against an earlier run
+
+from typing import Dict, Any, List, Callable, Awaitable
+from collections import defaultdict
+from datetime import datetime, timezone
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+import numpy as np
+import yaml
+from .synthetic_data import generate_watchlist
+from .stubs import (NullLoggingService, SyntheticDataProvider, BenchmarkStockDataManager, StubAIProvider,
+                    StubSentimentAnalysis, InMemoryVectorStore, StubBroker, StubDecisionEngine, StubRiskManagement,
+                    StubMessageBroker, StubPerformanceTracker, HoldStrategy, StaticWatchlist)
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CONFIG = os.path.join(PACKAGE_ROOT, 'config', 'settings_yaml')
+SCENARIOS = ['analyzers', 'main_analysis', 'trading_cycle']
+PERCENTILES = [50, 95, 99]
+
+class StageRecorder:
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.first_errors: Dict[str, str] = {}
+        # Shared by the components under test, so errors they catch and log are reported too
+        self.logging_service = NullLoggingService()
+
+    def add(self, stage: str, elapsed: float, error: BaseException = None):
+        self.samples[stage].append(elapsed)
+        if error is not None:
+            self.errors[stage] += 1
+            self.first_errors.setdefault(stage, f"{type(error).__name__}: {error}")
+
+    async def measure(self, stage: str, awaitable: Awaitable) -> Any:
+        # Failures are recorded rather than raised, so one broken stage doesn't hide the others
+        start = time.perf_counter()
+        try:
+            result = await awaitable
+        except Exception as e:
+            self.add(stage, time.perf_counter() - start, e)
+            return None
+        self.add(stage, time.perf_counter() - start)
+        return result
+
+    def wrap(self, stage: str, method: Callable[..., Awaitable]) -> Callable[..., Awaitable]:
+        # Times a dependency method in place; exceptions still propagate to the caller
+        async def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = await method(*args, **kwargs)
+            except Exception as e:
+                self.add(stage, time.perf_counter() - start, e)
+                raise
+            self.add(stage, time.perf_counter() - start)
+            return result
+        return timed
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        stages = {}
+        for stage, samples in self.samples.items():
+            values = np.array(samples)
+            stages[stage] = {
+                'count': len(values),
+                'errors': self.errors.get(stage, 0),
+                'mean': float(values.mean()),
+                'max': float(values.max()),
+                **{f"p{p}": float(np.percentile(values, p)) for p in PERCENTILES}
+            }
+            if stage in self.first_errors:
+                stages[stage]['first_error'] = self.first_errors[stage]
+        return stages
+
+def analyzer_inputs(symbol: str, market_data: Dict[str, Any], watchlist: Dict[str, Dict[str, np.ndarray]]) -> Dict[str, Any]:
+    # Each analyzer takes its own input shape
+    wrapped = {'market_data': market_data, 'symbol': symbol}
+    peers = [peer for peer in watchlist if peer != symbol][:3]
+    return {
+        'technical': wrapped,
+        'technical_incremental': wrapped,
+        'volume': wrapped,
+        'trend': wrapped,
+        'multi_timeframe': wrapped,
+        'patterns': market_data,
+        'intermarket': {
+            'main_market': market_data,
+            'related_markets': {peer: watchlist[peer]['close'] for peer in peers},
+            'sector_data': {peer: watchlist[peer]['close'] for peer in peers}
+        }
+    }
+
+def create_analyzers(config: Dict[str, Any]) -> Dict[str, Any]:
+    from analysis.technical_analysis import TechnicalAnalysis
+    from analysis.volume_analysis import VolumeAnalysis
+    from analysis.trend_analysis import TrendAnalysis
+    from analysis.multi_timeframe_analysis import MultiTimeframeAnalysis
+    from analysis.pattern_analysis import PatternAnalysis
+    from analysis.intermarket_analysis import IntermarketAnalysis
+    return {
+        'technical': TechnicalAnalysis(dict(config, incremental_indicators=False)),
+        'technical_incremental': TechnicalAnalysis(dict(config, incremental_indicators=True)),
+        'volume': VolumeAnalysis(config),
+        'trend': TrendAnalysis(config),
+        'multi_timeframe': MultiTimeframeAnalysis(config),
+        'patterns': PatternAnalysis(config),
+        'intermarket': IntermarketAnalysis(config)
+    }
+
+async def bench_analyzers(config: Dict[str, Any], watchlist: Dict[str, Dict[str, np.ndarray]],
+                          recorder: StageRecorder, cycles: int) -> Dict[str, Any]:
+    from analysis.cross_sectional_analysis import CrossSectionalAnalysis
+    analyzers = create_analyzers(config)
+    cross_sectional = CrossSectionalAnalysis(config)
+    for _ in range(cycles):
+        start = time.perf_counter()
+        cross_sectional.analyze_batch(watchlist)
+        recorder.add('cross_sectional', time.perf_counter() - start)
+        for symbol, market_data in watchlist.items():
+            inputs = analyzer_inputs(symbol, market_data, watchlist)
+            for name, analyzer in analyzers.items():
+                await recorder.measure(name, analyzer.analyze(inputs[name]))
+    return {}
+
+def create_main_analysis(config: Dict[str, Any], logging_service: NullLoggingService):
+    from analysis.main_analysis import MainAnalysis
+    main_analysis = MainAnalysis(config, logging_service, InMemoryVectorStore())
+    main_analysis.sentiment_analysis = StubSentimentAnalysis()
+    if main_analysis.execution_mode == 'concurrent':
+        main_analysis.executor = main_analysis._create_executor()
+    return main_analysis
+
+async def bench_main_analysis(config: Dict[str, Any], watchlist: Dict[str, Dict[str, np.ndarray]],
+                              recorder: StageRecorder, cycles: int) -> Dict[str, Any]:
+    main_analysis = create_main_analysis(config, recorder.logging_service)
+    try:
+        for _ in range(cycles):
+            main_analysis.begin_cycle()
+            for symbol, bars in watchlist.items():
+                results = await recorder.measure('main_analysis', main_analysis.analyze(dict(bars, symbol=symbol), []))
+                for stage, elapsed in (results or {}).get('timings', {}).items():
+                    recorder.add(f"main_analysis.{stage}", elapsed)
+        return {'indicator_cache': main_analysis.get_indicator_cache_stats()}
+    finally:
+        await main_analysis.close()
+
+async def bench_trading_cycle(config: Dict[str, Any], watchlist: Dict[str, Dict[str, np.ndarray]],
+                              recorder: StageRecorder, cycles: int) -> Dict[str, Any]:
+    from ai_analysis.ai_performance_tracker import AIPerformanceTracker
+    from ai_analysis.ai_recommendation_system import AIRecommendationSystem
+    from ai_analysis.data_preparation import DataPreparation
+    from ai_analysis.main_ai_analysis import MainAIAnalysis
+    from analysis.post_trade_analysis import PostTradeAnalysis
+    from business_logic.trading_engine import TradingEngine
+    from data.data_fetcher import DataFetcher
+
+    logging_service = recorder.logging_service
+    vector_store = InMemoryVectorStore()
+    data_fetcher = DataFetcher(config, logging_service)
+    data_fetcher.data_provider = SyntheticDataProvider(watchlist, config.get('benchmark_provider_latency', 0.0))
+    stock_data_manager = BenchmarkStockDataManager(config, data_fetcher, None, logging_service, vector_store)
+    stock_data_manager.preload(watchlist)
+
+    recommendation_system = AIRecommendationSystem(config)
+    llm_latency = config.get('benchmark_llm_latency', 0.0)
+    recommendation_system.ai_providers = {'azure_openai': StubAIProvider(llm_latency), 'claude': StubAIProvider(llm_latency)}
+    main_ai_analysis = MainAIAnalysis(config, DataPreparation(config), recommendation_system,
+                                      AIPerformanceTracker(config), logging_service)
+    main_analysis = create_main_analysis(config, logging_service)
+
+    engine = TradingEngine(config_repository=None, logging_service=logging_service, main_analysis=main_analysis,
+                           main_ai_analysis=main_ai_analysis, decision_engine=StubDecisionEngine(),
+                           smart_order_router=StubBroker(), stock_data_manager=stock_data_manager,
+                           stock_watchlist=StaticWatchlist(list(watchlist)), vector_database=vector_store,
+                           strategies=[HoldStrategy()], message_broker=StubMessageBroker(), risk_management=StubRiskManagement(),
+                           performance_tracker=StubPerformanceTracker(), post_trade_analysis=PostTradeAnalysis(config))
+    engine.config = config
+
+    stock_data_manager.get_stock_data = recorder.wrap('fetch', stock_data_manager.get_stock_data)
+    main_analysis.analyze = recorder.wrap('analysis', main_analysis.analyze)
+    main_ai_analysis.analyze = recorder.wrap('ai_analysis', main_ai_analysis.analyze)
+    engine.decision_engine.make_decision = recorder.wrap('decision', engine.decision_engine.make_decision)
+    engine.post_cycle_tasks = recorder.wrap('post_cycle', engine.post_cycle_tasks)
+
+    try:
+        cycle_stats = []
+        for _ in range(cycles):
+            await recorder.measure('trading_cycle', engine.trading_cycle())
+            cycle_stats.append(engine.get_cycle_stats())
+        return {'cycle_stats': cycle_stats}
+    finally:
+        await main_analysis.close()
+
+BENCHMARKS = {
+    'analyzers': bench_analyzers,
+    'main_analysis': bench_main_analysis,
+    'trading_cycle': bench_trading_cycle
+}
+
+async def run_scenario(scenario: str, config: Dict[str, Any], symbols: int, bars: int, cycles: int, seed: int,
+                       trace_memory: bool) -> Dict[str, Any]:
+    watchlist = generate_watchlist(symbols, bars, seed)
+    scenario_config = dict(config, bar_store_capacity=max(bars, config.get('bar_store_capacity', 0)))
+    result = {'scenario': scenario, 'symbols': symbols, 'bars': bars, 'cycles': cycles}
+    recorder = StageRecorder()
+    start = time.perf_counter()
+    try:
+        result['extra'] = await BENCHMARKS[scenario](scenario_config, watchlist, recorder, cycles)
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['wall_time'] = time.perf_counter() - start
+    result['stages'] = recorder.summary()
+    logged_errors = recorder.logging_service.errors
+    result['logged_errors'] = {'count': len(logged_errors), 'first': logged_errors[0] if logged_errors else None}
+
+    if trace_memory and 'error' not in result:
+        # Separate single-cycle pass: tracemalloc slows allocation-heavy code too much to time under it
+        tracemalloc.start()
+        try:
+            await BENCHMARKS[scenario](scenario_config, watchlist, StageRecorder(), 1)
+            result['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=PACKAGE_ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    def index(report):
+        return {(entry['scenario'], entry['symbols'], entry['bars'], stage): stats
+                for entry in report['results'] for stage, stats in entry.get('stages', {}).items()}
+    current, previous = index(results), index(baseline)
+    lines = []
+    for key in sorted(current.keys() & previous.keys()):
+        before, after = previous[key]['p50'], current[key]['p50']
+        change = (after - before) / before * 100 if before else 0.0
+        lines.append(f"{key[0]:<14} {key[1]:>5} sym {key[2]:>6} bars  {key[3]:<28} p50 {before * 1000:9.3f}ms -> {after * 1000:9.3f}ms ({change:+.1f}%)")
+    return lines
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark analysis and trading cycle throughput on synthetic data")
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument('--symbols', nargs='+', type=int, default=[10, 100, 1000])
+    parser.add_argument('--bars', nargs='+', type=int, default=[500, 5000])
+    parser.add_argument('--cycles', type=int, default=3, help="timed passes over the watchlist per scenario")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--config', default=DEFAULT_CONFIG, help="settings file the components are configured from")
+    parser.add_argument('--provider-latency', type=float, default=0.0, help="simulated data provider latency in seconds")
+    parser.add_argument('--llm-latency', type=float, default=0.0, help="simulated LLM latency in seconds")
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc peak memory pass")
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', help="earlier results file to compare p50 latencies against")
+    return parser.parse_args(argv)
+
+async def main(argv: List[str] = None) -> Dict[str, Any]:
+    args = parse_args(argv)
+    with open(args.config, 'r') as f:
+        config = yaml.safe_load(f) or {}
+    config.update(benchmark_provider_latency=args.provider_latency, benchmark_llm_latency=args.llm_latency)
+
+    report = {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'args': vars(args)
+        },
+        'results': []
+    }
+    for scenario in args.scenarios:
+        for symbols in args.symbols:
+            for bars in args.bars:
+                result = await run_scenario(scenario, config, symbols, bars, args.cycles, args.seed, not args.no_memory)
+                report['results'].append(result)
+                print(f"{scenario:<14} {symbols:>5} symbols {bars:>6} bars  {result['wall_time']:8.2f}s"
+                      f"{'  ERROR ' + result['error'] if 'error' in result else ''}"
+                      f"{'  LOGGED ERRORS ' + str(result['logged_errors']['count']) if result['logged_errors']['count'] else ''}")
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            for line in compare(report, json.load(f)):
+                print(line)
+    return report
+
+if __name__ == '__main__':
+    asyncio.run(main())
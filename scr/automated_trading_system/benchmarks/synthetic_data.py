@@ -0,0 +1,41 @@
+# File: benchmarks/synthetic_data.py
+
+from typing import Dict, Any, List
+import numpy as np
+
+BAR_INTERVAL = 300  # seconds, matches the 5 minute bars the providers return
+START_TIMESTAMP = 1704186000  # 2024-01-02 09:00 UTC
+
+def generate_ohlcv(bars: int, seed: int, start_price: float = 100.0) -> Dict[str, np.ndarray]:
+    # Geometric random walk with intrabar ranges and lognormal volume, reproducible per seed
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0, 0.002, bars)
+    close = start_price * np.exp(np.cumsum(returns))
+    open_ = np.concatenate([[start_price], close[:-1]])
+    spread = np.abs(rng.normal(0.0, 0.001, bars)) * close
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = rng.lognormal(mean=10.0, sigma=0.5, size=bars).round()
+    timestamp = START_TIMESTAMP + BAR_INTERVAL * np.arange(bars, dtype=np.int64)
+    return {'timestamp': timestamp, 'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume}
+
+def generate_watchlist(symbols: int, bars: int, seed: int = 42) -> Dict[str, Dict[str, np.ndarray]]:
+    rng = np.random.default_rng(seed)
+    start_prices = rng.uniform(10.0, 500.0, symbols)
+    return {f"SYM{index:04d}": generate_ohlcv(bars, seed + index + 1, start_prices[index]) for index in range(symbols)}
+
+def generate_news(symbol: str, count: int = 5) -> List[Dict[str, Any]]:
+    return [{'symbol': symbol, 'title': f"{symbol} headline {index}", 'content': f"Synthetic news item {index} about {symbol}."}
+            for index in range(count)]
+
+def generate_ticks(watchlist: Dict[str, Dict[str, np.ndarray]]) -> List[Dict[str, Any]]:
+    # Each bar replayed as four ticks (open, high, low, close) spread across it, all symbols merged in time order
+    ticks = []
+    step = BAR_INTERVAL // 4
+    for symbol, bars in watchlist.items():
+        for index, timestamp in enumerate(bars['timestamp']):
+            for position, column in enumerate(['open', 'high', 'low', 'close']):
+                ticks.append({'type': 'tick', 'symbol': symbol, 'timestamp': int(timestamp) + position * step,
+                              'price': float(bars[column][index]), 'size': float(bars['volume'][index]) / 4})
+    ticks.sort(key=lambda tick: tick['timestamp'])
+    return ticks
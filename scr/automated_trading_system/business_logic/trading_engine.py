@@ -1,4 +1,5 @@
 import asyncio
+import time
 from typing import Dict, Any, List
 from infrastructure.logging_service import LoggingService
 from analysis.main_analysis import MainAnalysis
@@ -8,12 +9,12 @@ from decision_making.decision_engine import DecisionEngine
 from order_execution.smart_order_router import SmartOrderRouter
 from data.stock_data_manager import StockDataManager
 from data.stock_watchlist import StockWatchlist
-from data.enhanced_vector_database import EnhancedVectorDatabase
+from data.vector_database import EnhancedVectorDatabase
 from repositories.config_repository import ConfigRepository
 from business_logic.trading_strategy_interface import TradingStrategy, CombinedStrategy
 from infrastructure.messaging import MessageBroker
 from decision_making.risk_management import RiskManagement
-from ai_analysis.ai_performance_tracker import PerformanceTracker
+from ai_analysis.ai_performance_tracker import AIPerformanceTracker
 
 class TradingEngine:
     def __init__(self, config_repository: ConfigRepository, logging_service: LoggingService, 
@@ -22,7 +23,7 @@ class TradingEngine:
                  stock_data_manager: StockDataManager, stock_watchlist: StockWatchlist,
                  vector_database: EnhancedVectorDatabase, strategies: List[TradingStrategy], 
                  message_broker: MessageBroker, risk_management: RiskManagement,
-                 performance_tracker: PerformanceTracker, post_trade_analysis: PostTradeAnalysis):
+                 performance_tracker: AIPerformanceTracker, post_trade_analysis: PostTradeAnalysis):
         self.config_repository = config_repository
         self.logging_service = logging_service
         self.main_analysis = main_analysis
@@ -39,6 +40,8 @@ class TradingEngine:
         self.post_trade_analysis = post_trade_analysis
         self.config = {}
         self.is_running = False
+        self.cycle_stats: Dict[str, Any] = {}
+        self.position_symbols = set()
 
     async def initialize(self):
         try:
@@ -70,21 +73,85 @@ class TradingEngine:
     async def trading_cycle(self):
         try:
             active_stocks = self.stock_watchlist.get_active_stocks()
-            
-            for symbol in active_stocks:
-                await self.process_stock(symbol)
+            cycle_start = time.monotonic()
+            self.main_analysis.begin_cycle()
+            self.stock_data_manager.set_priority_symbols(self.position_symbols)
+            if self.config.get('batch_analysis', False):
+                await self.run_batch_analysis(active_stocks)
+
+            if self.config.get('concurrent_cycle', False):
+                stats = await self.process_stocks_concurrently(active_stocks)
+            else:
+                stats = {'symbols': len(active_stocks), 'pool_size': 1, 'failed': 0, 'timed_out': 0, 'saturated': 0}
+                for symbol in active_stocks:
+                    if not await self.process_stock(symbol):
+                        stats['failed'] += 1
+
+            elapsed = time.monotonic() - cycle_start
+            stats['duration'] = elapsed
+            stats['throughput'] = stats['symbols'] / elapsed if elapsed > 0 else 0.0
+            stats['indicator_cache'] = self.main_analysis.get_indicator_cache_stats()
+            stats['rate_limiter'] = self.stock_data_manager.get_rate_limiter_stats()
+            stats['market_data_cache'] = self.stock_data_manager.get_cache_stats()
+            self.cycle_stats = stats
+            await self.logging_service.log_info(
+                f"Trading cycle processed {stats['symbols']} symbols in {elapsed:.2f}s "
+                f"({stats['throughput']:.2f} symbols/sec, pool size {stats['pool_size']}, "
+                f"{stats['saturated']} saturated, {stats['failed']} failed, {stats['timed_out']} timed out)"
+            )
 
             await self.post_cycle_tasks()
         except Exception as e:
             await self.logging_service.log_error(f"Error in trading cycle: {str(e)}")
 
+    async def run_batch_analysis(self, symbols: List[str]):
+        # Failed fetches are left to process_stock, which reports them per symbol
+        fetched = await asyncio.gather(*(self.stock_data_manager.get_stock_data(symbol) for symbol in symbols), return_exceptions=True)
+        market_data_by_symbol = {symbol: data for symbol, data in zip(symbols, fetched) if not isinstance(data, Exception)}
+        await self.main_analysis.analyze_batch(market_data_by_symbol)
+
+    async def process_stocks_concurrently(self, symbols: List[str]) -> Dict[str, Any]:
+        pool_size = self._get_cycle_pool_size()
+        symbol_timeout = self.config.get('symbol_timeout') or self.config.get('trading_interval') or 60
+        semaphore = asyncio.Semaphore(pool_size)
+        stats = {'symbols': len(symbols), 'pool_size': pool_size, 'failed': 0, 'timed_out': 0,
+                 'saturated': 0, 'max_queue_wait': 0.0}
+
+        async def run_symbol(symbol: str):
+            queued_at = time.monotonic()
+            # A symbol is saturated when every worker slot is busy at the time it is scheduled
+            if semaphore.locked():
+                stats['saturated'] += 1
+            async with semaphore:
+                stats['max_queue_wait'] = max(stats['max_queue_wait'], time.monotonic() - queued_at)
+                try:
+                    if not await asyncio.wait_for(self.process_stock(symbol), timeout=symbol_timeout):
+                        stats['failed'] += 1
+                except asyncio.TimeoutError:
+                    stats['timed_out'] += 1
+                    await self.logging_service.log_error(f"Processing stock {symbol} timed out after {symbol_timeout}s")
+
+        results = await asyncio.gather(*(run_symbol(symbol) for symbol in symbols), return_exceptions=True)
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                stats['failed'] += 1
+                await self.logging_service.log_error(f"Error processing stock {symbol}: {str(result)}")
+        return stats
+
+    def _get_cycle_pool_size(self) -> int:
+        pool_size = self.config.get('max_concurrent_symbols') or self.config.get('max_concurrent_trades') or 10
+        return max(1, int(pool_size))
+
+    def get_cycle_stats(self) -> Dict[str, Any]:
+        return self.cycle_stats
+
     async def process_stock(self, symbol: str):
         try:
             market_data = await self.stock_data_manager.get_stock_data(symbol)
             news_data = await self.stock_data_manager.get_news_data(symbol)
             
             analysis_results = await self.main_analysis.analyze(market_data, news_data)
-            analysis_summary = await self.main_analysis.get_analysis_summary(analysis_results)
+            analysis_summary = analysis_results['summary']
             
             ai_analysis_results = await self.main_ai_analysis.analyze(market_data, news_data, analysis_results)
             
@@ -103,6 +170,10 @@ class TradingEngine:
             if risk_adjusted_decision['action'] != 'HOLD':
                 order_result = await self.smart_order_router.route_order(risk_adjusted_decision)
                 await self.logging_service.log_info(f"Order executed for {symbol}: {order_result}")
+                if risk_adjusted_decision['action'] == 'BUY':
+                    self.position_symbols.add(symbol)
+                elif risk_adjusted_decision['action'] == 'SELL':
+                    self.position_symbols.discard(symbol)
 
                 await self.performance_tracker.track_performance(symbol, risk_adjusted_decision, order_result)
                 
@@ -111,6 +182,7 @@ class TradingEngine:
                     'symbol': symbol,
                     'timestamp': market_data['timestamp'][-1],
                     'action': risk_adjusted_decision['action'],
+                    'market_regime': analysis_results.get('advanced', {}).get('market_regime'),
                     'outcome': order_result['outcome']
                 }
                 await self.vector_database.store_vector(analysis_results['vector'], vector_metadata)
@@ -124,8 +196,10 @@ class TradingEngine:
 
                 await self.perform_post_trade_analysis(combined_data, order_result)
 
+            return True
         except Exception as e:
             await self.logging_service.log_error(f"Error processing stock {symbol}: {str(e)}")
+            return False
 
     async def perform_post_trade_analysis(self, trade_data: Dict[str, Any], order_result: Dict[str, Any]):
         try:
@@ -168,6 +242,7 @@ class TradingEngine:
         await self.logging_service.log_info("Trading engine shutting down...")
         self.is_running = False
         await self.stock_data_manager.close()
+        await self.main_analysis.close()
         await self.vector_database.close()
         await self.message_broker.close()
         await self.logging_service.log_info("Trading engine shut down successfully")
\ No newline at end of file
@@ -1,8 +1,11 @@
 from .data_fetcher import DataFetcher
 from .stock_data_manager import StockDataManager
-from .vector_database import VectorDatabase
+from .vector_database import EnhancedVectorDatabase
 from .vector_database_enhancement import VectorDatabaseEnhancement
 from .stock_watchlist import StockWatchlist
+from .bar_store import BarStore
+from .historical_store import HistoricalStore
+from .vector_index import LocalVectorIndex
 
-__all__ = ['DataFetcher', 'StockDataManager', 'VectorDatabase', 
-           'VectorDatabaseEnhancement', 'StockWatchlist']
+__all__ = ['DataFetcher', 'StockDataManager', 'EnhancedVectorDatabase', 
+           'VectorDatabaseEnhancement', 'StockWatchlist', 'BarStore', 'HistoricalStore', 'LocalVectorIndex']
@@ -0,0 +1,175 @@
+from typing import Dict, Any, List, Optional
+import numpy as np
+import pandas as pd
+
+BAR_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+# Epochs at or above these magnitudes are in nanoseconds, microseconds or milliseconds; seconds
+# stay below 1e11 until the year 5138
+EPOCH_SCALES = [(1e17, 10 ** 9), (1e14, 10 ** 6), (1e11, 10 ** 3)]
+
+def to_epoch_seconds(timestamp: Any) -> int:
+    # Numbers are epochs (seconds, or ms/us/ns detected by size); anything else is parsed as a date.
+    # pd.Timestamp would read a bare number as nanoseconds.
+    if isinstance(timestamp, (int, float, np.integer, np.floating)) and not isinstance(timestamp, bool):
+        for threshold, scale in EPOCH_SCALES:
+            if abs(timestamp) >= threshold:
+                return int(timestamp // scale)
+        return int(timestamp)
+    return int(pd.Timestamp(timestamp).timestamp())
+
+class BarBuffer:
+    # Fixed-capacity ring buffer. Every bar is written twice (slot and slot + capacity),
+    # so the latest N bars are always one contiguous slice, copied out with one memcpy per column.
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.timestamps = np.zeros(2 * capacity, dtype=np.int64)
+        self.values = {column: np.zeros(2 * capacity, dtype=np.float64) for column in BAR_COLUMNS}
+        self.count = 0
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        return int(self.timestamps[self._slot(self.count - 1) + self.capacity]) if self.count else None
+
+    def _slot(self, index: int) -> int:
+        return index % self.capacity
+
+    def _write(self, slot: int, timestamp: int, bar: Dict[str, float]):
+        for position in (slot, slot + self.capacity):
+            self.timestamps[position] = timestamp
+            for column in BAR_COLUMNS:
+                self.values[column][position] = bar[column]
+
+    def append(self, timestamp: int, bar: Dict[str, float]) -> str:
+        last_timestamp = self.last_timestamp
+        if last_timestamp is not None and timestamp < last_timestamp:
+            return 'stale'
+        if last_timestamp is not None and timestamp == last_timestamp:
+            # Providers report the forming bar repeatedly; revise it in place
+            self._write(self._slot(self.count - 1), timestamp, bar)
+            return 'revised'
+        self._write(self._slot(self.count), timestamp, bar)
+        self.count += 1
+        return 'appended'
+
+    def extend(self, timestamps: np.ndarray, bars: Dict[str, np.ndarray]) -> int:
+        # Bulk load of bars newer than the last stored one, written with slice assignments
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        last_timestamp = self.last_timestamp
+        keep = slice(None) if last_timestamp is None else timestamps > last_timestamp
+        timestamps = timestamps[keep][-self.capacity:]
+        columns = {column: np.asarray(bars[column], dtype=np.float64)[keep][-self.capacity:] for column in BAR_COLUMNS}
+        slots = (self.count + np.arange(len(timestamps))) % self.capacity
+        for base in (0, self.capacity):
+            self.timestamps[slots + base] = timestamps
+            for column in BAR_COLUMNS:
+                self.values[column][slots + base] = columns[column]
+        self.count += len(timestamps)
+        return len(timestamps)
+
+    def latest(self, n: int = None, copy: bool = True) -> Dict[str, np.ndarray]:
+        # Appends can land mid-analysis (background revalidation, streamed bars, executor threads) and
+        # overwrite slots after wraparound, so callers get copies. Views (copy=False) are only safe
+        # when consumed before the next append for this symbol.
+        size = len(self) if n is None else min(n, len(self))
+        end = self._slot(self.count - 1) + self.capacity + 1 if self.count else 0
+        start = end - size
+        bars = {'timestamp': self.timestamps[start:end]}
+        for column in BAR_COLUMNS:
+            bars[column] = self.values[column][start:end]
+        if copy:
+            return {column: values.copy() for column, values in bars.items()}
+        for view in bars.values():
+            view.flags.writeable = False
+        return bars
+
+    def nbytes(self) -> int:
+        return self.timestamps.nbytes + sum(values.nbytes for values in self.values.values())
+
+class BarStore:
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.capacity = config.get('bar_store_capacity', 1000)
+        self.buffers: Dict[str, BarBuffer] = {}
+        self.stats = {'appended': 0, 'revised': 0, 'stale': 0}
+
+    def append(self, symbol: str, timestamp: Any, bar: Dict[str, float]) -> str:
+        if symbol not in self.buffers:
+            self.buffers[symbol] = BarBuffer(self.capacity)
+        outcome = self.buffers[symbol].append(to_epoch_seconds(timestamp), bar)
+        self.stats[outcome] += 1
+        return outcome
+
+    def extend(self, symbol: str, timestamps: Any, bars: Dict[str, Any]) -> int:
+        if symbol not in self.buffers:
+            self.buffers[symbol] = BarBuffer(self.capacity)
+        appended = self.buffers[symbol].extend(timestamps, bars)
+        self.stats['appended'] += appended
+        return appended
+
+    def merge(self, symbol: str, bars: Dict[str, Any]) -> Dict[str, int]:
+        # Delta fetches start at the forming bar: revise it in place, then append whatever is newer
+        last_timestamp = self.last_timestamp(symbol)
+        timestamps = np.asarray(bars['timestamp'], dtype=np.int64)
+        counts = {'revised': 0, 'appended': 0}
+        if last_timestamp is not None:
+            forming = np.flatnonzero(timestamps == last_timestamp)
+            if len(forming):
+                index = forming[-1]
+                self.append(symbol, last_timestamp, {column: float(bars[column][index]) for column in BAR_COLUMNS})
+                counts['revised'] = 1
+        counts['appended'] = self.extend(symbol, timestamps, bars)
+        return counts
+
+    def last_timestamp(self, symbol: str) -> Optional[int]:
+        return self.buffers[symbol].last_timestamp if symbol in self.buffers else None
+
+    def append_snapshot(self, symbol: str, snapshot: Dict[str, Any]) -> Optional[str]:
+        # Provider snapshots carry the latest bar as scalars, with the close in 'price'. Providers
+        # that return the session's bars as columns in 'bars' seed the buffer with all of them on
+        # first sight, and fill any bars missed between polls after that.
+        if snapshot.get('bars') is not None:
+            counts = self.merge(symbol, snapshot['bars'])
+            if counts['appended']:
+                return 'appended'
+            return 'revised' if counts['revised'] else 'stale'
+        bar = {column: snapshot.get(column) for column in BAR_COLUMNS}
+        if bar['close'] is None:
+            bar['close'] = snapshot.get('price')
+        if snapshot.get('timestamp') is None or any(value is None for value in bar.values()):
+            return None
+        return self.append(symbol, snapshot['timestamp'], {column: float(value) for column, value in bar.items()})
+
+    def get_bars(self, symbol: str, n: int = None, copy: bool = True) -> Dict[str, np.ndarray]:
+        return self.buffers[symbol].latest(n, copy)
+
+    def get_market_data(self, symbol: str, n: int = None) -> Dict[str, Any]:
+        bars = self.get_bars(symbol, n)
+        market_data = {'symbol': symbol, 'price': float(bars['close'][-1]), 'time_series': bars['close']}
+        market_data.update(bars)
+        return market_data
+
+    def has_bars(self, symbol: str) -> bool:
+        return symbol in self.buffers and len(self.buffers[symbol]) > 0
+
+    def covers(self, symbol: str, length: int) -> bool:
+        # Whether the buffer holds at least `length` bars, or is full
+        return self.has_bars(symbol) and len(self.buffers[symbol]) >= min(length, self.capacity)
+
+    def remove(self, symbol: str):
+        self.buffers.pop(symbol, None)
+
+    def symbols(self) -> List[str]:
+        return list(self.buffers.keys())
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'symbols': len(self.buffers),
+            'capacity': self.capacity,
+            'bars': sum(len(buffer) for buffer in self.buffers.values()),
+            'memory_bytes': sum(buffer.nbytes() for buffer in self.buffers.values()),
+            **self.stats
+        }
@@ -1,25 +1,46 @@
-from typing import Dict, Any
+from typing import Dict, Any, List
 from infrastructure.logging_service import LoggingService
-from .data_provider_strategy import DataProviderStrategy, AlphaVantageStrategy, YahooFinanceStrategy, BrokerAPIStrategy
+from infrastructure.http_session_pool import HttpSessionPool
+from infrastructure.blocking_executor import BlockingExecutor
+from infrastructure.market_data_subject import MarketDataSubject, Observer
+from .rate_limiter import TokenBucketRateLimiter
+from .data_provider_strategy import (DataProviderStrategy, AlphaVantageStrategy, YahooFinanceStrategy, BrokerAPIStrategy,
+                                     HistoryNotSupportedError)
+from .streaming_provider import StreamingStrategy
 
 class DataFetcher:
     def __init__(self, config: Dict[str, Any], logging_service: LoggingService):
         self.config = config
         self.logging_service = logging_service
         self.data_provider: DataProviderStrategy = None
+        self.session_pool = HttpSessionPool(config.get('http_pool', {}))
+        self.rate_limiter: TokenBucketRateLimiter = None
+        # Streaming providers push closed bars to this subject's observers
+        self.market_data_subject = MarketDataSubject()
 
     async def initialize(self):
-        provider_config = self.config['data_provider']
-        provider_type = provider_config['type']
+        # settings_yaml names the block stock_data_api with a `provider` key; data_provider/type is the older layout
+        provider_config = self.config.get('data_provider') or self.config['stock_data_api']
+        provider_type = provider_config.get('type', provider_config.get('provider'))
         if provider_type == 'alpha_vantage':
-            self.data_provider = AlphaVantageStrategy(provider_config['api_key'])
+            # Open the pooled session up front so the first cycle doesn't pay for it
+            await self.session_pool.get_session()
+            self.data_provider = AlphaVantageStrategy(provider_config['api_key'], self.session_pool)
         elif provider_type == 'yahoo_finance':
-            self.data_provider = YahooFinanceStrategy()
+            self.data_provider = YahooFinanceStrategy(provider_config.get('batch_size', 100),
+                                                      BlockingExecutor.from_config(self.config, 'yfinance'))
         elif provider_type == 'broker_api':
             broker_api = self.config['broker_api']
             self.data_provider = BrokerAPIStrategy(broker_api)
+        elif provider_type == 'streaming':
+            self.data_provider = StreamingStrategy(provider_config['url'], self.market_data_subject, self.session_pool,
+                                                   provider_config.get('bar_seconds', 300), logging_service=self.logging_service)
         else:
             raise ValueError(f"Unsupported data provider: {provider_type}")
+        if provider_config.get('max_requests_per_minute'):
+            self.rate_limiter = TokenBucketRateLimiter(provider_config['max_requests_per_minute'],
+                                                       provider_config.get('rate_limit_burst', 1))
+            self.data_provider.rate_limiter = self.rate_limiter
         await self.logging_service.log_info(f"DataFetcher initialized with {provider_type} provider")
 
     async def fetch_data(self, symbol: str) -> Dict[str, Any]:
@@ -29,7 +50,62 @@ class DataFetcher:
             await self.logging_service.log_error(f"Error fetching data for {symbol}: {str(e)}")
             raise
 
+    async def subscribe(self, symbols: List[str], observer: Observer = None):
+        # No-op for polling providers
+        if hasattr(self.data_provider, 'subscribe'):
+            if observer is not None:
+                self.market_data_subject.attach(observer)
+            await self.data_provider.subscribe(symbols)
+
+    async def unsubscribe(self, symbols: List[str]):
+        if hasattr(self.data_provider, 'unsubscribe'):
+            await self.data_provider.unsubscribe(symbols)
+
+    async def fetch_bars_since(self, symbol: str, since: int = None) -> Dict[str, Any]:
+        try:
+            return await self.data_provider.fetch_bars_since(symbol, since)
+        except Exception as e:
+            await self.logging_service.log_error(f"Error fetching new bars for {symbol}: {str(e)}")
+            raise
+
+    @property
+    def supports_history(self) -> bool:
+        return self.data_provider is not None and self.data_provider.supports_history
+
+    async def fetch_history(self, symbol: str, start: int, end: int, interval: str) -> Dict[str, Any]:
+        try:
+            if not self.supports_history:
+                raise HistoryNotSupportedError(f"{type(self.data_provider).__name__} does not provide historical data")
+            return await self.data_provider.fetch_history(symbol, start, end, interval)
+        except Exception as e:
+            await self.logging_service.log_error(f"Error fetching history for {symbol}: {str(e)}")
+            raise
+
+    async def fetch_many(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        try:
+            results = await self.data_provider.fetch_many(symbols, self.config.get('fetch_many_concurrency', 10))
+        except Exception as e:
+            await self.logging_service.log_error(f"Error fetching data for {len(symbols)} symbols: {str(e)}")
+            raise
+        failed = {symbol: result for symbol, result in results.items() if isinstance(result, Exception)}
+        if failed:
+            await self.logging_service.log_error(
+                f"Error fetching data for {len(failed)} of {len(symbols)} symbols: "
+                + ", ".join(f"{symbol}: {str(error)}" for symbol, error in failed.items()))
+        return {symbol: result for symbol, result in results.items() if not isinstance(result, Exception)}
+
+    def set_priority_symbols(self, symbols: List[str]):
+        if self.rate_limiter is not None:
+            self.rate_limiter.set_priority_symbols(symbols)
+
+    def get_rate_limiter_stats(self) -> Dict[str, Any]:
+        return self.rate_limiter.get_stats() if self.rate_limiter is not None else {}
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        return self.session_pool.get_stats()
+
     async def close(self):
         if hasattr(self.data_provider, 'close'):
             await self.data_provider.close()
+        await self.session_pool.close()
         await self.logging_service.log_info("DataFetcher closed")
\ No newline at end of file
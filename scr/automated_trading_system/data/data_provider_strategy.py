@@ -1,17 +1,93 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
-import aiohttp
+from typing import Dict, Any, List
+import asyncio
+import numpy as np
+import pandas as pd
 import yfinance as yf
+from infrastructure.http_session_pool import HttpSessionPool
+from infrastructure.blocking_executor import BlockingExecutor
+from .rate_limiter import TokenBucketRateLimiter
+from .bar_store import to_epoch_seconds
+
+class HistoryNotSupportedError(Exception):
+    pass
 
 class DataProviderStrategy(ABC):
+    # Set by DataFetcher when the provider config has max_requests_per_minute
+    rate_limiter: TokenBucketRateLimiter = None
+    # Providers with a ranged history query set this and implement fetch_history(symbol, start, end, interval),
+    # returning bars in [start, end) epoch seconds as columnar arrays: timestamp, open, high, low, close, volume
+    supports_history: bool = False
+
+    async def _throttle(self, symbols: List[str]):
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_for(symbols)
+
     @abstractmethod
     async def fetch_data(self, symbol: str) -> Dict[str, Any]:
         pass
 
+    async def fetch_many(self, symbols: List[str], max_concurrency: int = 10) -> Dict[str, Any]:
+        # Providers without a batch endpoint fall back to bounded concurrent single fetches.
+        # Failed symbols map to their exception so one bad ticker doesn't sink the batch.
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fetch(symbol: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.fetch_data(symbol)
+
+        results = await asyncio.gather(*(fetch(symbol) for symbol in symbols), return_exceptions=True)
+        return dict(zip(symbols, results))
+
+    async def fetch_bars_since(self, symbol: str, since: int = None) -> Dict[str, np.ndarray]:
+        # Intraday bars with timestamp >= since; the bar at `since` is the one still forming.
+        # Providers without a ranged query fall back to the latest bar of a regular snapshot.
+        snapshot = await self.fetch_data(symbol)
+        bars = {'timestamp': np.array([to_epoch_seconds(snapshot['timestamp'])], dtype=np.int64)}
+        for column in ['open', 'high', 'low', 'volume']:
+            bars[column] = np.array([snapshot[column]], dtype=np.float64)
+        bars['close'] = np.array([snapshot['price']], dtype=np.float64)
+        return trim_bars(bars, since)
+
+def trim_bars(bars: Dict[str, np.ndarray], since: int = None) -> Dict[str, np.ndarray]:
+    if since is None:
+        return bars
+    keep = bars['timestamp'] >= since
+    return {column: values[keep] for column, values in bars.items()}
+
+def series_to_bars(time_series: Dict[str, Dict[str, str]], since: int = None) -> Dict[str, np.ndarray]:
+    # Alpha Vantage series are newest first; parsing stops at the first bar older than `since`
+    rows = []
+    for timestamp, candle in time_series.items():
+        timestamp = to_epoch_seconds(timestamp)
+        if since is not None and timestamp < since:
+            break
+        rows.append((timestamp, candle))
+    rows.reverse()
+    bars = {'timestamp': np.array([timestamp for timestamp, _ in rows], dtype=np.int64)}
+    for column, key in [('open', '1. open'), ('high', '2. high'), ('low', '3. low'), ('close', '4. close'), ('volume', '5. volume')]:
+        bars[column] = np.array([float(candle[key]) for _, candle in rows], dtype=np.float64)
+    return bars
+
+def frame_to_bars(history: pd.DataFrame) -> Dict[str, np.ndarray]:
+    timestamps = pd.DatetimeIndex(history.index)
+    if timestamps.tz is not None:
+        timestamps = timestamps.tz_convert('UTC').tz_localize(None)
+    # Via datetime64[s] because pandas 2 indexes are not always nanosecond resolution
+    bars = {'timestamp': np.asarray(timestamps, dtype='datetime64[s]').astype(np.int64)}
+    for column in ['Open', 'High', 'Low', 'Close', 'Volume']:
+        bars[column.lower()] = history[column].to_numpy(dtype=np.float64)
+    return bars
+
 class AlphaVantageStrategy(DataProviderStrategy):
-    def __init__(self, api_key: str):
+    supports_history = True
+
+    def __init__(self, api_key: str, session_pool: HttpSessionPool = None):
         self.api_key = api_key
         self.base_url = "https://www.alphavantage.co/query"
+        # DataFetcher passes its shared pool; a standalone strategy owns (and closes) its own
+        self.owns_session_pool = session_pool is None
+        self.session_pool = session_pool or HttpSessionPool({})
 
     async def fetch_data(self, symbol: str) -> Dict[str, Any]:
         params = {
@@ -20,29 +96,126 @@ class AlphaVantageStrategy(DataProviderStrategy):
             "interval": "5min",
             "apikey": self.api_key
         }
-        async with aiohttp.ClientSession() as session:
-            async with session.get(self.base_url, params=params) as response:
-                data = await response.json()
-                if "Time Series (5min)" in data:
-                    time_series = data["Time Series (5min)"]
-                    latest_data = next(iter(time_series.values()))
-                    return {
-                        "symbol": symbol,
-                        "price": float(latest_data["4. close"]),
-                        "volume": int(latest_data["5. volume"]),
-                        "timestamp": next(iter(time_series)),
-                        "open": float(latest_data["1. open"]),
-                        "high": float(latest_data["2. high"]),
-                        "low": float(latest_data["3. low"]),
-                        "time_series": [float(candle["4. close"]) for candle in time_series.values()]
-                    }
-                else:
-                    raise ValueError(f"Failed to fetch data for {symbol}")
+        await self._throttle([symbol])
+        session = await self.session_pool.get_session()
+        async with session.get(self.base_url, params=params) as response:
+            data = await response.json()
+            if "Time Series (5min)" in data:
+                time_series = data["Time Series (5min)"]
+                latest_data = next(iter(time_series.values()))
+                return {
+                    "symbol": symbol,
+                    "price": float(latest_data["4. close"]),
+                    "volume": int(latest_data["5. volume"]),
+                    "timestamp": next(iter(time_series)),
+                    "open": float(latest_data["1. open"]),
+                    "high": float(latest_data["2. high"]),
+                    "low": float(latest_data["3. low"]),
+                    "time_series": [float(candle["4. close"]) for candle in time_series.values()],
+                    "bars": series_to_bars(time_series)
+                }
+            else:
+                raise ValueError(f"Failed to fetch data for {symbol}")
+
+    async def fetch_bars_since(self, symbol: str, since: int = None) -> Dict[str, np.ndarray]:
+        params = {
+            "function": "TIME_SERIES_INTRADAY",
+            "symbol": symbol,
+            "interval": "5min",
+            "outputsize": "compact",
+            "apikey": self.api_key
+        }
+        await self._throttle([symbol])
+        session = await self.session_pool.get_session()
+        async with session.get(self.base_url, params=params) as response:
+            data = await response.json()
+        if "Time Series (5min)" not in data:
+            raise ValueError(f"Failed to fetch data for {symbol}")
+        return series_to_bars(data["Time Series (5min)"], since)
+
+    async def fetch_history(self, symbol: str, start: int, end: int, interval: str) -> Dict[str, np.ndarray]:
+        if interval != '1d':
+            raise ValueError(f"Unsupported Alpha Vantage history interval: {interval}")
+        params = {
+            "function": "TIME_SERIES_DAILY",
+            "symbol": symbol,
+            "outputsize": "full",
+            "apikey": self.api_key
+        }
+        await self._throttle([symbol])
+        session = await self.session_pool.get_session()
+        async with session.get(self.base_url, params=params) as response:
+            data = await response.json()
+        if "Time Series (Daily)" not in data:
+            raise ValueError(f"Failed to fetch history for {symbol}")
+        history = pd.DataFrame.from_dict(data["Time Series (Daily)"], orient='index', dtype=float)
+        history.index = pd.to_datetime(history.index)
+        history = history.rename(columns=lambda column: column.split('. ')[1].capitalize()).sort_index()
+        bars = frame_to_bars(history)
+        in_range = (bars['timestamp'] >= start) & (bars['timestamp'] < end)
+        return {column: values[in_range] for column, values in bars.items()}
+
+    async def close(self):
+        if self.owns_session_pool:
+            await self.session_pool.close()
 
 class YahooFinanceStrategy(DataProviderStrategy):
+    supports_history = True
+
+    def __init__(self, batch_size: int = 100, executor: BlockingExecutor = None):
+        self.batch_size = batch_size
+        # yfinance is synchronous; its calls run on a dedicated pool instead of the event loop
+        self.executor = executor or BlockingExecutor('yfinance')
+
     async def fetch_data(self, symbol: str) -> Dict[str, Any]:
+        await self._throttle([symbol])
+        history = await self.executor.run(self._history, symbol)
+        return self._to_snapshot(symbol, history)
+
+    def _history(self, symbol: str) -> pd.DataFrame:
         stock = yf.Ticker(symbol)
-        history = stock.history(period="1d", interval="5m")
+        return stock.history(period="1d", interval="5m")
+
+    async def fetch_bars_since(self, symbol: str, since: int = None) -> Dict[str, np.ndarray]:
+        # Ask Yahoo only for bars from the forming one onwards instead of the whole session
+        await self._throttle([symbol])
+        if since is None:
+            history = await self.executor.run(self._history, symbol)
+        else:
+            history = await self.executor.run(yf.Ticker(symbol).history, start=pd.Timestamp(since, unit='s', tz='UTC'), interval="5m")
+        return trim_bars(frame_to_bars(history), since)
+
+    async def fetch_history(self, symbol: str, start: int, end: int, interval: str) -> Dict[str, np.ndarray]:
+        await self._throttle([symbol])
+        history = await self.executor.run(yf.Ticker(symbol).history, start=pd.Timestamp(start, unit='s', tz='UTC'),
+                                          end=pd.Timestamp(end, unit='s', tz='UTC'), interval=interval)
+        return frame_to_bars(history)
+
+    async def fetch_many(self, symbols: List[str], max_concurrency: int = 10) -> Dict[str, Any]:
+        # One multi-ticker download per batch instead of one history request per symbol
+        results = {}
+        for start in range(0, len(symbols), self.batch_size):
+            batch = symbols[start:start + self.batch_size]
+            await self._throttle(batch)
+            history = await self.executor.run(yf.download, batch, period="1d", interval="5m", group_by='ticker',
+                                              threads=max_concurrency, progress=False)
+            for symbol in batch:
+                try:
+                    symbol_history = history[symbol] if isinstance(history.columns, pd.MultiIndex) else history
+                    results[symbol] = self._to_snapshot(symbol, symbol_history.dropna(how='all'))
+                except Exception as e:
+                    results[symbol] = e
+        return results
+
+    def get_executor_stats(self) -> Dict[str, Any]:
+        return self.executor.get_stats()
+
+    async def close(self):
+        self.executor.shutdown(wait=False)
+
+    def _to_snapshot(self, symbol: str, history: pd.DataFrame) -> Dict[str, Any]:
+        if history is None or history.empty:
+            raise ValueError(f"Failed to fetch data for {symbol}")
         latest_data = history.iloc[-1]
         return {
             "symbol": symbol,
@@ -52,7 +225,8 @@ class YahooFinanceStrategy(DataProviderStrategy):
             "open": latest_data["Open"],
             "high": latest_data["High"],
             "low": latest_data["Low"],
-            "time_series": history["Close"].tolist()
+            "time_series": history["Close"].tolist(),
+            "bars": frame_to_bars(history)
         }
 
 class BrokerAPIStrategy(DataProviderStrategy):
@@ -62,7 +236,41 @@ class BrokerAPIStrategy(DataProviderStrategy):
     async def fetch_data(self, symbol: str) -> Dict[str, Any]:
         # This implementation will depend on the specific broker API
         # Here's a placeholder implementation
+        await self._throttle([symbol])
         data = await self.broker_api.get_stock_data(symbol)
+        return self._to_snapshot(symbol, data)
+
+    async def fetch_many(self, symbols: List[str], max_concurrency: int = 10) -> Dict[str, Any]:
+        # Use the broker's multi-symbol quote endpoint when it has one
+        if not hasattr(self.broker_api, 'get_stocks_data'):
+            return await super().fetch_many(symbols, max_concurrency)
+        await self._throttle(symbols)
+        data = await self.broker_api.get_stocks_data(symbols)
+        results = {}
+        for symbol in symbols:
+            if symbol in data:
+                results[symbol] = self._to_snapshot(symbol, data[symbol])
+            else:
+                results[symbol] = ValueError(f"Failed to fetch data for {symbol}")
+        return results
+
+    @property
+    def supports_history(self) -> bool:
+        # Brokers without a bar-history endpoint have no history path
+        return hasattr(self.broker_api, 'get_stock_history')
+
+    async def fetch_history(self, symbol: str, start: int, end: int, interval: str) -> Dict[str, np.ndarray]:
+        if not self.supports_history:
+            raise HistoryNotSupportedError(f"{type(self.broker_api).__name__} has no bar-history endpoint")
+        await self._throttle([symbol])
+        rows = await self.broker_api.get_stock_history(symbol, start, end, interval)
+        bars = {'timestamp': np.array([to_epoch_seconds(row['timestamp']) for row in rows], dtype=np.int64)}
+        for column in ['open', 'high', 'low', 'close', 'volume']:
+            bars[column] = np.array([row[column] for row in rows], dtype=np.float64)
+        in_range = (bars['timestamp'] >= start) & (bars['timestamp'] < end)
+        return {column: values[in_range] for column, values in bars.items()}
+
+    def _to_snapshot(self, symbol: str, data: Dict[str, Any]) -> Dict[str, Any]:
         return {
             "symbol": symbol,
             "price": data["last_price"],
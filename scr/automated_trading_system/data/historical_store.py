@@ -0,0 +1,151 @@
+from typing import Dict, Any, List, Tuple
+import json
+import os
+import numpy as np
+from .bar_store import BAR_COLUMNS, to_epoch_seconds
+
+HISTORY_COLUMNS = ['timestamp'] + BAR_COLUMNS
+INTERVAL_SECONDS = {'m': 60, 'h': 3600, 'd': 86400, 'wk': 7 * 86400}
+# 1970-01-01 was a Thursday; weekly bars start on Mondays
+WEEK_OFFSET = 4 * 86400
+
+def interval_start(timestamp: int, interval: str) -> int:
+    # Start of the bar containing `timestamp`, e.g. 5m, 1h, 1d, 1wk, 1mo
+    count = int(interval.rstrip('abcdefghijklmnopqrstuvwxyz'))
+    unit = interval[len(str(count)):]
+    if unit == 'mo':
+        months = int(np.datetime64(timestamp, 's').astype('datetime64[M]').astype(np.int64))
+        return int(np.datetime64(months - months % count, 'M').astype('datetime64[s]').astype(np.int64))
+    if unit not in INTERVAL_SECONDS:
+        raise ValueError(f"Unsupported historical interval: {interval}")
+    seconds = INTERVAL_SECONDS[unit] * count
+    offset = WEEK_OFFSET if unit == 'wk' else 0
+    return timestamp - (timestamp - offset) % seconds
+
+def merge_ranges(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+class HistoricalStore:
+    # On-disk bars laid out as <root>/<interval>/<symbol>/<partition>/<column>.npy and read back
+    # memory-mapped. Partitions are calendar days for intraday intervals and years for daily and longer.
+    # coverage.json records the [start, end) ranges already fetched from the provider, including
+    # ranges that had no bars (weekends, holidays), so only real gaps go back to the network.
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.interval = config.get('historical_interval', '1d')
+        self.root = os.path.join(config.get('historical_store_path', 'history'), self.interval)
+        self.partition_unit = config.get('historical_partition', 'D' if self.interval[-1] in 'mh' else 'Y')
+        self.stats = {'reads': 0, 'partitions_read': 0, 'partitions_written': 0, 'bars_written': 0, 'ranges_fetched': 0}
+
+    def closed_until(self, now: int) -> int:
+        # Bars from here on are still forming, so they are never recorded as covered
+        return interval_start(now, self.interval)
+
+    def _symbol_dir(self, symbol: str) -> str:
+        return os.path.join(self.root, symbol)
+
+    def _partitions(self, timestamps: np.ndarray) -> np.ndarray:
+        return np.asarray(timestamps, dtype='datetime64[s]').astype(f'datetime64[{self.partition_unit}]')
+
+    def _partition_dir(self, symbol: str, partition: np.datetime64) -> str:
+        return os.path.join(self._symbol_dir(symbol), np.datetime_as_string(partition))
+
+    def get_coverage(self, symbol: str) -> List[Tuple[int, int]]:
+        path = os.path.join(self._symbol_dir(symbol), 'coverage.json')
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            return [tuple(r) for r in json.load(f)]
+
+    def missing_ranges(self, symbol: str, start: Any, end: Any) -> List[Tuple[int, int]]:
+        start, end = to_epoch_seconds(start), to_epoch_seconds(end)
+        missing = []
+        cursor = start
+        for covered_start, covered_end in self.get_coverage(symbol):
+            if covered_end <= cursor:
+                continue
+            if covered_start >= end:
+                break
+            if covered_start > cursor:
+                missing.append((cursor, covered_start))
+            cursor = max(cursor, covered_end)
+        if cursor < end:
+            missing.append((cursor, end))
+        return missing
+
+    def write(self, symbol: str, bars: Dict[str, np.ndarray], start: Any, end: Any):
+        # Merges the fetched bars into their partitions (newer values win on duplicate timestamps),
+        # then marks [start, end) as covered
+        timestamps = np.asarray(bars['timestamp'], dtype=np.int64)
+        partitions = self._partitions(timestamps)
+        for partition in np.unique(partitions):
+            in_partition = partitions == partition
+            incoming = {column: np.asarray(bars[column])[in_partition] for column in HISTORY_COLUMNS}
+            self._write_partition(symbol, partition, incoming)
+        self.stats['bars_written'] += len(timestamps)
+        self.stats['ranges_fetched'] += 1
+        coverage = merge_ranges(self.get_coverage(symbol) + [(to_epoch_seconds(start), to_epoch_seconds(end))])
+        self._atomic_write(os.path.join(self._symbol_dir(symbol), 'coverage.json'),
+                           lambda f: f.write(json.dumps(coverage).encode()))
+
+    def _write_partition(self, symbol: str, partition: np.datetime64, incoming: Dict[str, np.ndarray]):
+        # Loaded into memory rather than mapped: a mapped file can't be replaced on Windows
+        existing = self._load_partition(symbol, partition, mmap_mode=None)
+        if existing is not None:
+            incoming = {column: np.concatenate([existing[column], incoming[column]]) for column in HISTORY_COLUMNS}
+        order = np.argsort(incoming['timestamp'], kind='stable')
+        timestamps = incoming['timestamp'][order]
+        # After a stable sort the newest copy of a duplicated timestamp is the last one
+        keep = np.append(timestamps[1:] != timestamps[:-1], True)
+        partition_dir = self._partition_dir(symbol, partition)
+        os.makedirs(partition_dir, exist_ok=True)
+        for column in HISTORY_COLUMNS:
+            dtype = np.int64 if column == 'timestamp' else np.float64
+            values = np.ascontiguousarray(incoming[column][order][keep], dtype=dtype)
+            self._atomic_write(os.path.join(partition_dir, f"{column}.npy"), lambda f, values=values: np.save(f, values))
+        self.stats['partitions_written'] += 1
+
+    def _atomic_write(self, path: str, write):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as f:
+            write(f)
+        os.replace(temp_path, path)
+
+    def _load_partition(self, symbol: str, partition: np.datetime64, mmap_mode: str = 'r') -> Dict[str, np.ndarray]:
+        partition_dir = self._partition_dir(symbol, partition)
+        if not os.path.isdir(partition_dir):
+            return None
+        return {column: np.load(os.path.join(partition_dir, f"{column}.npy"), mmap_mode=mmap_mode) for column in HISTORY_COLUMNS}
+
+    def read(self, symbol: str, start: Any, end: Any) -> Dict[str, np.ndarray]:
+        # A range inside one partition comes back as memory-mapped views; longer ranges are concatenated
+        start, end = to_epoch_seconds(start), to_epoch_seconds(end)
+        self.stats['reads'] += 1
+        slices = []
+        first, last = self._partitions([start, end - 1])
+        for key in np.arange(first, last + 1):
+            partition = self._load_partition(symbol, key)
+            if partition is None:
+                continue
+            self.stats['partitions_read'] += 1
+            lo, hi = np.searchsorted(partition['timestamp'], [start, end])
+            if hi > lo:
+                slices.append({column: values[lo:hi] for column, values in partition.items()})
+        if len(slices) == 1:
+            return slices[0]
+        if not slices:
+            return {column: np.array([], dtype=np.int64 if column == 'timestamp' else np.float64) for column in HISTORY_COLUMNS}
+        return {column: np.concatenate([part[column] for part in slices]) for column in HISTORY_COLUMNS}
+
+    def symbols(self) -> List[str]:
+        return sorted(os.listdir(self.root)) if os.path.isdir(self.root) else []
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'path': self.root, 'interval': self.interval, **self.stats}
@@ -0,0 +1,85 @@
+from typing import Dict, Any, List, Tuple, Optional
+from collections import OrderedDict
+import numpy as np
+from tslearn.preprocessing import TimeSeriesScalerMeanVariance
+from tslearn.piecewise import SymbolicAggregateApproximation
+from sklearn.preprocessing import normalize
+
+def pattern_series(data: Dict[str, Any]) -> np.ndarray:
+    # Bar-store market data carries a 'close' array, provider snapshots a 'time_series' list
+    series = data.get('time_series')
+    if series is None:
+        series = data['close']
+    return np.asarray(series, dtype=np.float64)
+
+def series_version(data: Dict[str, Any], series: np.ndarray) -> Tuple:
+    # Cheap fingerprint of the series: a new or revised bar changes at least one of these
+    timestamp = data.get('timestamp')
+    if timestamp is not None and np.ndim(timestamp):
+        timestamp = timestamp[-1] if len(timestamp) else None
+    last_close = float(series[-1]) if len(series) else None
+    return (len(series), timestamp.item() if hasattr(timestamp, 'item') else timestamp, last_close)
+
+class PatternEmbeddingService:
+    # Turns the latest `window` closes into a unit-length SAX pattern vector. Vectors are memoised on
+    # (symbol, window, data version), so the enhancement, analysis and pattern-matching paths share
+    # one encoding per new bar. embed_batch encodes every uncached symbol in one tslearn call.
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.window = config.get('pattern_window', 100)
+        self.max_entries = config.get('pattern_cache_size', 1000)
+        self.scaler = TimeSeriesScalerMeanVariance()
+        self.sax = SymbolicAggregateApproximation(n_segments=config.get('pattern_segments', 10),
+                                                  alphabet_size_avg=config.get('pattern_alphabet_size', 5))
+        self.entries: OrderedDict = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0, 'encode_calls': 0}
+
+    def key(self, data: Dict[str, Any]) -> Optional[Tuple]:
+        symbol = data.get('symbol')
+        if symbol is None:
+            # Without a symbol there is no safe key, so the vector is computed straight through
+            return None
+        return (symbol, self.window, series_version(data, pattern_series(data)))
+
+    def embed(self, data: Dict[str, Any]) -> np.ndarray:
+        return self.embed_batch([data])[0]
+
+    def embed_batch(self, items: List[Dict[str, Any]]) -> List[np.ndarray]:
+        vectors: List[Optional[np.ndarray]] = [None] * len(items)
+        pending: Dict[int, List[Tuple[int, Optional[Tuple], np.ndarray]]] = {}
+        for position, data in enumerate(items):
+            key = self.key(data)
+            if key is not None and key in self.entries:
+                self.entries.move_to_end(key)
+                vectors[position] = self.entries[key]
+                self.stats['hits'] += 1
+                continue
+            self.stats['misses'] += 1
+            window = pattern_series(data)[-self.window:]
+            # tslearn needs equal-length series, so windows are grouped by length (short histories)
+            pending.setdefault(len(window), []).append((position, key, window))
+        for group in pending.values():
+            encoded = self._encode(np.stack([window for _, _, window in group]))
+            for (position, key, _), vector in zip(group, encoded):
+                vectors[position] = vector
+                if key is not None:
+                    self._store(key, vector)
+        return vectors
+
+    def _encode(self, windows: np.ndarray) -> np.ndarray:
+        self.stats['encode_calls'] += 1
+        scaled = self.scaler.fit_transform(windows[:, :, np.newaxis])
+        symbols = self.sax.fit_transform(scaled).reshape(len(windows), -1)
+        vectors = normalize(symbols.astype(np.float64))
+        vectors.flags.writeable = False
+        return vectors
+
+    def _store(self, key: Tuple, vector: np.ndarray):
+        self.entries[key] = vector
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats['hits'] + self.stats['misses']
+        return dict(self.stats, entries=len(self.entries), window=self.window,
+                    hit_rate=self.stats['hits'] / lookups if lookups else 0.0)
@@ -0,0 +1,101 @@
+from typing import Dict, Any, Iterable, List
+import asyncio
+import heapq
+import itertools
+
+PRIORITY_HIGH = 0  # symbols with open positions or pending orders
+PRIORITY_NORMAL = 1  # routine watchlist refreshes
+PRIORITY_NAMES = {PRIORITY_HIGH: 'high', PRIORITY_NORMAL: 'normal'}
+
+EPSILON = 1e-9  # absorbs float drift when a timer fires exactly as a token becomes available
+
+class TokenBucketRateLimiter:
+    # Tokens refill continuously at max_requests_per_minute / 60 per second up to `burst`.
+    # With the default burst of 1 requests are spaced evenly, so the provider's per-minute
+    # quota is used in full without ever being exceeded. Waiters are served by priority, then FIFO.
+    def __init__(self, max_requests_per_minute: int, burst: int = 1):
+        self.max_requests_per_minute = max_requests_per_minute
+        self.rate = max_requests_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated_at = None
+        self.waiters: List[Any] = []
+        self.sequence = itertools.count()
+        self.timer = None
+        self.priority_symbols = set()
+        self.stats = {name: {'acquired': 0, 'queued': 0, 'total_wait': 0.0, 'max_wait': 0.0}
+                      for name in PRIORITY_NAMES.values()}
+
+    def set_priority_symbols(self, symbols: Iterable[str]):
+        self.priority_symbols = set(symbols)
+
+    def priority_for(self, symbols: Iterable[str]) -> int:
+        return PRIORITY_HIGH if any(symbol in self.priority_symbols for symbol in symbols) else PRIORITY_NORMAL
+
+    async def acquire_for(self, symbols: Iterable[str]) -> float:
+        return await self.acquire(self.priority_for(symbols))
+
+    async def acquire(self, priority: int = PRIORITY_NORMAL) -> float:
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        self._refill(started_at)
+        if not self.waiters and self.tokens >= 1 - EPSILON:
+            self.tokens -= 1
+            self._record(priority, 0.0, queued=False)
+            return 0.0
+
+        future = loop.create_future()
+        heapq.heappush(self.waiters, (priority, next(self.sequence), future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # A token granted to a request that was cancelled before it ran goes back to the bucket
+            if future.done() and not future.cancelled():
+                self.tokens = min(self.capacity, self.tokens + 1)
+                self._dispatch()
+            raise
+        wait = loop.time() - started_at
+        self._record(priority, wait, queued=True)
+        return wait
+
+    def _refill(self, now: float):
+        if self.updated_at is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        self._refill(loop.time())
+        while self.waiters and self.tokens >= 1 - EPSILON:
+            _, _, future = heapq.heappop(self.waiters)
+            if future.done():
+                continue
+            self.tokens -= 1
+            future.set_result(None)
+        if self.waiters and self.timer is None:
+            self.timer = loop.call_later(max(0.0, (1 - self.tokens) / self.rate), self._on_timer)
+
+    def _on_timer(self):
+        self.timer = None
+        self._dispatch()
+
+    def _record(self, priority: int, wait: float, queued: bool):
+        stats = self.stats[PRIORITY_NAMES.get(priority, 'normal')]
+        stats['acquired'] += 1
+        if queued:
+            stats['queued'] += 1
+            stats['total_wait'] += wait
+            stats['max_wait'] = max(stats['max_wait'], wait)
+
+    def get_stats(self) -> Dict[str, Any]:
+        priorities = {}
+        for name, stats in self.stats.items():
+            priorities[name] = {**stats, 'avg_wait': stats['total_wait'] / stats['queued'] if stats['queued'] else 0.0}
+        return {
+            'max_requests_per_minute': self.max_requests_per_minute,
+            'burst': self.capacity,
+            'queue_depth': sum(1 for _, _, future in self.waiters if not future.done()),
+            'priority_symbols': len(self.priority_symbols),
+            'priorities': priorities
+        }
@@ -0,0 +1,153 @@
+from typing import Dict, Any, Optional, Callable
+import asyncio
+import json
+import struct
+import uuid
+import numpy as np
+
+HEADER_SIZE = struct.Struct('>I')
+
+def _json_default(value: Any) -> Any:
+    return value.item() if hasattr(value, 'item') else str(value)
+
+def encode_entry(entry: Dict[str, Any]) -> bytes:
+    # A length-prefixed JSON header with the scalar fields, then the raw bytes of every array.
+    # Bar arrays dominate the entry, so they cost 8 bytes per value instead of ~20 as JSON text.
+    arrays = []
+    scalars = {}
+    for name, value in entry['data'].items():
+        if isinstance(value, np.ndarray):
+            arrays.append(('data', name, value))
+        else:
+            scalars[name] = value
+    for name, value in (entry.get('bars') or {}).items():
+        arrays.append(('bars', name, np.asarray(value)))
+    header = {
+        'timestamp': entry['timestamp'],
+        'data': scalars,
+        'bars': entry.get('bars') is not None,
+        'arrays': [[group, name, value.dtype.str, len(value)] for group, name, value in arrays]
+    }
+    encoded_header = json.dumps(header, default=_json_default, separators=(',', ':')).encode('utf-8')
+    return b''.join([HEADER_SIZE.pack(len(encoded_header)), encoded_header] +
+                    [np.ascontiguousarray(value).tobytes() for _, _, value in arrays])
+
+def decode_entry(payload: bytes) -> Dict[str, Any]:
+    # Arrays come back as read-only views over the payload
+    (header_size,) = HEADER_SIZE.unpack_from(payload)
+    offset = HEADER_SIZE.size + header_size
+    header = json.loads(payload[HEADER_SIZE.size:offset].decode('utf-8'))
+    entry = {'timestamp': header['timestamp'], 'data': header['data'], 'bars': {} if header['bars'] else None}
+    for group, name, dtype, length in header['arrays']:
+        values = np.frombuffer(payload, dtype=np.dtype(dtype), count=length, offset=offset)
+        offset += values.nbytes
+        entry[group][name] = values
+    return entry
+
+class SharedMarketDataCache:
+    # Redis tier under each process's in-memory cache, so engine workers share one fetch per symbol.
+    # Every write publishes the symbol on an invalidation channel; the other processes drop their
+    # local copy and read the new entry from Redis on next use. Redis errors are counted and treated
+    # as misses, so an outage degrades to per-process caching instead of failing requests.
+    def __init__(self, config: Dict[str, Any], client: Any = None):
+        self.config = config
+        self.client = client
+        self.key_prefix = config.get('key_prefix', 'market_data:')
+        self.channel = f"{self.key_prefix}invalidate"
+        self.ttl = config.get('ttl', 600)
+        self.resubscribe_delay = config.get('resubscribe_delay', 1.0)
+        self.instance_id = uuid.uuid4().hex
+        self.pubsub = None
+        self.listener: asyncio.Task = None
+        self.stats = {'hits': 0, 'misses': 0, 'writes': 0, 'bytes_written': 0, 'invalidations_sent': 0,
+                      'invalidations_received': 0, 'errors': 0, 'resubscribes': 0}
+
+    async def connect(self, on_invalidate: Callable[[Optional[str]], None]):
+        # on_invalidate gets the symbol another process refreshed, or None when it cleared everything
+        if self.client is None:
+            import redis.asyncio as redis
+            self.client = redis.from_url(self.config.get('url', 'redis://localhost:6379/0'))
+        self.pubsub = self.client.pubsub()
+        await self.pubsub.subscribe(self.channel)
+        self.listener = asyncio.create_task(self._listen(on_invalidate))
+
+    async def _listen(self, on_invalidate: Callable[[Optional[str]], None]):
+        # A dropped connection ends the subscription; the error is counted and the channel subscribed
+        # again. Invalidations sent in between are lost, so every local copy is dropped on resubscribe.
+        while True:
+            try:
+                async for message in self.pubsub.listen():
+                    if message.get('type') != 'message':
+                        continue
+                    data = message['data']
+                    sender, _, symbol = (data.decode('utf-8') if isinstance(data, bytes) else data).partition(':')
+                    if sender == self.instance_id:
+                        continue
+                    self.stats['invalidations_received'] += 1
+                    on_invalidate(symbol or None)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.stats['errors'] += 1
+            await asyncio.sleep(self.resubscribe_delay)
+            try:
+                await self.pubsub.subscribe(self.channel)
+            except Exception:
+                self.stats['errors'] += 1
+                continue
+            self.stats['resubscribes'] += 1
+            on_invalidate(None)
+
+    def _key(self, symbol: str) -> str:
+        return f"{self.key_prefix}{symbol}"
+
+    async def get(self, symbol: str) -> Optional[Dict[str, Any]]:
+        try:
+            payload = await self.client.get(self._key(symbol))
+        except Exception:
+            self.stats['errors'] += 1
+            return None
+        if payload is None:
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        return decode_entry(payload)
+
+    async def set(self, symbol: str, entry: Dict[str, Any]):
+        payload = encode_entry(entry)
+        try:
+            await self.client.set(self._key(symbol), payload, ex=self.ttl)
+            await self._invalidate(symbol)
+        except Exception:
+            self.stats['errors'] += 1
+            return
+        self.stats['writes'] += 1
+        self.stats['bytes_written'] += len(payload)
+
+    async def clear(self):
+        try:
+            keys = [key async for key in self.client.scan_iter(match=f"{self.key_prefix}*")]
+            if keys:
+                await self.client.delete(*keys)
+            await self._invalidate('')
+        except Exception:
+            self.stats['errors'] += 1
+
+    async def _invalidate(self, symbol: str):
+        await self.client.publish(self.channel, f"{self.instance_id}:{symbol}")
+        self.stats['invalidations_sent'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats['hits'] + self.stats['misses']
+        return dict(self.stats, ttl=self.ttl, hit_rate=self.stats['hits'] / lookups if lookups else 0.0)
+
+    async def close(self):
+        if self.listener is not None:
+            self.listener.cancel()
+            await asyncio.gather(self.listener, return_exceptions=True)
+            self.listener = None
+        if self.pubsub is not None:
+            await self.pubsub.aclose()
+            self.pubsub = None
+        if self.client is not None:
+            await self.client.aclose()
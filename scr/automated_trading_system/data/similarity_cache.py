@@ -0,0 +1,59 @@
+from typing import Dict, Any, List, Optional, Tuple
+from collections import OrderedDict
+import json
+import time
+import numpy as np
+
+class SimilarityCache:
+    # Results of similar-pattern searches keyed by the query vector rounded to `decimals`, k and the
+    # payload filter. SAX vectors are discrete, so quiet markets repeat the same query across symbols
+    # and cycles. Everything is dropped when points are written (invalidate) and entries expire after
+    # ttl, which bounds staleness from writes made by other processes.
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.enabled = config.get('enabled', True)
+        self.ttl = config.get('ttl', 30)
+        self.max_entries = config.get('max_entries', 1000)
+        self.decimals = config.get('decimals', 4)
+        self.entries: OrderedDict = OrderedDict()
+        # Bumped on every invalidation, so a search that started before a write can't cache its result
+        self.generation = 0
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'invalidations': 0}
+
+    def key(self, vector: np.ndarray, k: int, query_filter: Optional[Dict[str, Any]] = None) -> Tuple:
+        # Adding 0.0 folds -0.0 into 0.0 so both round to the same bytes
+        quantized = np.round(np.asarray(vector, dtype=np.float64), self.decimals) + 0.0
+        filter_key = json.dumps(query_filter, sort_keys=True, default=str) if query_filter else None
+        return (quantized.tobytes(), k, filter_key)
+
+    def get(self, key: Tuple) -> Optional[List[Dict[str, Any]]]:
+        entry = self.entries.get(key) if self.enabled else None
+        if entry is not None and time.monotonic() - entry['created'] > self.ttl:
+            del self.entries[key]
+            self.stats['expired'] += 1
+            entry = None
+        if entry is None:
+            self.stats['misses'] += 1
+            return None
+        self.entries.move_to_end(key)
+        self.stats['hits'] += 1
+        return list(entry['results'])
+
+    def set(self, key: Tuple, results: List[Dict[str, Any]], generation: int):
+        if not self.enabled or generation != self.generation:
+            return
+        self.entries[key] = {'results': list(results), 'created': time.monotonic()}
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def invalidate(self):
+        self.generation += 1
+        if self.entries:
+            self.entries.clear()
+            self.stats['invalidations'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats['hits'] + self.stats['misses']
+        return dict(self.stats, entries=len(self.entries), ttl=self.ttl,
+                    hit_rate=self.stats['hits'] / lookups if lookups else 0.0)
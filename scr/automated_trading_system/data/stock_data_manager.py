@@ -1,6 +1,11 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+import numpy as np
 from .data_fetcher import DataFetcher
+from .data_provider_strategy import HistoryNotSupportedError
 from .vector_database_enhancement import VectorDatabaseEnhancement
+from .bar_store import BarStore, to_epoch_seconds
+from .historical_store import HistoricalStore
+from .shared_cache import SharedMarketDataCache
 from repositories.config_repository import ConfigRepository
 from infrastructure.logging_service import LoggingService
 import asyncio
@@ -9,21 +14,51 @@ import time
 class StockDataManager:
     def __init__(self, config: Dict[str, Any], data_fetcher: DataFetcher, 
                  config_repository: ConfigRepository, logging_service: LoggingService,
-                 vector_db_enhancement: VectorDatabaseEnhancement):
+                 vector_db_enhancement: VectorDatabaseEnhancement, shared_cache: SharedMarketDataCache = None):
         self.config = config
         self.data_fetcher = data_fetcher
         self.config_repository = config_repository
         self.logging_service = logging_service
         self.vector_db_enhancement = vector_db_enhancement
         self.active_stocks: List[str] = []
+        self.sectors: Dict[str, str] = {}
+        # In-process tier, kept in least-recently-used order and bounded by local_cache_size
         self.stock_data: Dict[str, Dict[str, Any]] = {}
+        self.local_cache_size = config.get('local_cache_size', 1000)
+        # Optional Redis tier shared by every engine process
+        shared_config = config.get('shared_cache', {})
+        if shared_cache is None and shared_config.get('enabled'):
+            shared_cache = SharedMarketDataCache(shared_config)
+        self.shared_cache = shared_cache
+        self.bar_store = BarStore(config)
+        self.historical_store = HistoricalStore(config)
         self.cache_ttl = config.get('cache_ttl', 60)  # Cache time-to-live in seconds
+        self.in_flight: Dict[str, asyncio.Future] = {}
+        self.fetch_stats = {'fetches': 0, 'coalesced': 0, 'delta_bars': 0}
+        # Incremental mode asks the provider only for bars from the last stored one onwards
+        self.incremental_fetch = config.get('incremental_fetch', False)
+        # 'stale_while_revalidate' serves expired data up to max_staleness while it is refreshed in the background
+        self.cache_mode = config.get('cache_mode', 'ttl')
+        self.max_staleness = config.get('max_staleness', 300)
+        self.symbol_max_staleness: Dict[str, float] = config.get('symbol_max_staleness', {})
+        self.refresh_interval = config.get('refresh_interval', self.cache_ttl)
+        self.refresh_task: asyncio.Task = None
+        self.revalidations = set()
+        self.cache_stats = {'served_fresh': 0, 'served_stale': 0, 'blocking_fetches': 0, 'revalidations': 0,
+                            'revalidation_errors': 0, 'shared_hits': 0, 'local_evictions': 0,
+                            'total_served_age': 0.0, 'max_served_age': 0.0}
 
     async def initialize(self):
         try:
             stock_configs = await self.config_repository.get_stock_configs()
             self.active_stocks = [config['symbol'] for config in stock_configs if config['is_active']]
+            self.sectors = {config['symbol']: config.get('sector', 'unknown') for config in stock_configs}
             await self.data_fetcher.initialize()
+            await self.data_fetcher.subscribe(self.active_stocks, self)
+            if self.shared_cache is not None:
+                await self.shared_cache.connect(self._drop_local)
+            if self.cache_mode == 'stale_while_revalidate' and self.refresh_task is None:
+                self.refresh_task = asyncio.create_task(self._refresh_loop())
             await self.logging_service.log_info(f"StockDataManager initialized with {len(self.active_stocks)} active stocks")
         except Exception as e:
             await self.logging_service.log_error(f"Error initializing StockDataManager: {str(e)}")
@@ -31,27 +66,219 @@ class StockDataManager:
 
     async def get_stock_data(self, symbol: str) -> Dict[str, Any]:
         try:
-            current_time = time.time()
-            if symbol in self.stock_data and current_time - self.stock_data[symbol].get('timestamp', 0) < self.cache_ttl:
+            if symbol not in self.stock_data:
+                await self._load_shared(symbol)
+            age = self._get_age(symbol)
+            if age < self.cache_ttl:
                 await self.logging_service.log_info(f"Returning cached data for {symbol}")
-                return self.stock_data[symbol]['data']
+                return self._serve(symbol, age, 'served_fresh')
+            if self.cache_mode == 'stale_while_revalidate' and age < self.get_max_staleness(symbol):
+                self._revalidate_in_background(symbol)
+                return self._serve(symbol, age, 'served_stale')
 
+            self.cache_stats['blocking_fetches'] += 1
             await self.update_stock_data(symbol)
-            return self.stock_data[symbol]['data']
+            return self._serve(symbol, self._get_age(symbol), 'served_fresh')
         except Exception as e:
             await self.logging_service.log_error(f"Error fetching data for {symbol}: {str(e)}")
             raise
 
+    def _get_age(self, symbol: str) -> float:
+        if symbol not in self.stock_data:
+            return float('inf')
+        return time.time() - self.stock_data[symbol].get('timestamp', 0)
+
+    def get_max_staleness(self, symbol: str) -> float:
+        return self.symbol_max_staleness.get(symbol, self.max_staleness)
+
+    def _serve(self, symbol: str, age: float, outcome: str) -> Dict[str, Any]:
+        self.cache_stats[outcome] += 1
+        self.cache_stats['total_served_age'] += age
+        self.cache_stats['max_served_age'] = max(self.cache_stats['max_served_age'], age)
+        if symbol in self.stock_data:
+            self.stock_data[symbol] = self.stock_data.pop(symbol)
+        return self.get_market_data(symbol)
+
+    def _revalidate_in_background(self, symbol: str):
+        if symbol in self.in_flight:
+            return
+        # Keep a reference so the task isn't garbage collected before it finishes
+        task = asyncio.create_task(self._revalidate(symbol))
+        self.revalidations.add(task)
+        task.add_done_callback(self.revalidations.discard)
+
+    async def _revalidate(self, symbol: str):
+        self.cache_stats['revalidations'] += 1
+        try:
+            await self.update_stock_data(symbol)
+        except Exception:
+            # Already logged by update_stock_data; the stale copy keeps being served until max_staleness
+            self.cache_stats['revalidation_errors'] += 1
+
+    async def _refresh_loop(self):
+        # Refresh the stalest symbol every refresh_interval / len(active_stocks) seconds, so refreshes
+        # are spread across the interval instead of bunching up when entries expire together
+        while True:
+            symbols = list(self.active_stocks)
+            idle = [symbol for symbol in symbols if symbol not in self.in_flight]
+            if idle:
+                self._revalidate_in_background(max(idle, key=self._get_age))
+            await asyncio.sleep(self.refresh_interval / max(1, len(symbols)))
+
     async def update_stock_data(self, symbol: str):
+        # Single flight: concurrent callers for a symbol share one fetch and all see its result or error.
+        # Waiters are shielded so one caller timing out doesn't cancel the fetch for the others.
+        flight = self.in_flight.get(symbol)
+        if flight is not None:
+            self.fetch_stats['coalesced'] += 1
+            return await asyncio.shield(flight)
+        self.fetch_stats['fetches'] += 1
+        flight = asyncio.ensure_future(self._update_stock_data(symbol))
+        self.in_flight[symbol] = flight
+        flight.add_done_callback(lambda completed: self._end_flight(symbol, completed))
+        return await asyncio.shield(flight)
+
+    def _end_flight(self, symbol: str, flight: asyncio.Future):
+        self.in_flight.pop(symbol, None)
+        # Mark the error as retrieved in case every waiter was cancelled; it has already been logged
+        if not flight.cancelled():
+            flight.exception()
+
+    async def _update_stock_data(self, symbol: str):
         try:
-            data = await self.data_fetcher.fetch_data(symbol)
-            self.stock_data[symbol] = {'data': data, 'timestamp': time.time()}
-            await self.vector_db_enhancement.enhance_database(data)
+            # Another process may have refreshed the symbol since our copy was cached
+            if await self._load_shared(symbol, max_age=self.cache_ttl):
+                return
+            if self.incremental_fetch:
+                await self._update_incrementally(symbol)
+            else:
+                data = await self.data_fetcher.fetch_data(symbol)
+                await self._store_stock_data(symbol, data)
             await self.logging_service.log_info(f"Updated data for {symbol}")
         except Exception as e:
             await self.logging_service.log_error(f"Error updating data for {symbol}: {str(e)}")
             raise
 
+    async def _update_incrementally(self, symbol: str):
+        bars = await self.data_fetcher.fetch_bars_since(symbol, self.bar_store.last_timestamp(symbol))
+        self.bar_store.merge(symbol, bars)
+        self.fetch_stats['delta_bars'] += len(bars['timestamp'])
+        if not self.bar_store.has_bars(symbol):
+            raise ValueError(f"No bars returned for {symbol}")
+        await self._cache_stock_data(symbol, self._snapshot_from_bars(symbol))
+
+    async def update(self, data: Dict[str, Any]):
+        # Observer hook: a streaming provider pushes each bar as it closes
+        symbol = data['symbol']
+        try:
+            self.bar_store.append(symbol, data['timestamp'], data)
+            await self._cache_stock_data(symbol, self._snapshot_from_bars(symbol))
+        except Exception as e:
+            await self.logging_service.log_error(f"Error storing streamed bar for {symbol}: {str(e)}")
+            raise
+
+    def _snapshot_from_bars(self, symbol: str) -> Dict[str, Any]:
+        # Same shape as a provider snapshot, built from the bar store
+        latest = self.bar_store.get_bars(symbol, 1, copy=False)
+        return {
+            'symbol': symbol,
+            'price': float(latest['close'][-1]),
+            'volume': float(latest['volume'][-1]),
+            'timestamp': int(latest['timestamp'][-1]),
+            'open': float(latest['open'][-1]),
+            'high': float(latest['high'][-1]),
+            'low': float(latest['low'][-1]),
+            'time_series': self.bar_store.get_bars(symbol, copy=False)['close'].copy()
+        }
+
+    async def _store_stock_data(self, symbol: str, data: Dict[str, Any], enhance: bool = True):
+        self.bar_store.append_snapshot(symbol, data)
+        # The bar columns now live in the bar store; the cached snapshot keeps only its scalars and closes
+        data = {key: value for key, value in data.items() if key != 'bars'}
+        await self._cache_stock_data(symbol, data, enhance)
+
+    async def _cache_stock_data(self, symbol: str, data: Dict[str, Any], enhance: bool = True):
+        timestamp = time.time()
+        self._set_local(symbol, data, timestamp)
+        if self.shared_cache is not None:
+            # Encoded before the first await, so views are safe here
+            bars = self.bar_store.get_bars(symbol, copy=False) if self.bar_store.has_bars(symbol) else None
+            await self.shared_cache.set(symbol, {'timestamp': timestamp, 'data': data, 'bars': bars})
+        if enhance:
+            await self.vector_db_enhancement.enhance_database(data)
+
+    def _set_local(self, symbol: str, data: Dict[str, Any], timestamp: float):
+        self.stock_data.pop(symbol, None)
+        self.stock_data[symbol] = {'data': data, 'timestamp': timestamp}
+        while len(self.stock_data) > self.local_cache_size:
+            evicted = next(iter(self.stock_data))
+            del self.stock_data[evicted]
+            # Watchlist bars outlive their snapshot (remove_stock drops them); bars of one-off lookups go with it
+            if evicted not in self.active_stocks:
+                self.bar_store.remove(evicted)
+            self.cache_stats['local_evictions'] += 1
+
+    async def _load_shared(self, symbol: str, max_age: float = float('inf')) -> bool:
+        # Adopts the shared entry when it is newer than the local copy and younger than max_age
+        if self.shared_cache is None:
+            return False
+        entry = await self.shared_cache.get(symbol)
+        if entry is None or time.time() - entry['timestamp'] >= max_age:
+            return False
+        if entry['timestamp'] <= self.stock_data.get(symbol, {}).get('timestamp', 0):
+            return False
+        if entry['bars'] is not None:
+            self.bar_store.merge(symbol, entry['bars'])
+        self._set_local(symbol, entry['data'], entry['timestamp'])
+        self.cache_stats['shared_hits'] += 1
+        return True
+
+    def _drop_local(self, symbol: str = None):
+        # Invalidation from another process: the next read picks up its entry from the shared tier
+        if symbol is None:
+            self.stock_data.clear()
+        else:
+            self.stock_data.pop(symbol, None)
+
+    def get_market_data(self, symbol: str, n: int = None) -> Dict[str, Any]:
+        # Analyzers get bar-store columns once the store holds at least the snapshot's history. Until
+        # then (snapshots without bar fields, providers that only report closes) the snapshot passes through.
+        # An evicted snapshot leaves only the bars, if any.
+        if symbol not in self.stock_data:
+            if not self.bar_store.has_bars(symbol):
+                raise ValueError(f"No market data cached for {symbol}")
+            return self.bar_store.get_market_data(symbol, n)
+        snapshot = self.stock_data[symbol]['data']
+        if not self.bar_store.covers(symbol, len(snapshot.get('time_series', ()))):
+            return snapshot
+        return self.bar_store.get_market_data(symbol, n)
+
+    def set_priority_symbols(self, symbols: List[str]):
+        # Symbols with open positions or pending orders jump the provider rate-limit queue
+        self.data_fetcher.set_priority_symbols(symbols)
+
+    def get_rate_limiter_stats(self) -> Dict[str, Any]:
+        return self.data_fetcher.get_rate_limiter_stats()
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        served = self.cache_stats['served_fresh'] + self.cache_stats['served_stale']
+        return {
+            'mode': self.cache_mode,
+            'avg_served_age': self.cache_stats['total_served_age'] / served if served else 0.0,
+            'local_entries': len(self.stock_data),
+            'shared': self.shared_cache.get_stats() if self.shared_cache is not None else None,
+            **self.cache_stats
+        }
+
+    def get_fetch_stats(self) -> Dict[str, Any]:
+        return {'in_flight': len(self.in_flight), **self.fetch_stats}
+
+    def get_historical_store_stats(self) -> Dict[str, Any]:
+        return self.historical_store.get_stats()
+
+    def get_bar_store_stats(self) -> Dict[str, Any]:
+        return self.bar_store.get_stats()
+
     def get_active_stocks(self) -> List[str]:
         return self.active_stocks
 
@@ -59,6 +286,7 @@ class StockDataManager:
         try:
             if symbol not in self.active_stocks:
                 self.active_stocks.append(symbol)
+                await self.data_fetcher.subscribe([symbol], self)
                 await self.update_stock_data(symbol)
                 await self.config_repository.update_stock_config(symbol, {'is_active': True})
                 await self.logging_service.log_info(f"Added stock {symbol} to active stocks")
@@ -72,6 +300,8 @@ class StockDataManager:
                 self.active_stocks.remove(symbol)
                 if symbol in self.stock_data:
                     del self.stock_data[symbol]
+                self.bar_store.remove(symbol)
+                await self.data_fetcher.unsubscribe([symbol])
                 await self.config_repository.update_stock_config(symbol, {'is_active': False})
                 await self.logging_service.log_info(f"Removed stock {symbol} from active stocks")
         except Exception as e:
@@ -81,19 +311,22 @@ class StockDataManager:
     async def refresh_cache(self):
         try:
             await self.logging_service.log_info("Starting cache refresh")
-            refresh_tasks = [self.update_stock_data(symbol) for symbol in self.active_stocks]
-            await asyncio.gather(*refresh_tasks)
-            await self.logging_service.log_info("Cache refresh completed")
+            # One bulk fetch for the whole watchlist; failed symbols are logged by the fetcher and keep their old data
+            fetched = await self.data_fetcher.fetch_many(self.active_stocks)
+            await asyncio.gather(*(self._store_stock_data(symbol, data, enhance=False) for symbol, data in fetched.items()))
+            # Pattern vectors for the whole watchlist are encoded in one batch
+            await self.vector_db_enhancement.enhance_database_batch(list(fetched.values()))
+            await self.logging_service.log_info(f"Cache refresh completed for {len(fetched)} of {len(self.active_stocks)} symbols")
         except Exception as e:
             await self.logging_service.log_error(f"Error refreshing cache: {str(e)}")
             raise
 
-    async def find_similar_patterns(self, symbol: str, k: int = 5) -> List[Dict[str, Any]]:
+    async def find_similar_patterns(self, symbol: str, k: int = 5, query_filter: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         try:
             if symbol not in self.stock_data:
                 await self.update_stock_data(symbol)
             data = self.stock_data[symbol]['data']
-            return await self.vector_db_enhancement.find_similar_patterns(data, k)
+            return await self.vector_db_enhancement.find_similar_patterns(data, k, query_filter)
         except Exception as e:
             await self.logging_service.log_error(f"Error finding similar patterns for {symbol}: {str(e)}")
             raise
@@ -104,37 +337,80 @@ class StockDataManager:
     async def clear_cache(self):
         try:
             self.stock_data.clear()
+            if self.shared_cache is not None:
+                await self.shared_cache.clear()
             await self.logging_service.log_info("Cache cleared")
         except Exception as e:
             await self.logging_service.log_error(f"Error clearing cache: {str(e)}")
             raise
 
     async def get_market_overview(self) -> Dict[str, Any]:
+        # Shaped for MainAIAnalysis.generate_trading_insights: each stock's move over its cached closes,
+        # plus an equal-weighted index and total volume over the bars every symbol has
         try:
-            overview = {}
+            stocks, closes, volumes = [], [], []
             for symbol in self.active_stocks:
                 data = await self.get_stock_data(symbol)
-                overview[symbol] = {
-                    'last_price': data['last_price'],
-                    'change_percent': data['change_percent'],
-                    'volume': data['volume']
-                }
-            return overview
+                series = data.get('time_series')
+                close = np.asarray(series if series is not None else [data['price']], dtype=np.float64)
+                volume = np.atleast_1d(np.asarray(data.get('volume', 0), dtype=np.float64))
+                change = float(close[-1] - close[0])
+                stocks.append({
+                    'symbol': symbol,
+                    'sector': self.sectors.get(symbol, 'unknown'),
+                    'price': float(close[-1]),
+                    'price_change': change,
+                    'price_change_percent': change / close[0] * 100 if close[0] else 0.0,
+                    'volume': float(volume[-1]),
+                    'avg_volume': float(volume.mean())
+                })
+                closes.append(close / close[0] if close[0] else close)
+                volumes.append(volume)
+            length = min((len(close) for close in closes), default=0)
+            volume_length = min((len(volume) for volume in volumes), default=0)
+            return {
+                'stocks': stocks,
+                'index_data': np.mean([close[-length:] for close in closes], axis=0).tolist() if length else [],
+                'volume_data': np.sum([volume[-volume_length:] for volume in volumes], axis=0).tolist() if volume_length else [],
+                # No market-wide news sentiment is collected yet
+                'news_sentiment': []
+            }
         except Exception as e:
             await self.logging_service.log_error(f"Error getting market overview: {str(e)}")
             raise
 
-    async def get_historical_data(self, symbol: str, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+    async def get_historical_data(self, symbol: str, start_date: str, end_date: str) -> Dict[str, np.ndarray]:
+        # Served from the local store; only date ranges it hasn't seen yet are fetched (and written through).
+        # end_date is inclusive, as a calendar date.
         try:
-            historical_data = await self.data_fetcher.fetch_historical_data(symbol, start_date, end_date)
-            return historical_data
+            start = to_epoch_seconds(start_date)
+            end = to_epoch_seconds(end_date) + 86400
+            fetch_until = min(end, self.historical_store.closed_until(int(time.time())))
+            gaps = self.historical_store.missing_ranges(symbol, start, fetch_until)
+            if gaps and not self.data_fetcher.supports_history:
+                raise HistoryNotSupportedError(f"Data provider has no history to fill {symbol} from {start_date} to {end_date}")
+            for gap_start, gap_end in gaps:
+                bars = await self.data_fetcher.fetch_history(symbol, gap_start, gap_end, self.historical_store.interval)
+                self.historical_store.write(symbol, bars, gap_start, gap_end)
+            return self.historical_store.read(symbol, start, end)
         except Exception as e:
             await self.logging_service.log_error(f"Error getting historical data for {symbol}: {str(e)}")
             raise
 
     async def close(self):
         try:
+            if self.refresh_task is not None:
+                self.refresh_task.cancel()
+                await asyncio.gather(self.refresh_task, return_exceptions=True)
+                self.refresh_task = None
+            # Background revalidations would otherwise finish against a closed fetcher
+            revalidations = list(self.revalidations)
+            for task in revalidations:
+                task.cancel()
+            await asyncio.gather(*revalidations, return_exceptions=True)
             await self.data_fetcher.close()
+            if self.shared_cache is not None:
+                await self.shared_cache.close()
             await self.logging_service.log_info("StockDataManager closed")
         except Exception as e:
             await self.logging_service.log_error(f"Error closing StockDataManager: {str(e)}")
@@ -0,0 +1,169 @@
+from typing import Dict, Any, List, Iterable, Optional
+from collections import deque
+import asyncio
+import aiohttp
+from infrastructure.http_session_pool import HttpSessionPool
+from infrastructure.logging_service import LoggingService
+from infrastructure.market_data_subject import MarketDataSubject
+from .data_provider_strategy import DataProviderStrategy
+from .bar_store import BAR_COLUMNS, to_epoch_seconds
+
+class TickAggregator:
+    # Builds fixed-width bars from ticks. A bar closes when the stream clock (the newest tick time
+    # across all symbols) passes its end, so quiet symbols still close on time. Ticks for bars that
+    # have already closed are dropped.
+    def __init__(self, bar_seconds: int = 300):
+        self.bar_seconds = bar_seconds
+        self.forming: Dict[str, Dict[str, Any]] = {}
+        self.closed_until: Dict[str, int] = {}
+        self.last_tick: Dict[str, int] = {}
+        self.watermark: Optional[int] = None
+        self.late_ticks = 0
+
+    def add_tick(self, symbol: str, timestamp: int, price: float, size: float) -> List[Dict[str, Any]]:
+        start = timestamp - timestamp % self.bar_seconds
+        if start <= self.closed_until.get(symbol, -1):
+            self.late_ticks += 1
+            return []
+        closed = []
+        bar = self.forming.get(symbol)
+        if bar is not None and start > bar['timestamp']:
+            closed.append(self._close(symbol))
+            bar = None
+        if bar is None:
+            self.forming[symbol] = {'symbol': symbol, 'timestamp': start, 'open': price, 'high': price,
+                                    'low': price, 'close': price, 'volume': size}
+            self.last_tick[symbol] = timestamp
+        else:
+            bar['high'] = max(bar['high'], price)
+            bar['low'] = min(bar['low'], price)
+            bar['volume'] += size
+            # An out-of-order tick inside the bar still counts towards its range but not its close
+            if timestamp >= self.last_tick[symbol]:
+                bar['close'] = price
+                self.last_tick[symbol] = timestamp
+        self.watermark = timestamp if self.watermark is None else max(self.watermark, timestamp)
+        return closed + self.flush(self.watermark)
+
+    def flush(self, now: int) -> List[Dict[str, Any]]:
+        expired = [symbol for symbol, bar in self.forming.items() if bar['timestamp'] + self.bar_seconds <= now]
+        return [self._close(symbol) for symbol in expired]
+
+    def _close(self, symbol: str) -> Dict[str, Any]:
+        bar = self.forming.pop(symbol)
+        self.closed_until[symbol] = bar['timestamp']
+        return bar
+
+class StreamingStrategy(DataProviderStrategy):
+    # Keeps one persistent WebSocket to a push feed and notifies the subject's observers with each bar
+    # as it closes. Protocol: {"action": "subscribe"|"unsubscribe", "symbols": [...]} upstream and
+    # {"type": "tick", "symbol", "price", "size", "timestamp"} downstream. Reconnects with backoff and
+    # resubscribes everything on each new connection.
+    def __init__(self, url: str, subject: MarketDataSubject, session_pool: HttpSessionPool = None,
+                 bar_seconds: int = 300, history: int = 500, reconnect_delay: float = 1.0,
+                 max_reconnect_delay: float = 30.0, heartbeat: float = 15.0, logging_service: LoggingService = None):
+        self.url = url
+        self.logging_service = logging_service
+        self.subject = subject
+        self.owns_session_pool = session_pool is None
+        self.session_pool = session_pool or HttpSessionPool({})
+        self.aggregator = TickAggregator(bar_seconds)
+        self.history = history
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.heartbeat = heartbeat
+        self.symbols = set()
+        self.bars: Dict[str, deque] = {}
+        self.ws: aiohttp.ClientWebSocketResponse = None
+        self.task: asyncio.Task = None
+        self.connected = asyncio.Event()
+        self.stats = {'ticks': 0, 'bars': 0, 'connections': 0, 'disconnects': 0, 'connection_errors': 0, 'notify_errors': 0}
+
+    async def subscribe(self, symbols: Iterable[str]):
+        new_symbols = sorted(set(symbols) - self.symbols)
+        self.symbols.update(new_symbols)
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+        elif new_symbols and self.connected.is_set():
+            await self.ws.send_json({'action': 'subscribe', 'symbols': new_symbols})
+
+    async def unsubscribe(self, symbols: Iterable[str]):
+        removed = sorted(self.symbols & set(symbols))
+        self.symbols.difference_update(removed)
+        if removed and self.connected.is_set():
+            await self.ws.send_json({'action': 'unsubscribe', 'symbols': removed})
+
+    async def _run(self):
+        delay = self.reconnect_delay
+        while True:
+            try:
+                session = await self.session_pool.get_session()
+                async with session.ws_connect(self.url, heartbeat=self.heartbeat) as ws:
+                    self.ws = ws
+                    self.stats['connections'] += 1
+                    delay = self.reconnect_delay
+                    if self.symbols:
+                        await ws.send_json({'action': 'subscribe', 'symbols': sorted(self.symbols)})
+                    self.connected.set()
+                    async for message in ws:
+                        if message.type == aiohttp.WSMsgType.TEXT:
+                            await self._on_message(message.json())
+                        elif message.type == aiohttp.WSMsgType.ERROR:
+                            break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Connection failures are expected on a long-lived feed; the loop below reconnects
+                self.stats['connection_errors'] += 1
+                if self.logging_service is not None:
+                    await self.logging_service.log_error(f"Error in streaming connection to {self.url}, reconnecting in {delay}s: {str(e)}")
+            finally:
+                self.connected.clear()
+                self.ws = None
+            self.stats['disconnects'] += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _on_message(self, message: Dict[str, Any]):
+        if message.get('type') != 'tick' or message.get('symbol') not in self.symbols:
+            return
+        self.stats['ticks'] += 1
+        closed = self.aggregator.add_tick(message['symbol'], to_epoch_seconds(message['timestamp']),
+                                          float(message['price']), float(message.get('size', 0.0)))
+        for bar in closed:
+            self.bars.setdefault(bar['symbol'], deque(maxlen=self.history)).append(bar)
+            self.stats['bars'] += 1
+            # A failing observer must not take the feed, or the other observers, down with it
+            for error in await self.subject.notify(bar):
+                self.stats['notify_errors'] += 1
+                if self.logging_service is not None:
+                    await self.logging_service.log_error(f"Error notifying observer of {bar['symbol']} bar: {str(error)}")
+
+    async def fetch_data(self, symbol: str) -> Dict[str, Any]:
+        # Served from streamed state; polling a streaming provider never touches the network
+        if symbol not in self.symbols:
+            await self.subscribe([symbol])
+        closed = self.bars.get(symbol, [])
+        forming = self.aggregator.forming.get(symbol)
+        latest = forming or (closed[-1] if closed else None)
+        if latest is None:
+            raise ValueError(f"No streamed data for {symbol} yet")
+        return {
+            "symbol": symbol,
+            "price": latest['close'],
+            "timestamp": latest['timestamp'],
+            **{column: latest[column] for column in BAR_COLUMNS if column != 'close'},
+            "time_series": [bar['close'] for bar in closed] + ([forming['close']] if forming else [])
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'connected': self.connected.is_set(), 'symbols': len(self.symbols),
+                'late_ticks': self.aggregator.late_ticks, **self.stats}
+
+    async def close(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+        if self.owns_session_pool:
+            await self.session_pool.close()
@@ -1,8 +1,12 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import numpy as np
 from qdrant_client import QdrantClient
-from qdrant_client.http.models import Distance, VectorParams
+from qdrant_client.http.models import Distance, VectorParams, PayloadSchemaType
 from infrastructure.logging_service import LoggingService
+from infrastructure.blocking_executor import BlockingExecutor
+from infrastructure.write_behind_buffer import WriteBehindBuffer
+from .vector_index import LocalVectorIndex, ReadThroughVectorIndex, payload_filter
+from .similarity_cache import SimilarityCache
 from datetime import datetime
 
 class EnhancedVectorDatabase:
@@ -12,70 +16,138 @@ class EnhancedVectorDatabase:
         self.client = None
         self.collection_name = "market_patterns"
         self.version = 1
+        # QdrantClient is synchronous; a slow search must not freeze the loop for every other symbol
+        self.executor = BlockingExecutor.from_config(config, 'qdrant')
+        # Points are upserted in batches in the background; searches don't see them until they are flushed
+        self.write_buffer = WriteBehindBuffer.from_config(self._upsert_points, config.get('vector_db', {}).get('write_behind', {}))
+        # Repeated searches for the same SAX vector are served from here until the collection changes
+        self.similarity_cache = SimilarityCache(config.get('vector_db', {}).get('similarity_cache', {}))
+        # Payload fields filtered on in searches, e.g. {'symbol': 'keyword', 'timestamp': 'integer'}
+        self.payload_indexes = config.get('vector_db', {}).get('payload_indexes', {})
 
     async def initialize(self):
         try:
-            self.client = QdrantClient(
-                host=self.config['vector_db']['host'],
-                port=self.config['vector_db']['port']
-            )
+            self.client = self._create_client(self.config['vector_db'])
             await self.logging_service.log_info("Enhanced Vector Database initialized successfully")
         except Exception as e:
             await self.logging_service.log_error(f"Error initializing Enhanced Vector Database: {str(e)}")
             raise
 
+    def _create_client(self, vector_db_config: Dict[str, Any]) -> Any:
+        # 'local' keeps the collection in process with no Qdrant server; 'cached' serves searches
+        # from a local copy and writes through to Qdrant
+        backend = vector_db_config.get('backend', 'qdrant')
+        if backend in ('local', 'cached'):
+            local_index = LocalVectorIndex(vector_db_config.get('local_path', '.cache/vectors'),
+                                           vector_db_config.get('autosave_every', 1000))
+        if backend == 'local':
+            return local_index
+        qdrant = QdrantClient(host=vector_db_config['host'], port=vector_db_config['port'])
+        if backend == 'cached':
+            return ReadThroughVectorIndex(local_index, qdrant, sync_ttl=vector_db_config.get('sync_ttl', 3600))
+        elif backend == 'qdrant':
+            return qdrant
+        else:
+            raise ValueError(f"Unsupported vector database backend: {backend}")
+
     async def create_collection(self, dimension: int):
         try:
-            self.client.recreate_collection(
+            await self.executor.run(
+                self.client.recreate_collection,
                 collection_name=self.collection_name,
                 vectors_config=VectorParams(size=dimension, distance=Distance.COSINE)
             )
+            self.similarity_cache.invalidate()
+            await self.create_payload_indexes()
             await self.logging_service.log_info(f"Collection '{self.collection_name}' created successfully")
         except Exception as e:
             await self.logging_service.log_error(f"Error creating collection: {str(e)}")
             raise
 
+    async def create_payload_indexes(self):
+        try:
+            for field, schema in self.payload_indexes.items():
+                await self.executor.run(
+                    self.client.create_payload_index,
+                    collection_name=self.collection_name,
+                    field_name=field,
+                    field_schema=PayloadSchemaType(schema)
+                )
+            if self.payload_indexes:
+                await self.logging_service.log_info(f"Payload indexes created on: {', '.join(self.payload_indexes)}")
+        except Exception as e:
+            await self.logging_service.log_error(f"Error creating payload indexes: {str(e)}")
+            raise
+
     async def store_vector(self, vector: np.ndarray, metadata: Dict[str, Any]):
         try:
             point_id = f"{metadata.get('symbol')}_{metadata.get('timestamp')}_{self.version}"
-            self.client.upsert(
-                collection_name=self.collection_name,
-                points=[
-                    {
-                        'id': point_id,
-                        'vector': vector.tolist(),
-                        'payload': {
-                            **metadata,
-                            'version': self.version,
-                            'created_at': datetime.now().isoformat()
-                        }
-                    }
-                ]
-            )
-            await self.logging_service.log_info(f"Vector stored successfully: {point_id}")
+            # Waits only when the buffer is full, i.e. when Qdrant is falling behind
+            await self.write_buffer.add({
+                'id': point_id,
+                'vector': vector.tolist(),
+                'payload': {
+                    **metadata,
+                    'version': self.version,
+                    'created_at': datetime.now().isoformat()
+                }
+            })
         except Exception as e:
             await self.logging_service.log_error(f"Error storing vector: {str(e)}")
             raise
 
-    async def query_similar_vectors(self, vector: np.ndarray, k: int) -> List[Dict[str, Any]]:
+    async def _upsert_points(self, points: List[Dict[str, Any]]):
         try:
-            results = self.client.search(
+            try:
+                await self.executor.run(
+                    self.client.upsert,
+                    collection_name=self.collection_name,
+                    points=points
+                )
+            finally:
+                # A failed or timed-out upsert may still have landed
+                self.similarity_cache.invalidate()
+            await self.logging_service.log_info(f"Stored {len(points)} vectors")
+        except Exception as e:
+            await self.logging_service.log_error(f"Error storing {len(points)} vectors: {str(e)}")
+            raise
+
+    async def flush(self):
+        await self.write_buffer.flush()
+
+    async def query_similar_vectors(self, vector: np.ndarray, k: int, query_filter: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        # query_filter is applied by the store before ranking, so k results come back even when most
+        # neighbours don't match: {'symbol': 'AAPL', 'outcome': ['success', 'failure'],
+        # 'timestamp': {'gte': start}}
+        try:
+            key = self.similarity_cache.key(vector, k, query_filter)
+            cached = self.similarity_cache.get(key)
+            if cached is not None:
+                return cached
+            generation = self.similarity_cache.generation
+            results = await self.executor.run(
+                self.client.search,
                 collection_name=self.collection_name,
                 query_vector=vector.tolist(),
+                query_filter=payload_filter(query_filter),
                 limit=k
             )
-            return [{'id': hit.id, 'score': hit.score, 'metadata': hit.payload} for hit in results]
+            similar = [{'id': hit.id, 'score': hit.score, 'metadata': hit.payload} for hit in results]
+            self.similarity_cache.set(key, similar, generation)
+            return similar
         except Exception as e:
             await self.logging_service.log_error(f"Error querying similar vectors: {str(e)}")
             raise
 
     async def update_metadata(self, vector_id: str, new_metadata: Dict[str, Any]):
         try:
-            self.client.update_payload(
+            await self.executor.run(
+                self.client.update_payload,
                 collection_name=self.collection_name,
                 points=[vector_id],
                 payload=new_metadata
             )
+            self.similarity_cache.invalidate()
             await self.logging_service.log_info(f"Metadata updated successfully for vector: {vector_id}")
         except Exception as e:
             await self.logging_service.log_error(f"Error updating metadata: {str(e)}")
@@ -83,7 +155,8 @@ class EnhancedVectorDatabase:
 
     async def create_snapshot(self, snapshot_name: str):
         try:
-            self.client.create_snapshot(
+            await self.executor.run(
+                self.client.create_snapshot,
                 collection_name=self.collection_name,
                 snapshot_name=snapshot_name
             )
@@ -93,6 +166,24 @@ class EnhancedVectorDatabase:
             raise
 
     async def close(self):
+        try:
+            await self.write_buffer.close()
+        except Exception as e:
+            await self.logging_service.log_error(f"Error flushing vectors on close: {str(e)}")
         if self.client:
-            self.client.close()
-            await self.logging_service.log_info("Vector database connection closed")
\ No newline at end of file
+            await self.executor.run(self.client.close)
+            await self.logging_service.log_info("Vector database connection closed")
+        self.executor.shutdown(wait=False)
+
+    def get_executor_stats(self) -> Dict[str, Any]:
+        return self.executor.get_stats()
+
+    def get_write_stats(self) -> Dict[str, Any]:
+        return self.write_buffer.get_stats()
+
+    def get_similarity_cache_stats(self) -> Dict[str, Any]:
+        return self.similarity_cache.get_stats()
+
+    def get_index_stats(self) -> Dict[str, Any]:
+        # Only the in-process backends keep stats
+        return self.client.get_stats() if hasattr(self.client, 'get_stats') else {}
\ No newline at end of file
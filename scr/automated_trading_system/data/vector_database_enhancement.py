@@ -1,45 +1,55 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import numpy as np
-from tslearn.preprocessing import TimeSeriesScalerMeanVariance
-from tslearn.piecewise import SymbolicAggregateApproximation
-from sklearn.preprocessing import normalize
-from .enhanced_vector_database import EnhancedVectorDatabase
+from .vector_database import EnhancedVectorDatabase
+from .pattern_embedding import PatternEmbeddingService
+from .bar_store import to_epoch_seconds
 from infrastructure.logging_service import LoggingService
 
 class VectorDatabaseEnhancement:
-    def __init__(self, vector_db: EnhancedVectorDatabase, config: Dict[str, Any], logging_service: LoggingService):
+    def __init__(self, vector_db: EnhancedVectorDatabase, config: Dict[str, Any], logging_service: LoggingService,
+                 pattern_embedding: PatternEmbeddingService = None):
         self.vector_db = vector_db
         self.config = config
         self.logging_service = logging_service
-        self.scaler = TimeSeriesScalerMeanVariance()
-        self.sax = SymbolicAggregateApproximation(n_segments=10, alphabet_size_avg=5)
+        # Shared with PatternMatcher so each window is encoded once per new bar
+        self.pattern_embedding = pattern_embedding or PatternEmbeddingService(config)
 
     async def enhance_database(self, new_data: Dict[str, Any]):
         try:
-            time_series = new_data['time_series']
-            time_series_reshaped = np.array(time_series).reshape(1, -1, 1)
-            scaled_series = self.scaler.fit_transform(time_series_reshaped)
-            sax_representation = self.sax.fit_transform(scaled_series)
-            vector = normalize(sax_representation.reshape(1, -1))[0]
-            
-            metadata = {k: v for k, v in new_data.items() if k != 'time_series'}
-            metadata['id'] = f"{new_data['symbol']}_{new_data['timestamp']}"
-            
+            vector = self.pattern_embedding.embed(new_data)
+            metadata = self._metadata(new_data)
             await self.vector_db.store_vector(vector, metadata)
             await self.logging_service.log_info(f"Enhanced and stored vector for {metadata['id']}")
         except Exception as e:
             await self.logging_service.log_error(f"Error enhancing database: {str(e)}")
             raise
 
-    async def find_similar_patterns(self, query_data: Dict[str, Any], k: int = 5) -> List[Dict[str, Any]]:
+    async def enhance_database_batch(self, items: List[Dict[str, Any]]):
+        # Encodes the whole batch in one call, then stores each vector
         try:
-            query_series = query_data['time_series']
-            query_series_reshaped = np.array(query_series).reshape(1, -1, 1)
-            scaled_query = self.scaler.transform(query_series_reshaped)
-            sax_query = self.sax.transform(scaled_query)
-            query_vector = normalize(sax_query.reshape(1, -1))[0]
-            
-            similar_patterns = await self.vector_db.query_similar_vectors(query_vector, k)
+            vectors = self.pattern_embedding.embed_batch(items)
+            for new_data, vector in zip(items, vectors):
+                await self.vector_db.store_vector(vector, self._metadata(new_data))
+            await self.logging_service.log_info(f"Enhanced and stored {len(items)} vectors")
+        except Exception as e:
+            await self.logging_service.log_error(f"Error enhancing database: {str(e)}")
+            raise
+
+    def _metadata(self, new_data: Dict[str, Any]) -> Dict[str, Any]:
+        metadata = {k: v for k, v in new_data.items() if k != 'time_series'}
+        # Epoch seconds of the latest bar, so the integer payload index and timestamp range filters apply
+        timestamp = new_data['timestamp']
+        if isinstance(timestamp, (list, tuple, np.ndarray)):
+            timestamp = timestamp[-1]
+        metadata['timestamp'] = to_epoch_seconds(timestamp)
+        metadata['id'] = f"{new_data['symbol']}_{metadata['timestamp']}"
+        return metadata
+
+    async def find_similar_patterns(self, query_data: Dict[str, Any], k: int = 5,
+                                    query_filter: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        try:
+            query_vector = self.pattern_embedding.embed(query_data)
+            similar_patterns = await self.vector_db.query_similar_vectors(query_vector, k, query_filter)
             await self.logging_service.log_info(f"Found {len(similar_patterns)} similar patterns")
             return similar_patterns
         except Exception as e:
@@ -0,0 +1,399 @@
+from typing import Dict, Any, List, Optional
+import json
+import os
+import threading
+import time
+import numpy as np
+from qdrant_client.http.models import ScoredPoint, Filter, FieldCondition, MatchValue, MatchAny, Range, VectorParams, Distance
+
+NUMERIC_SCHEMAS = {'integer', 'float'}
+
+def _json_default(value: Any) -> Any:
+    return value.tolist() if hasattr(value, 'tolist') else str(value)
+
+def _point_field(point: Any, field: str) -> Any:
+    return point[field] if isinstance(point, dict) else getattr(point, field)
+
+def _scalar(value: Any) -> Any:
+    return value.item() if hasattr(value, 'item') else value
+
+def payload_filter(query_filter: Optional[Dict[str, Any]]) -> Optional[Filter]:
+    # {'symbol': 'AAPL'} matches a value, {'sector': ['Tech', 'Energy']} any of several and
+    # {'timestamp': {'gte': start, 'lt': end}} a range; all conditions must hold
+    if not query_filter:
+        return None
+    conditions = []
+    for field, spec in sorted(query_filter.items()):
+        if isinstance(spec, dict):
+            conditions.append(FieldCondition(key=field, range=Range(**{bound: float(_scalar(value)) for bound, value in spec.items()})))
+        elif isinstance(spec, (list, tuple, set)):
+            conditions.append(FieldCondition(key=field, match=MatchAny(any=[_scalar(value) for value in spec])))
+        else:
+            conditions.append(FieldCondition(key=field, match=MatchValue(value=_scalar(spec))))
+    return Filter(must=conditions)
+
+def _payload_values(payload: Dict[str, Any], field: str) -> List[Any]:
+    # Like Qdrant, a list-valued field matches on any of its elements
+    value = payload.get(field)
+    if value is None:
+        return []
+    return [_scalar(item) for item in value] if isinstance(value, list) else [_scalar(value)]
+
+def _to_number(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+def _in_range(value: Any, bounds: Range) -> bool:
+    number = _to_number(value)
+    return not ((bounds.gt is not None and not number > bounds.gt) or (bounds.gte is not None and not number >= bounds.gte) or
+                (bounds.lt is not None and not number < bounds.lt) or (bounds.lte is not None and not number <= bounds.lte))
+
+def _condition_values(condition: FieldCondition) -> set:
+    if isinstance(condition.match, MatchValue):
+        return {condition.match.value}
+    if isinstance(condition.match, MatchAny):
+        return set(condition.match.any)
+    raise ValueError(f"Unsupported match on '{condition.key}' in local vector index: {condition.match}")
+
+class VectorCollection:
+    # Unit-normalised float32 rows searched by exact cosine similarity. Our SAX pattern vectors are
+    # 10-dimensional, so one matrix-vector product over the whole collection is cheaper than a
+    # network round trip well past 100k points, and needs no vector index to maintain. Payload
+    # indexes only narrow the rows a filtered search has to score.
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+        self.vectors = np.zeros((0, dimension), dtype=np.float32)
+        self.count = 0
+        self.ids: List[Any] = []
+        self.rows: Dict[Any, int] = {}
+        self.payloads: List[Dict[str, Any]] = []
+        # Payload indexes: value -> rows for keyword fields, a float column (NaN when missing) for numeric ones
+        self.index_schemas: Dict[str, str] = {}
+        self.keyword_indexes: Dict[str, Dict[Any, set]] = {}
+        self.numeric_indexes: Dict[str, np.ndarray] = {}
+
+    def _writable(self, capacity: int):
+        # Grows by doubling; also turns a memory-mapped load into an in-memory copy on first write
+        if capacity <= len(self.vectors) and not isinstance(self.vectors, np.memmap):
+            return
+        vectors = np.zeros((max(capacity, 2 * len(self.vectors), 64), self.dimension), dtype=np.float32)
+        vectors[:self.count] = self.vectors[:self.count]
+        self.vectors = vectors
+        for field, column in self.numeric_indexes.items():
+            self.numeric_indexes[field] = np.append(column[:self.count], np.full(len(vectors) - self.count, np.nan))
+
+    def create_index(self, field: str, schema: str):
+        self.index_schemas[field] = schema
+        if schema in NUMERIC_SCHEMAS:
+            self.numeric_indexes[field] = np.full(len(self.vectors), np.nan)
+        else:
+            self.keyword_indexes[field] = {}
+        for row in range(self.count):
+            self._index_row(row, None, self.payloads[row], fields=[field])
+
+    def _index_row(self, row: int, old_payload: Optional[Dict[str, Any]], payload: Dict[str, Any], fields: List[str] = None):
+        for field in fields or self.index_schemas:
+            if field in self.numeric_indexes:
+                values = _payload_values(payload, field)
+                self.numeric_indexes[field][row] = _to_number(values[0]) if values else np.nan
+                continue
+            postings = self.keyword_indexes[field]
+            for value in _payload_values(old_payload or {}, field):
+                postings.get(value, set()).discard(row)
+            for value in _payload_values(payload, field):
+                postings.setdefault(value, set()).add(row)
+
+    def upsert(self, point_id: Any, vector: Any, payload: Dict[str, Any]):
+        vector = np.asarray(vector, dtype=np.float32)
+        if vector.shape != (self.dimension,):
+            raise ValueError(f"Expected a vector of dimension {self.dimension}, got shape {vector.shape}")
+        norm = np.linalg.norm(vector)
+        row = self.rows.get(point_id)
+        if row is None:
+            self._writable(self.count + 1)
+            row = self.count
+            self.count += 1
+            self.ids.append(point_id)
+            self.rows[point_id] = row
+            self.payloads.append(payload)
+            self._index_row(row, None, payload)
+        else:
+            self._writable(self.count)
+            self._index_row(row, self.payloads[row], payload)
+            self.payloads[row] = payload
+        self.vectors[row] = vector / norm if norm else vector
+
+    def update_payload(self, row: int, payload: Dict[str, Any]):
+        merged = {**self.payloads[row], **payload}
+        self._index_row(row, self.payloads[row], merged)
+        self.payloads[row] = merged
+
+    def candidates(self, query_filter: Optional[Filter]) -> Optional[np.ndarray]:
+        # Rows passing the filter, or None for no filter. Indexed fields are answered from their
+        # index; other conditions fall back to checking each payload.
+        if query_filter is None or not query_filter.must:
+            return None
+        mask = np.ones(self.count, dtype=bool)
+        for condition in query_filter.must:
+            if not isinstance(condition, FieldCondition):
+                raise ValueError(f"Unsupported filter condition in local vector index: {condition}")
+            field = condition.key
+            if condition.range is not None and field in self.numeric_indexes:
+                column = self.numeric_indexes[field][:self.count]
+                bounds = condition.range
+                with np.errstate(invalid='ignore'):
+                    for bound, compare in (('gt', np.greater), ('gte', np.greater_equal), ('lt', np.less), ('lte', np.less_equal)):
+                        if getattr(bounds, bound) is not None:
+                            mask &= compare(column, getattr(bounds, bound))
+            elif condition.match is not None and field in self.keyword_indexes:
+                rows = set().union(*(self.keyword_indexes[field].get(value, set()) for value in _condition_values(condition)))
+                indexed = np.zeros(self.count, dtype=bool)
+                indexed[list(rows)] = True
+                mask &= indexed
+            elif condition.range is not None:
+                mask &= np.array([any(_in_range(value, condition.range) for value in _payload_values(payload, field))
+                                  for payload in self.payloads[:self.count]], dtype=bool)
+            else:
+                values = _condition_values(condition)
+                mask &= np.array([any(value in values for value in _payload_values(payload, field))
+                                  for payload in self.payloads[:self.count]], dtype=bool)
+        return np.flatnonzero(mask)
+
+    def search(self, query: Any, limit: int, query_filter: Optional[Filter] = None) -> List[ScoredPoint]:
+        # Only rows passing the filter are scored
+        query = np.asarray(query, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        rows = self.candidates(query_filter)
+        vectors = self.vectors[:self.count] if rows is None else self.vectors[rows]
+        scores = vectors @ (query / norm if norm else query)
+        k = min(limit, len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [ScoredPoint(id=self.ids[row], version=0, score=float(scores[position]), payload=self.payloads[row])
+                for position, row in zip(top, top if rows is None else rows[top])]
+
+    def save(self, directory: str):
+        # A mapped file can't be replaced on Windows, so the vectors are loaded into memory first
+        self._writable(self.count)
+        os.makedirs(directory, exist_ok=True)
+        vectors_path = os.path.join(directory, 'vectors.npy')
+        with open(f"{vectors_path}.tmp", 'wb') as f:
+            np.save(f, np.ascontiguousarray(self.vectors[:self.count]))
+        os.replace(f"{vectors_path}.tmp", vectors_path)
+        points_path = os.path.join(directory, 'points.json')
+        with open(f"{points_path}.tmp", 'w') as f:
+            json.dump({'dimension': self.dimension, 'ids': self.ids, 'payloads': self.payloads,
+                       'indexes': self.index_schemas}, f, default=_json_default)
+        os.replace(f"{points_path}.tmp", points_path)
+
+    @classmethod
+    def load(cls, directory: str) -> 'VectorCollection':
+        # Vectors stay memory-mapped until the first write, so a large collection opens instantly
+        with open(os.path.join(directory, 'points.json')) as f:
+            points = json.load(f)
+        collection = cls(points['dimension'])
+        collection.vectors = np.load(os.path.join(directory, 'vectors.npy'), mmap_mode='r')
+        collection.count = len(points['ids'])
+        collection.ids = points['ids']
+        collection.rows = {point_id: row for row, point_id in enumerate(collection.ids)}
+        collection.payloads = points['payloads']
+        for field, schema in points.get('indexes', {}).items():
+            collection.create_index(field, schema)
+        return collection
+
+class LocalVectorIndex:
+    # In-process stand-in for the subset of QdrantClient that EnhancedVectorDatabase uses, persisted
+    # under <path>/<collection>/. Writes are saved every autosave_every points and on close.
+    # Calls arrive from the qdrant executor's worker threads, so every method holds the lock.
+    def __init__(self, path: str, autosave_every: int = 1000):
+        self.path = path
+        self.autosave_every = autosave_every
+        self.collections: Dict[str, VectorCollection] = {}
+        self.unsaved: Dict[str, int] = {}
+        self.lock = threading.RLock()
+        self.stats = {'upserts': 0, 'searches': 0, 'filtered_searches': 0, 'saves': 0}
+
+    def _collection_dir(self, collection_name: str) -> str:
+        return os.path.join(self.path, collection_name)
+
+    def get_collection(self, collection_name: str) -> Optional[VectorCollection]:
+        with self.lock:
+            if collection_name not in self.collections:
+                directory = self._collection_dir(collection_name)
+                if not os.path.exists(os.path.join(directory, 'points.json')):
+                    return None
+                self.collections[collection_name] = VectorCollection.load(directory)
+            return self.collections[collection_name]
+
+    def recreate_collection(self, collection_name: str, vectors_config: Any, **kwargs):
+        with self.lock:
+            self.collections[collection_name] = VectorCollection(vectors_config.size)
+            self.unsaved[collection_name] = 0
+            self._save(collection_name)
+
+    def upsert(self, collection_name: str, points: List[Any], **kwargs):
+        with self.lock:
+            collection = self.get_collection(collection_name)
+            if collection is None:
+                # Unlike Qdrant, a collection is created on first write from the vectors' dimension
+                collection = VectorCollection(len(_point_field(points[0], 'vector')))
+                self.collections[collection_name] = collection
+            for point in points:
+                collection.upsert(_point_field(point, 'id'), _point_field(point, 'vector'), _point_field(point, 'payload') or {})
+            self.stats['upserts'] += len(points)
+            self.unsaved[collection_name] = self.unsaved.get(collection_name, 0) + len(points)
+            if self.unsaved[collection_name] >= self.autosave_every:
+                self._save(collection_name)
+
+    def search(self, collection_name: str, query_vector: Any, limit: int = 10, query_filter: Filter = None,
+               **kwargs) -> List[ScoredPoint]:
+        with self.lock:
+            collection = self.get_collection(collection_name)
+            self.stats['searches'] += 1
+            if query_filter is not None:
+                self.stats['filtered_searches'] += 1
+            return collection.search(query_vector, limit, query_filter) if collection is not None else []
+
+    def create_payload_index(self, collection_name: str, field_name: str, field_schema: Any = 'keyword', **kwargs):
+        with self.lock:
+            collection = self.get_collection(collection_name)
+            if collection is not None:
+                collection.create_index(field_name, getattr(field_schema, 'value', field_schema))
+                self._save(collection_name)
+
+    def update_payload(self, collection_name: str, points: List[Any], payload: Dict[str, Any], **kwargs):
+        with self.lock:
+            collection = self.get_collection(collection_name)
+            for point_id in points:
+                row = collection.rows.get(point_id) if collection is not None else None
+                if row is not None:
+                    collection.update_payload(row, payload)
+            if collection is not None:
+                self.unsaved[collection_name] = self.unsaved.get(collection_name, 0) + len(points)
+
+    def create_snapshot(self, collection_name: str, snapshot_name: str = None, **kwargs):
+        with self.lock:
+            collection = self.get_collection(collection_name)
+            if collection is not None:
+                collection.save(os.path.join(self._collection_dir(collection_name), 'snapshots', snapshot_name or 'latest'))
+
+    def get_synced_at(self, collection_name: str) -> Optional[float]:
+        path = os.path.join(self._collection_dir(collection_name), 'sync.json')
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)['synced_at']
+
+    def mark_synced(self, collection_name: str):
+        # Saves the collection, then records when it last matched the remote copy
+        with self.lock:
+            if self.get_collection(collection_name) is None:
+                return
+            self._save(collection_name)
+            with open(os.path.join(self._collection_dir(collection_name), 'sync.json'), 'w') as f:
+                json.dump({'synced_at': time.time()}, f)
+
+    def _save(self, collection_name: str):
+        self.collections[collection_name].save(self._collection_dir(collection_name))
+        self.unsaved[collection_name] = 0
+        self.stats['saves'] += 1
+
+    def flush(self):
+        with self.lock:
+            for collection_name, unsaved in list(self.unsaved.items()):
+                if unsaved:
+                    self._save(collection_name)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'collections': {name: collection.count for name, collection in self.collections.items()}, **self.stats}
+
+    def close(self, **kwargs):
+        self.flush()
+
+class ReadThroughVectorIndex:
+    # Serves searches from a LocalVectorIndex in front of Qdrant. Writes go to Qdrant first, then to
+    # the local copy; the first use of a collection in this process pulls it from Qdrant with scroll.
+    # A copy persisted by an earlier run is reused only if it was synced within sync_ttl seconds and
+    # holds as many points as Qdrant; otherwise other writers may have changed it and it is re-pulled.
+    def __init__(self, local: LocalVectorIndex, remote: Any, scroll_batch: int = 1000, sync_ttl: float = 3600):
+        self.local = local
+        self.remote = remote
+        self.scroll_batch = scroll_batch
+        self.sync_ttl = sync_ttl
+        self.warmed = set()
+        self.stats = {'local_searches': 0, 'warmed_points': 0, 'resyncs': 0}
+
+    def recreate_collection(self, collection_name: str, vectors_config: Any, **kwargs):
+        self.remote.recreate_collection(collection_name=collection_name, vectors_config=vectors_config, **kwargs)
+        self.local.recreate_collection(collection_name, vectors_config)
+        self.local.mark_synced(collection_name)
+        self.warmed.add(collection_name)
+
+    def upsert(self, collection_name: str, points: List[Any], **kwargs):
+        self.remote.upsert(collection_name=collection_name, points=points, **kwargs)
+        self._warm(collection_name)
+        self.local.upsert(collection_name, points)
+
+    def search(self, collection_name: str, query_vector: Any, limit: int = 10, query_filter: Filter = None,
+               **kwargs) -> List[ScoredPoint]:
+        self._warm(collection_name)
+        self.stats['local_searches'] += 1
+        return self.local.search(collection_name, query_vector, limit, query_filter)
+
+    def create_payload_index(self, collection_name: str, field_name: str, field_schema: Any = 'keyword', **kwargs):
+        self.remote.create_payload_index(collection_name=collection_name, field_name=field_name,
+                                         field_schema=field_schema, **kwargs)
+        self._warm(collection_name)
+        self.local.create_payload_index(collection_name, field_name, field_schema)
+
+    def _is_current(self, collection_name: str, collection: Any) -> bool:
+        synced_at = self.local.get_synced_at(collection_name)
+        if synced_at is None or time.time() - synced_at > self.sync_ttl:
+            return False
+        return self.remote.count(collection_name=collection_name, exact=True).count == collection.count
+
+    def _warm(self, collection_name: str):
+        with self.local.lock:
+            if collection_name in self.warmed:
+                return
+            collection = self.local.get_collection(collection_name)
+            if collection is not None:
+                if self._is_current(collection_name, collection):
+                    self.warmed.add(collection_name)
+                    return
+                # Start over so points deleted or changed in Qdrant don't linger; payload indexes carry over
+                self.stats['resyncs'] += 1
+                index_schemas = dict(collection.index_schemas)
+                self.local.recreate_collection(collection_name, VectorParams(size=collection.dimension, distance=Distance.COSINE))
+                for field, schema in index_schemas.items():
+                    self.local.create_payload_index(collection_name, field, schema)
+            offset = None
+            while True:
+                records, offset = self.remote.scroll(collection_name=collection_name, limit=self.scroll_batch,
+                                                     offset=offset, with_payload=True, with_vectors=True)
+                if records:
+                    self.local.upsert(collection_name, records)
+                    self.stats['warmed_points'] += len(records)
+                if offset is None:
+                    break
+            self.local.mark_synced(collection_name)
+            self.warmed.add(collection_name)
+
+    def update_payload(self, collection_name: str, points: List[Any], payload: Dict[str, Any], **kwargs):
+        self.remote.update_payload(collection_name=collection_name, points=points, payload=payload, **kwargs)
+        self.local.update_payload(collection_name, points, payload)
+
+    def create_snapshot(self, collection_name: str, snapshot_name: str = None, **kwargs):
+        self.remote.create_snapshot(collection_name=collection_name, snapshot_name=snapshot_name, **kwargs)
+        self.local.create_snapshot(collection_name, snapshot_name)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.local.get_stats(), **self.stats}
+
+    def close(self, **kwargs):
+        self.local.close()
+        self.remote.close()
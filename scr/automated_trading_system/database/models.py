@@ -99,6 +99,10 @@ class SystemSettings(Base):
     log_level = Column(String)
     max_concurrent_trades = Column(Integer)
     data_update_frequency = Column(Integer)
+    concurrent_cycle = Column(Boolean)
+    max_concurrent_symbols = Column(Integer)
+    symbol_timeout = Column(Integer)
+    batch_analysis = Column(Boolean)
 
 class PerformanceMetrics(Base):
     __tablename__ = 'performance_metrics'
@@ -3,6 +3,7 @@ from abc import ABC, abstractmethod
 from typing import Dict, Any
 import aiohttp
 from infrastructure.logging_service import LoggingService
+from infrastructure.http_session_pool import HttpSessionPool
 
 class BrokerAPIError(Exception):
     pass
@@ -11,6 +12,8 @@ class BrokerAPI(ABC):
     def __init__(self, config: Dict[str, Any], logging_service: LoggingService):
         self.config = config
         self.logging_service = logging_service
+        # Each broker keeps its own pool: auth headers live on the session and must not leak across brokers
+        self.session_pool = HttpSessionPool(config.get('http_pool', {}))
         self.session = None
 
     @abstractmethod
@@ -30,8 +33,15 @@ class BrokerAPI(ABC):
         pass
 
     async def _init_session(self):
-        if self.session is None:
-            self.session = aiohttp.ClientSession()
+        if self.session is None or self.session.closed:
+            self.session = await self.session_pool.get_session()
+
+    async def close(self):
+        await self.session_pool.close()
+        self.session = None
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        return self.session_pool.get_stats()
 
     async def _make_request(self, method: str, url: str, data: Dict[str, Any] = None) -> Dict[str, Any]:
         try:
@@ -50,6 +60,7 @@ class BrokerAPI(ABC):
 
 class AngelOneBrokerAPI(BrokerAPI):
     async def authenticate(self):
+        await self._init_session()
         if 'Authorization' not in self.session.headers:
             login_url = f"{self.config['base_url']}/rest/auth/angelbroking/user/v1/loginByPassword"
             login_data = {
@@ -80,6 +91,7 @@ class AngelOneBrokerAPI(BrokerAPI):
 
 class UpstoxBrokerAPI(BrokerAPI):
     async def authenticate(self):
+        await self._init_session()
         if 'Authorization' not in self.session.headers:
             # Implement Upstox OAuth flow here
             # This is a placeholder and should be replaced with actual Upstox OAuth process
@@ -102,6 +114,7 @@ class UpstoxBrokerAPI(BrokerAPI):
 
 class ZerodhaBrokerAPI(BrokerAPI):
     async def authenticate(self):
+        await self._init_session()
         if 'Authorization' not in self.session.headers:
             # Implement Zerodha OAuth flow here
             # This is a placeholder and should be replaced with actual Zerodha OAuth process
@@ -0,0 +1,61 @@
+from typing import Dict, Any, Callable
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import functools
+import time
+
+class BlockingExecutor:
+    # Runs a synchronous SDK on its own bounded thread pool so a slow call only ties up that
+    # dependency's workers, never the event loop. Calls beyond max_workers wait on the loop.
+    def __init__(self, name: str, max_workers: int = 4, timeout: float = None):
+        self.name = name
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self.semaphore = asyncio.Semaphore(max_workers)
+        self.stats = {'calls': 0, 'in_flight': 0, 'saturated': 0, 'timed_out': 0, 'errors': 0,
+                      'total_time': 0.0, 'max_time': 0.0}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], name: str) -> 'BlockingExecutor':
+        executor_config = config.get('blocking_executors', {}).get(name, {})
+        return cls(name, executor_config.get('max_workers', 4), executor_config.get('timeout'))
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        if self.semaphore.locked():
+            self.stats['saturated'] += 1
+        await self.semaphore.acquire()
+        start = time.perf_counter()
+        self.stats['calls'] += 1
+        self.stats['in_flight'] += 1
+        future = loop.run_in_executor(self.pool, functools.partial(func, *args, **kwargs))
+        # A timed-out call keeps its worker until the SDK returns, so the slot is only released then
+        future.add_done_callback(lambda _: self._release(start))
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.stats['timed_out'] += 1
+            raise asyncio.TimeoutError(f"{self.name} call {getattr(func, '__name__', func)} timed out after {self.timeout}s")
+        except Exception:
+            self.stats['errors'] += 1
+            raise
+
+    def _release(self, start: float):
+        elapsed = time.perf_counter() - start
+        self.stats['in_flight'] -= 1
+        self.stats['total_time'] += elapsed
+        self.stats['max_time'] = max(self.stats['max_time'], elapsed)
+        self.semaphore.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        completed = self.stats['calls'] - self.stats['in_flight']
+        return {
+            'max_workers': self.max_workers,
+            'timeout': self.timeout,
+            'avg_time': self.stats['total_time'] / completed if completed else 0.0,
+            **self.stats
+        }
+
+    def shutdown(self, wait: bool = True):
+        self.pool.shutdown(wait=wait)
@@ -7,6 +7,12 @@ from ai_analysis.ai_recommendation_system import AIRecommendationSystem
 from ai_analysis.ai_performance_tracker import AIPerformanceTracker
 from ai_analysis.main_ai_analysis import MainAIAnalysis
 from decision_making.decision_engine import DecisionEngine
+from decision_making.pattern_matching import PatternMatcher
+from decision_making.trade_decision_adjuster import TradeDecisionAdjuster
+from decision_making.risk_management import RiskManagement
+from data.pattern_embedding import PatternEmbeddingService
+from data.vector_database import EnhancedVectorDatabase
+from data.vector_database_enhancement import VectorDatabaseEnhancement
 from order_execution.smart_order_router import SmartOrderRouter
 from business_logic.trading_engine import TradingEngine
 from analysis.main_analysis import MainAnalysis
@@ -32,7 +38,37 @@ class DIContainer(containers.DeclarativeContainer):
     
     error_handler = providers.Singleton(ErrorHandler, logging_service)
 
-    decision_engine = providers.Singleton(DecisionEngine, config)
+    # One embedding service, so the enhancement and pattern-matching paths share its memoised vectors
+    pattern_embedding = providers.Singleton(PatternEmbeddingService, config)
+    vector_database = providers.Singleton(EnhancedVectorDatabase, config, logging_service)
+    vector_db_enhancement = providers.Singleton(
+        VectorDatabaseEnhancement,
+        vector_db=vector_database,
+        config=config,
+        logging_service=logging_service,
+        pattern_embedding=pattern_embedding
+    )
+    pattern_matcher = providers.Singleton(
+        PatternMatcher,
+        config=config,
+        vector_db=vector_database,
+        logging_service=logging_service,
+        pattern_embedding=pattern_embedding
+    )
+    main_analysis = providers.Singleton(MainAnalysis, config, logging_service, vector_db_enhancement)
+    trade_decision_adjuster = providers.Singleton(TradeDecisionAdjuster, config, logging_service)
+    risk_management = providers.Singleton(RiskManagement, config, logging_service)
+
+    decision_engine = providers.Singleton(
+        DecisionEngine,
+        config=config,
+        pattern_matcher=pattern_matcher,
+        trade_decision_adjuster=trade_decision_adjuster,
+        risk_management=risk_management,
+        main_analysis=main_analysis,
+        main_ai_analysis=main_ai_analysis,
+        logging_service=logging_service
+    )
     smart_order_router = providers.Singleton(SmartOrderRouter, config)
 
     # Trading Engine with all required dependencies
@@ -0,0 +1,64 @@
+from typing import Dict, Any, Optional
+import aiohttp
+
+class HttpSessionPool:
+    # One long-lived aiohttp session per owner so connections, TLS sessions and DNS lookups are
+    # reused across requests instead of being rebuilt for every symbol on every cycle.
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.stats = {'sessions': 0, 'requests': 0, 'in_flight': 0, 'connections_created': 0,
+                      'connections_reused': 0, 'dns_cache_hits': 0, 'dns_cache_misses': 0}
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.config.get('limit', 100),
+                limit_per_host=self.config.get('limit_per_host', 10),
+                ttl_dns_cache=self.config.get('dns_cache_ttl', 300),
+                keepalive_timeout=self.config.get('keepalive_timeout', 30)
+            )
+            timeout = aiohttp.ClientTimeout(total=self.config.get('request_timeout', 30))
+            self.session = aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                                 trace_configs=[self._trace_config()])
+            self.stats['sessions'] += 1
+        return self.session
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(session, context, params):
+            self.stats['requests'] += 1
+            self.stats['in_flight'] += 1
+
+        async def on_request_done(session, context, params):
+            self.stats['in_flight'] -= 1
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_done)
+        trace_config.on_request_exception.append(on_request_done)
+        trace_config.on_connection_create_end.append(self._counter('connections_created'))
+        trace_config.on_connection_reuseconn.append(self._counter('connections_reused'))
+        trace_config.on_dns_cache_hit.append(self._counter('dns_cache_hits'))
+        trace_config.on_dns_cache_miss.append(self._counter('dns_cache_misses'))
+        return trace_config
+
+    def _counter(self, key: str):
+        async def handler(session, context, params):
+            self.stats[key] += 1
+        return handler
+
+    async def close(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        connections = self.stats['connections_created'] + self.stats['connections_reused']
+        return {
+            'open': self.session is not None and not self.session.closed,
+            'limit': self.config.get('limit', 100),
+            'limit_per_host': self.config.get('limit_per_host', 10),
+            'connection_reuse_rate': self.stats['connections_reused'] / connections if connections else 0.0,
+            **self.stats
+        }
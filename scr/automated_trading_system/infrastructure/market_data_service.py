@@ -9,5 +9,8 @@ class MarketDataService(MarketDataSubject):
     async def fetch_market_data(self) -> Dict[str, Any]:
         # Implement market data fetching logic
         data = {}  # Placeholder for fetched data
-        await self.notify(data)
+        # Every observer has been updated by now; surface the first failure to the caller
+        errors = await self.notify(data)
+        if errors:
+            raise errors[0]
         return data
@@ -11,11 +11,18 @@ class MarketDataSubject:
         self._observers: List[Observer] = []
 
     def attach(self, observer: Observer):
-        self._observers.append(observer)
+        if observer not in self._observers:
+            self._observers.append(observer)
 
     def detach(self, observer: Observer):
         self._observers.remove(observer)
 
-    async def notify(self, data: Dict[str, Any]):
-        for observer in self._observers:
-            await observer.update(data)
+    async def notify(self, data: Dict[str, Any]) -> List[Exception]:
+        # Every observer sees the update even if an earlier one raises; failures are returned to the caller
+        errors = []
+        for observer in list(self._observers):
+            try:
+                await observer.update(data)
+            except Exception as e:
+                errors.append(e)
+        return errors
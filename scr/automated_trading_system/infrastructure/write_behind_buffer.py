@@ -0,0 +1,119 @@
+from typing import Dict, Any, List, Callable, Awaitable
+import asyncio
+
+class WriteBehindBuffer:
+    # Collects writes and hands them to flush_func in batches of up to batch_size, as soon as a
+    # batch is full or flush_interval seconds after the last flush. Writers wait once max_pending
+    # items are buffered or in flight, so a slow backend pushes back on its producers instead of
+    # growing memory. A failed batch is retried at the head of the queue up to max_retries times,
+    # then dropped so one bad write can't wedge the pipeline.
+    def __init__(self, flush_func: Callable[[List[Any]], Awaitable[None]], batch_size: int = 64,
+                 flush_interval: float = 1.0, max_pending: int = 1000, max_retries: int = 3):
+        self.flush_func = flush_func
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max(max_pending, batch_size)
+        self.max_retries = max_retries
+        self.buffer: List[Any] = []
+        self.in_flight = 0
+        self.attempts = 0
+        self.flush_lock = asyncio.Lock()
+        self.wakeup = asyncio.Event()
+        self.space = asyncio.Event()
+        self.task: asyncio.Task = None
+        self.closed = False
+        self.stats = {'added': 0, 'flushed': 0, 'batches': 0, 'failed_batches': 0, 'dropped': 0,
+                      'backpressure_waits': 0, 'max_pending_seen': 0}
+
+    @classmethod
+    def from_config(cls, flush_func: Callable[[List[Any]], Awaitable[None]], config: Dict[str, Any]) -> 'WriteBehindBuffer':
+        return cls(flush_func, config.get('batch_size', 64), config.get('flush_interval', 1.0),
+                   config.get('max_pending', 1000), config.get('max_retries', 3))
+
+    def pending(self) -> int:
+        return len(self.buffer) + self.in_flight
+
+    async def add(self, item: Any):
+        if self.closed:
+            raise RuntimeError("Write-behind buffer is closed")
+        while self.pending() >= self.max_pending:
+            self.stats['backpressure_waits'] += 1
+            self.space.clear()
+            await self.space.wait()
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+        self.buffer.append(item)
+        self.stats['added'] += 1
+        self.stats['max_pending_seen'] = max(self.stats['max_pending_seen'], self.pending())
+        if len(self.buffer) >= self.batch_size:
+            self.wakeup.set()
+
+    async def _run(self):
+        while True:
+            # Woken by a full batch, only full batches go out; the remainder waits for the interval
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), self.flush_interval)
+                full_only = True
+            except asyncio.TimeoutError:
+                full_only = False
+            self.wakeup.clear()
+            try:
+                await self.flush(full_only)
+            except Exception:
+                # Kept for retry; wait out the interval rather than hammering a failing backend
+                await asyncio.sleep(self.flush_interval)
+
+    async def flush(self, full_only: bool = False):
+        # Writes out everything buffered so far; raises the first batch error after re-queueing the batch
+        async with self.flush_lock:
+            while len(self.buffer) >= (self.batch_size if full_only else 1):
+                batch = self.buffer[:self.batch_size]
+                del self.buffer[:len(batch)]
+                self.in_flight = len(batch)
+                try:
+                    await self.flush_func(batch)
+                except asyncio.CancelledError:
+                    self.buffer[:0] = batch
+                    raise
+                except Exception:
+                    self.stats['failed_batches'] += 1
+                    self.attempts += 1
+                    if self.attempts > self.max_retries:
+                        self.stats['dropped'] += len(batch)
+                        self.attempts = 0
+                    else:
+                        self.buffer[:0] = batch
+                    raise
+                finally:
+                    self.in_flight = 0
+                    self.space.set()
+                self.attempts = 0
+                self.stats['batches'] += 1
+                self.stats['flushed'] += len(batch)
+
+    async def close(self):
+        # Stops the background flusher and writes out whatever is still buffered
+        self.closed = True
+        # Taking the lock lets a batch that is being written finish before the flusher is cancelled
+        async with self.flush_lock:
+            if self.task is not None:
+                self.task.cancel()
+        if self.task is not None:
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+        dropped = self.stats['dropped']
+        while self.buffer:
+            try:
+                await self.flush()
+            except Exception:
+                pass
+        if self.stats['dropped'] > dropped:
+            raise RuntimeError(f"{self.stats['dropped'] - dropped} writes dropped while closing")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'pending': self.pending(),
+            'batch_size': self.batch_size,
+            'avg_batch_size': self.stats['flushed'] / self.stats['batches'] if self.stats['batches'] else 0.0,
+            **self.stats
+        }
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseModel, constr, conint, confloat
 
 class StockConfigUpdate(BaseModel):
@@ -57,4 +58,8 @@ class SystemSettingsUpdate(BaseModel):
     paper_trading: bool
     log_level: constr(regex='^(DEBUG|INFO|WARNING|ERROR|CRITICAL)$')
     max_concurrent_trades: conint(ge=0)
-    data_update_frequency: conint(gt=0)
\ No newline at end of file
+    data_update_frequency: conint(gt=0)
+    concurrent_cycle: bool = False
+    max_concurrent_symbols: Optional[conint(gt=0)] = None
+    symbol_timeout: Optional[conint(gt=0)] = None
+    batch_analysis: bool = False
\ No newline at end of file
@@ -24,4 +24,11 @@ class OrderManagementSystem:
 
     async def get_order_status(self, order_id: str) -> Dict[str, Any]:
         # Implement order status retrieval logic
-        pass
\ No newline at end of file
+        pass
+
+    def get_pool_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: broker_api.get_pool_stats() for name, broker_api in self.broker_apis.items()}
+
+    async def close(self):
+        for broker_api in self.broker_apis.values():
+            await broker_api.close()
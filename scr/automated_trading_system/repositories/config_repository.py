@@ -71,11 +71,14 @@ class ConfigRepository:
                 UPDATE system_settings
                 SET trading_interval = $1, backtesting_start_date = $2, backtesting_end_date = $3,
                     paper_trading = $4, log_level = $5, max_concurrent_trades = $6, data_update_frequency = $7,
-                    vector_db_snapshot_frequency = $8
+                    vector_db_snapshot_frequency = $8, concurrent_cycle = $9, max_concurrent_symbols = $10,
+                    symbol_timeout = $11, batch_analysis = $12
                 WHERE id = 1
             """, settings['trading_interval'], settings['backtesting_start_date'], settings['backtesting_end_date'],
                 settings['paper_trading'], settings['log_level'], settings['max_concurrent_trades'],
-                settings['data_update_frequency'], settings['vector_db_snapshot_frequency'])
+                settings['data_update_frequency'], settings['vector_db_snapshot_frequency'],
+                settings.get('concurrent_cycle', False), settings.get('max_concurrent_symbols'),
+                settings.get('symbol_timeout'), settings.get('batch_analysis', False))
 
     async def get_vector_db_config(self) -> Dict[str, Any]:
         async with self.pool.acquire() as conn:
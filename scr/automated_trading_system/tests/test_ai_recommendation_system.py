@@ -0,0 +1,71 @@
+import asyncio
+import pytest
+from ai_analysis.ai_recommendation_system import AIRecommendationSystem
+
+class FakeProvider:
+    def __init__(self, delay, action='BUY', error=None):
+        self.delay = delay
+        self.action = action
+        self.error = error
+        self.cancelled = False
+
+    async def generate_recommendation(self, data):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error:
+            raise self.error
+        return {'action': self.action, 'confidence': 0.8, 'reasoning': 'test', 'target_price': 110.0, 'stop_loss': 95.0}
+
+def make_system(providers, **config):
+    system = AIRecommendationSystem(config)
+    system.ai_providers = providers
+    return system
+
+@pytest.mark.asyncio
+async def test_fanout_returns_partial_results_within_deadline():
+    system = make_system({'fast': FakeProvider(0.01), 'slow': FakeProvider(1.0), 'broken': FakeProvider(0.01, error=ValueError('bad'))},
+                         ai_provider_timeout=0.1)
+
+    start = asyncio.get_running_loop().time()
+    outcome = await system.collect_recommendations({})
+    assert asyncio.get_running_loop().time() - start < 0.5
+
+    assert list(outcome['recommendations']) == ['fast']
+    assert outcome['timed_out'] == ['slow']
+    assert outcome['failed'] == ['broken']
+    assert system.aggregate_recommendations(outcome['recommendations'])['action'] == 'BUY'
+    assert system.get_provider_stats()['providers']['slow']['timeouts'] == 1
+
+@pytest.mark.asyncio
+async def test_hedged_request_reissues_to_backup_when_primary_is_slow():
+    primary = FakeProvider(1.0, action='SELL')
+    system = make_system({'primary': primary, 'backup': FakeProvider(0.01)},
+                         ai_request_mode='hedged', ai_hedge_delay=0.05, ai_provider_timeout=2)
+
+    outcome = await system.collect_recommendations({})
+
+    assert outcome['hedged']
+    assert outcome['recommendations']['backup']['action'] == 'BUY'
+    assert 'primary' not in outcome['recommendations']
+    assert primary.cancelled
+    assert system.get_provider_stats()['hedging'] == {'requests': 1, 'hedged': 1, 'hedge_wins': 1}
+
+@pytest.mark.asyncio
+async def test_hedged_request_skips_hedge_when_primary_is_fast():
+    backup = FakeProvider(0.01)
+    system = make_system({'primary': FakeProvider(0.01, action='SELL'), 'backup': backup},
+                         ai_request_mode='hedged', ai_hedge_delay=0.5)
+
+    outcome = await system.collect_recommendations({})
+
+    assert not outcome['hedged']
+    assert outcome['recommendations']['primary']['action'] == 'SELL'
+    assert 'backup' not in system.get_provider_stats()['providers']
+
+def test_aggregate_without_recommendations_holds():
+    aggregated = make_system({}).aggregate_recommendations({})
+    assert aggregated['action'] == 'HOLD'
+    assert aggregated['confidence'] == 0.0
@@ -0,0 +1,117 @@
+import numpy as np
+from data.bar_store import BarStore, to_epoch_seconds
+
+def make_bar(price):
+    return {'open': price, 'high': price + 1, 'low': price - 1, 'close': price, 'volume': 100.0}
+
+def test_latest_bars_are_contiguous_views_after_wraparound():
+    store = BarStore({'bar_store_capacity': 5})
+    for i in range(12):
+        store.append('AAPL', 1000 + i, make_bar(float(i)))
+
+    bars = store.get_bars('AAPL', copy=False)
+    np.testing.assert_array_equal(bars['timestamp'], np.arange(1007, 1012))
+    np.testing.assert_array_equal(bars['close'], np.arange(7.0, 12.0))
+    assert bars['close'].base is not None
+    assert bars['close'].flags['C_CONTIGUOUS']
+    assert not bars['close'].flags['WRITEABLE']
+
+    np.testing.assert_array_equal(store.get_bars('AAPL', 3)['close'], [9.0, 10.0, 11.0])
+
+def test_default_bars_are_copies_that_survive_wraparound():
+    store = BarStore({'bar_store_capacity': 3})
+    for i in range(3):
+        store.append('AAPL', 1000 + i, make_bar(float(i)))
+
+    bars = store.get_bars('AAPL')
+    for i in range(3, 6):
+        store.append('AAPL', 1000 + i, make_bar(float(i)))
+
+    np.testing.assert_array_equal(bars['close'], [0.0, 1.0, 2.0])
+    np.testing.assert_array_equal(store.get_bars('AAPL')['close'], [3.0, 4.0, 5.0])
+
+def test_forming_bar_is_revised_and_stale_bars_ignored():
+    store = BarStore({'bar_store_capacity': 5})
+    store.append('AAPL', 1000, make_bar(1.0))
+    store.append('AAPL', 1001, make_bar(2.0))
+
+    assert store.append('AAPL', 1001, make_bar(2.5)) == 'revised'
+    assert store.append('AAPL', 1000, make_bar(9.0)) == 'stale'
+
+    np.testing.assert_array_equal(store.get_bars('AAPL')['close'], [1.0, 2.5])
+    stats = store.get_stats()
+    assert stats['appended'] == 2
+    assert stats['revised'] == 1
+    assert stats['stale'] == 1
+
+def test_provider_snapshot_becomes_market_data():
+    store = BarStore({})
+    snapshot = {'symbol': 'AAPL', 'price': 150.0, 'volume': 1200, 'timestamp': '2024-01-02T15:30:00+00:00',
+                'open': 149.0, 'high': 151.0, 'low': 148.5, 'time_series': [148.0, 150.0]}
+
+    assert store.append_snapshot('AAPL', snapshot) == 'appended'
+    assert store.append_snapshot('AAPL', {'symbol': 'AAPL', 'price': 150.0}) is None
+
+    market_data = store.get_market_data('AAPL')
+    assert market_data['price'] == 150.0
+    assert market_data['timestamp'][-1] == 1704209400
+    np.testing.assert_array_equal(market_data['close'], [150.0])
+    np.testing.assert_array_equal(market_data['volume'], [1200.0])
+
+def test_extend_matches_bar_by_bar_appends():
+    bulk = BarStore({'bar_store_capacity': 8})
+    single = BarStore({'bar_store_capacity': 8})
+    timestamps = np.arange(1000, 1013)
+    closes = np.arange(13, dtype=np.float64)
+    columns = ['open', 'high', 'low', 'close', 'volume']
+
+    bulk.extend('AAPL', timestamps[:5], {column: closes[:5] for column in columns})
+    assert bulk.extend('AAPL', timestamps[3:], {column: closes[3:] for column in columns}) == 8
+    for timestamp, close in zip(timestamps, closes):
+        single.append('AAPL', int(timestamp), {column: close for column in columns})
+
+    for column, values in single.get_bars('AAPL').items():
+        np.testing.assert_array_equal(bulk.get_bars('AAPL')[column], values)
+
+def test_merge_revises_the_forming_bar_and_appends_newer_ones():
+    store = BarStore({'bar_store_capacity': 8})
+    store.append('AAPL', 1000, make_bar(1.0))
+    store.append('AAPL', 1001, make_bar(2.0))
+    delta = {column: np.array([2.5, 3.0, 4.0]) for column in ['open', 'high', 'low', 'close', 'volume']}
+    delta['timestamp'] = np.array([1001, 1002, 1003])
+
+    assert store.merge('AAPL', delta) == {'revised': 1, 'appended': 2}
+    np.testing.assert_array_equal(store.get_bars('AAPL')['close'], [1.0, 2.5, 3.0, 4.0])
+    assert store.last_timestamp('AAPL') == 1003
+    assert store.last_timestamp('MSFT') is None
+
+def test_snapshot_bars_seed_the_buffer_on_first_sight():
+    store = BarStore({'bar_store_capacity': 8})
+    history = {column: np.array([1.0, 2.0, 3.0]) for column in ['open', 'high', 'low', 'close', 'volume']}
+    history['timestamp'] = np.array([1000, 1300, 1600])
+    snapshot = {'symbol': 'AAPL', 'price': 3.0, 'timestamp': 1600, 'time_series': [1.0, 2.0, 3.0], 'bars': history}
+
+    assert store.append_snapshot('AAPL', snapshot) == 'appended'
+    history = {column: np.array([3.5, 4.0]) for column in ['open', 'high', 'low', 'close', 'volume']}
+    history['timestamp'] = np.array([1600, 1900])
+    assert store.append_snapshot('AAPL', dict(snapshot, bars=history)) == 'appended'
+
+    np.testing.assert_array_equal(store.get_bars('AAPL')['close'], [1.0, 2.0, 3.5, 4.0])
+    assert store.covers('AAPL', 4)
+    assert not store.covers('AAPL', 5)
+
+def test_numeric_timestamps_are_read_as_epochs():
+    assert to_epoch_seconds(1700000000) == 1700000000
+    assert to_epoch_seconds(1700000000.75) == 1700000000
+    assert to_epoch_seconds(np.float64(1.7e9)) == 1700000000
+    assert to_epoch_seconds(1700000000123) == 1700000000
+    assert to_epoch_seconds(1.700000000123e12) == 1700000000
+    assert to_epoch_seconds(np.int64(1700000000123456789)) == 1700000000
+    assert to_epoch_seconds('2023-11-14T22:13:20') == 1700000000
+
+def test_float_and_millisecond_timestamps_land_in_the_same_bar():
+    store = BarStore({'bar_store_capacity': 5})
+    store.append('AAPL', 1700000000.0, make_bar(1.0))
+    store.append('AAPL', 1700000300000, make_bar(2.0))
+
+    np.testing.assert_array_equal(store.get_bars('AAPL')['timestamp'], [1700000000, 1700000300])
@@ -0,0 +1,45 @@
+import json
+import numpy as np
+import pytest
+from benchmarks.run_benchmarks import main, SCENARIOS
+from benchmarks.synthetic_data import generate_watchlist
+
+def test_synthetic_watchlist_is_seeded_and_consistent():
+    first = generate_watchlist(3, 200, seed=7)
+    second = generate_watchlist(3, 200, seed=7)
+
+    for symbol, bars in first.items():
+        np.testing.assert_array_equal(bars['close'], second[symbol]['close'])
+        assert np.all(bars['high'] >= np.maximum(bars['open'], bars['close']))
+        assert np.all(bars['low'] <= np.minimum(bars['open'], bars['close']))
+        assert np.all(np.diff(bars['timestamp']) > 0)
+
+@pytest.mark.asyncio
+async def test_benchmark_writes_machine_readable_report(tmp_path):
+    output = tmp_path / 'results.json'
+    await main(['--scenarios', 'analyzers', '--symbols', '2', '--bars', '120', '--cycles', '1', '--output', str(output)])
+
+    report = json.loads(output.read_text())
+    assert report['meta']['args']['symbols'] == [2]
+    result = report['results'][0]
+    assert (result['scenario'], result['symbols'], result['bars']) == ('analyzers', 2, 120)
+    assert result['peak_memory_bytes'] > 0
+    assert result['stages']['volume']['count'] == 2
+    assert {'p50', 'p95', 'p99', 'errors'} <= set(result['stages']['volume'])
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('scenario', SCENARIOS)
+async def test_scenario_runs_without_errors(tmp_path, scenario):
+    output = tmp_path / 'results.json'
+    await main(['--scenarios', scenario, '--symbols', '2', '--bars', '300', '--cycles', '1', '--no-memory',
+                '--output', str(output)])
+
+    result = json.loads(output.read_text())['results'][0]
+    assert 'error' not in result
+    assert result['logged_errors']['count'] == 0, result['logged_errors']['first']
+    assert result['stages']
+    for stage, stats in result['stages'].items():
+        assert stats['errors'] == 0, f"{stage}: {stats.get('first_error')}"
+    if scenario == 'trading_cycle':
+        # Every symbol made it through to a decision
+        assert result['stages']['decision']['count'] == 2
@@ -0,0 +1,65 @@
+import asyncio
+import threading
+import time
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from infrastructure.blocking_executor import BlockingExecutor
+from data.vector_database import EnhancedVectorDatabase
+
+@pytest.mark.asyncio
+async def test_blocking_calls_leave_the_loop_free_and_respect_the_cap():
+    executor = BlockingExecutor('sdk', max_workers=2)
+    ticks = 0
+
+    async def heartbeat():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    heartbeat_task = asyncio.create_task(heartbeat())
+    start = time.monotonic()
+    results = await asyncio.gather(*(executor.run(time.sleep, 0.1) for _ in range(4)))
+    elapsed = time.monotonic() - start
+    heartbeat_task.cancel()
+
+    assert results == [None] * 4
+    assert 0.2 <= elapsed < 0.35
+    assert ticks >= 10
+    stats = executor.get_stats()
+    assert stats['calls'] == 4
+    assert stats['saturated'] == 2
+    assert stats['in_flight'] == 0
+    executor.shutdown()
+
+@pytest.mark.asyncio
+async def test_timed_out_call_keeps_its_slot_until_the_sdk_returns():
+    executor = BlockingExecutor('sdk', max_workers=1, timeout=0.05)
+    release = threading.Event()
+
+    with pytest.raises(asyncio.TimeoutError):
+        await executor.run(release.wait)
+    assert executor.get_stats()['in_flight'] == 1
+    assert executor.semaphore.locked()
+
+    release.set()
+    assert await executor.run(lambda: 'ok') == 'ok'
+    stats = executor.get_stats()
+    assert stats['timed_out'] == 1
+    assert stats['in_flight'] == 0
+    executor.shutdown()
+
+@pytest.mark.asyncio
+async def test_vector_database_runs_qdrant_calls_on_its_executor():
+    database = EnhancedVectorDatabase({'blocking_executors': {'qdrant': {'max_workers': 2, 'timeout': 1}}}, AsyncMock())
+    database.client = MagicMock()
+    database.client.search.side_effect = lambda **kwargs: [MagicMock(id='AAPL_1', score=0.9, payload={'symbol': 'AAPL'}),
+                                                             MagicMock(id=threading.current_thread().name, score=0.1, payload={})]
+
+    results = await database.query_similar_vectors(np.ones(4), 2)
+
+    assert results[0] == {'id': 'AAPL_1', 'score': 0.9, 'metadata': {'symbol': 'AAPL'}}
+    assert results[1]['id'].startswith('qdrant')
+    assert database.get_executor_stats()['calls'] == 1
+    await database.close()
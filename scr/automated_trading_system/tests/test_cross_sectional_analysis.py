@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+import talib
+from analysis.adaptive_parameters_manager import AdaptiveParametersManager
+from analysis.cross_sectional_analysis import CrossSectionalAnalysis
+from analysis.indicator_cache import IndicatorCache
+from analysis.volume_analysis import VolumeAnalysis
+
+def make_market_data(seed, size=300, start=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, size))
+    close[size // 2] *= 1.2
+    return {
+        'timestamp': np.arange(start, start + size, dtype=np.int64),
+        'high': close + rng.uniform(0, 2, size),
+        'low': close - rng.uniform(0, 2, size),
+        'close': close,
+        'volume': rng.uniform(1000, 5000, size)
+    }
+
+@pytest.fixture
+def watchlist():
+    universe = {f'SYM{i}': make_market_data(i) for i in range(6)}
+    universe['LAGGING'] = make_market_data(99, start=-1)
+    return universe
+
+def test_batch_rows_match_per_symbol_computation(watchlist):
+    results = CrossSectionalAnalysis({}).analyze_batch(watchlist)
+
+    assert sorted(results) == [f'SYM{i}' for i in range(6)]
+    volume_analysis = VolumeAnalysis({})
+    for symbol, features in results.items():
+        market_data = watchlist[symbol]
+        df = pd.DataFrame(market_data)
+        returns = np.diff(market_data['close']) / market_data['close'][:-1]
+        z_scores = (returns - np.mean(returns)) / np.std(returns)
+
+        np.testing.assert_array_equal(features['OBV'], talib.OBV(market_data['close'], market_data['volume']))
+        np.testing.assert_array_equal(features['VWAP'], volume_analysis.calculate_vwap(df))
+        np.testing.assert_allclose(features['VPT'], volume_analysis.calculate_vpt(df), rtol=1e-12)
+        assert features['volatility'] == pytest.approx(np.std(returns), rel=1e-12)
+        assert features['anomalies'] == [i for i, z in enumerate(z_scores) if abs(z) > 3]
+
+@pytest.mark.asyncio
+async def test_batch_features_are_served_from_indicator_cache(watchlist):
+    cache = IndicatorCache({})
+    batch = CrossSectionalAnalysis({}, cache).analyze_batch(watchlist)
+    seeded_misses = cache.get_stats()['misses']
+
+    data = {'market_data': watchlist['SYM0'], 'symbol': 'SYM0'}
+    results = await VolumeAnalysis({}, cache).analyze(data)
+    assert results['OBV'] is batch['SYM0']['OBV']
+    assert results['VWAP'] is batch['SYM0']['VWAP']
+    assert results['VPT'] is batch['SYM0']['VPT']
+
+    await AdaptiveParametersManager({}, cache).adjust_parameters(dict(watchlist['SYM0'], symbol='SYM0'))
+    # AD and MFI are not batched, everything else was a hit
+    assert cache.get_stats()['misses'] == seeded_misses + 2
+    assert cache.get_stats()['hits'] == 4
@@ -0,0 +1,94 @@
+import asyncio
+import pandas as pd
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from data.data_provider_strategy import DataProviderStrategy, YahooFinanceStrategy, BrokerAPIStrategy, HistoryNotSupportedError
+
+class SlowProvider(DataProviderStrategy):
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+
+    async def fetch_data(self, symbol):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        if symbol == 'BAD':
+            raise ValueError("unknown symbol")
+        return {'symbol': symbol}
+
+def make_history(close):
+    index = pd.date_range('2024-01-02 14:30', periods=2, freq='5min', tz='UTC')
+    return pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close, 'Volume': [100.0, 200.0]}, index=index)
+
+@pytest.mark.asyncio
+async def test_fallback_fetch_many_is_bounded_and_isolates_failures():
+    provider = SlowProvider()
+
+    results = await provider.fetch_many(['AAPL', 'BAD', 'GOOGL', 'MSFT'], max_concurrency=2)
+
+    assert provider.peak == 2
+    assert results['AAPL'] == {'symbol': 'AAPL'}
+    assert isinstance(results['BAD'], ValueError)
+
+@pytest.mark.asyncio
+async def test_yahoo_fetch_many_downloads_in_batches():
+    provider = YahooFinanceStrategy(batch_size=2)
+
+    def download(tickers, **kwargs):
+        history = pd.concat({ticker: make_history([1.0, 2.0]) for ticker in tickers if ticker != 'BAD'}, axis=1)
+        return history.reindex(columns=pd.MultiIndex.from_product([tickers, history[tickers[0]].columns]))
+
+    with patch('data.data_provider_strategy.yf.download', side_effect=download) as mock_download:
+        results = await provider.fetch_many(['AAPL', 'BAD', 'GOOGL'])
+
+    assert mock_download.call_count == 2
+    assert results['AAPL']['price'] == 2.0
+    assert results['GOOGL']['time_series'] == [1.0, 2.0]
+    assert isinstance(results['BAD'], ValueError)
+
+@pytest.mark.asyncio
+async def test_broker_fetch_many_uses_multi_symbol_endpoint():
+    broker_api = AsyncMock()
+    broker_api.get_stocks_data.return_value = {'AAPL': {'last_price': 150.0, 'volume': 100, 'timestamp': 1000, 'open': 149.0,
+                                                         'high': 151.0, 'low': 148.0, 'price_history': [150.0]}}
+    provider = BrokerAPIStrategy(broker_api)
+
+    results = await provider.fetch_many(['AAPL', 'GOOGL'])
+
+    broker_api.get_stocks_data.assert_called_once_with(['AAPL', 'GOOGL'])
+    broker_api.get_stock_data.assert_not_called()
+    assert results['AAPL']['price'] == 150.0
+    assert isinstance(results['GOOGL'], ValueError)
+
+@pytest.mark.asyncio
+async def test_broker_history_uses_bar_endpoint_when_available():
+    broker_api = AsyncMock()
+    broker_api.get_stock_history.return_value = [
+        {'timestamp': '2024-01-02T14:30:00', 'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': 1.5, 'volume': 100},
+        {'timestamp': '2024-01-02T14:35:00', 'open': 1.5, 'high': 2.5, 'low': 1.0, 'close': 2.0, 'volume': 200}]
+
+    bars = await BrokerAPIStrategy(broker_api).fetch_history('AAPL', 1704205800, 1704206100, '5m')
+
+    broker_api.get_stock_history.assert_called_once_with('AAPL', 1704205800, 1704206100, '5m')
+    assert bars['timestamp'].tolist() == [1704205800]
+    assert bars['close'].tolist() == [1.5]
+
+    without_history = BrokerAPIStrategy(object())
+    assert not without_history.supports_history
+    with pytest.raises(HistoryNotSupportedError):
+        await without_history.fetch_history('AAPL', 1704205800, 1704206100, '5m')
+
+@pytest.mark.asyncio
+async def test_yahoo_history_becomes_columnar_epoch_bars():
+    provider = YahooFinanceStrategy()
+    ticker = MagicMock()
+    ticker.history.return_value = make_history([1.0, 2.0])
+
+    with patch('data.data_provider_strategy.yf.Ticker', return_value=ticker):
+        bars = await provider.fetch_history('AAPL', 1704205800, 1704292200, '5m')
+
+    assert ticker.history.call_args.kwargs['interval'] == '5m'
+    assert bars['timestamp'].tolist() == [1704205800, 1704206100]
+    assert bars['close'].tolist() == [1.0, 2.0]
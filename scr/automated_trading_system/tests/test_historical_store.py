@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, patch
+from data.historical_store import HistoricalStore, interval_start
+from data.data_provider_strategy import HistoryNotSupportedError
+from data.stock_data_manager import StockDataManager
+
+DAY = 86400
+JAN_2 = 1704153600  # 2024-01-02 00:00 UTC
+
+def make_bars(days, close_offset=0.0):
+    timestamps = JAN_2 + DAY * np.asarray(days, dtype=np.int64)
+    closes = np.asarray(days, dtype=np.float64) + close_offset
+    return {'timestamp': timestamps, 'open': closes, 'high': closes + 1, 'low': closes - 1, 'close': closes, 'volume': closes * 100}
+
+def test_bars_round_trip_through_memory_mapped_partitions(tmp_path):
+    store = HistoricalStore({'historical_store_path': str(tmp_path), 'historical_interval': '1h'})
+    store.write('AAPL', make_bars([0, 1, 2]), JAN_2, JAN_2 + 3 * DAY)
+    store.write('AAPL', make_bars([2, 3], close_offset=0.5), JAN_2 + 2 * DAY, JAN_2 + 4 * DAY)
+
+    single = store.read('AAPL', JAN_2 + DAY, JAN_2 + 2 * DAY)
+    assert isinstance(single['close'], np.memmap)
+    np.testing.assert_array_equal(single['close'], [1.0])
+
+    bars = store.read('AAPL', JAN_2, JAN_2 + 4 * DAY)
+    np.testing.assert_array_equal(bars['close'], [0.0, 1.0, 2.5, 3.5])
+    assert store.get_coverage('AAPL') == [(JAN_2, JAN_2 + 4 * DAY)]
+    assert HistoricalStore({'historical_store_path': str(tmp_path), 'historical_interval': '1h'}).symbols() == ['AAPL']
+
+def test_missing_ranges_only_cover_gaps(tmp_path):
+    store = HistoricalStore({'historical_store_path': str(tmp_path)})
+    store.write('AAPL', make_bars([1]), JAN_2 + DAY, JAN_2 + 2 * DAY)
+    store.write('AAPL', make_bars([]), JAN_2 + 4 * DAY, JAN_2 + 6 * DAY)
+
+    assert store.missing_ranges('AAPL', JAN_2, JAN_2 + 7 * DAY) == [
+        (JAN_2, JAN_2 + DAY), (JAN_2 + 2 * DAY, JAN_2 + 4 * DAY), (JAN_2 + 6 * DAY, JAN_2 + 7 * DAY)]
+    assert store.missing_ranges('AAPL', JAN_2 + DAY, JAN_2 + 2 * DAY) == []
+
+@pytest.mark.asyncio
+async def test_historical_queries_fetch_only_missing_dates(tmp_path):
+    data_fetcher = AsyncMock()
+    data_fetcher.fetch_history.side_effect = lambda symbol, start, end, interval: make_bars(range((start - JAN_2) // DAY, (end - JAN_2) // DAY))
+    manager = StockDataManager({'historical_store_path': str(tmp_path)}, data_fetcher, AsyncMock(), AsyncMock(), AsyncMock())
+
+    first = await manager.get_historical_data('AAPL', '2024-01-03', '2024-01-04')
+    second = await manager.get_historical_data('AAPL', '2024-01-02', '2024-01-05')
+
+    np.testing.assert_array_equal(first['close'], [1.0, 2.0])
+    np.testing.assert_array_equal(second['close'], [0.0, 1.0, 2.0, 3.0])
+    assert [call.args[1:3] for call in data_fetcher.fetch_history.call_args_list] == [
+        (JAN_2 + DAY, JAN_2 + 3 * DAY), (JAN_2, JAN_2 + DAY), (JAN_2 + 3 * DAY, JAN_2 + 4 * DAY)]
+
+@pytest.mark.asyncio
+async def test_forming_bar_is_never_recorded_as_covered(tmp_path):
+    data_fetcher = AsyncMock()
+    data_fetcher.fetch_history.side_effect = lambda symbol, start, end, interval: make_bars(range((start - JAN_2) // DAY, (end - JAN_2) // DAY))
+    manager = StockDataManager({'historical_store_path': str(tmp_path)}, data_fetcher, AsyncMock(), AsyncMock(), AsyncMock())
+
+    with patch('data.stock_data_manager.time.time', return_value=JAN_2 + 2 * DAY + 3600):
+        await manager.get_historical_data('AAPL', '2024-01-02', '2024-01-05')
+
+    assert manager.historical_store.get_coverage('AAPL') == [(JAN_2, JAN_2 + 2 * DAY)]
+
+@pytest.mark.asyncio
+async def test_providers_without_history_serve_only_stored_bars(tmp_path):
+    data_fetcher = AsyncMock()
+    data_fetcher.supports_history = False
+    manager = StockDataManager({'historical_store_path': str(tmp_path)}, data_fetcher, AsyncMock(), AsyncMock(), AsyncMock())
+    manager.historical_store.write('AAPL', make_bars([0, 1]), JAN_2, JAN_2 + 2 * DAY)
+
+    stored = await manager.get_historical_data('AAPL', '2024-01-02', '2024-01-03')
+    with pytest.raises(HistoryNotSupportedError):
+        await manager.get_historical_data('AAPL', '2024-01-02', '2024-01-05')
+
+    np.testing.assert_array_equal(stored['close'], [0.0, 1.0])
+    data_fetcher.fetch_history.assert_not_called()
+
+def test_interval_start_floors_to_the_current_bar():
+    now = JAN_2 + 2 * DAY + 3725
+    assert interval_start(now, '5m') == JAN_2 + 2 * DAY + 3600
+    assert interval_start(now, '1h') == JAN_2 + 2 * DAY + 3600
+    assert interval_start(now, '1d') == JAN_2 + 2 * DAY
+    assert interval_start(now, '1wk') == JAN_2 - DAY  # Monday 2024-01-01
+    assert interval_start(now, '1mo') == JAN_2 - DAY
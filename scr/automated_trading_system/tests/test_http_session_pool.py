@@ -0,0 +1,50 @@
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from infrastructure.http_session_pool import HttpSessionPool
+from data.data_provider_strategy import AlphaVantageStrategy
+
+async def intraday(request):
+    return web.json_response({"Time Series (5min)": {
+        "2024-01-02 15:30:00": {"1. open": "149.0", "2. high": "151.0", "3. low": "148.5", "4. close": "150.0", "5. volume": "1200"}
+    }})
+
+def make_server():
+    app = web.Application()
+    app.router.add_get('/query', intraday)
+    return TestServer(app)
+
+@pytest.mark.asyncio
+async def test_session_is_shared_and_connections_reused():
+    pool = HttpSessionPool({'limit_per_host': 2})
+    strategy = AlphaVantageStrategy('demo', pool)
+
+    async with make_server() as server:
+        strategy.base_url = str(server.make_url('/query'))
+        for symbol in ['AAPL', 'GOOGL', 'MSFT']:
+            data = await strategy.fetch_data(symbol)
+            assert data['price'] == 150.0
+
+        stats = pool.get_stats()
+        assert stats['sessions'] == 1
+        assert stats['requests'] == 3
+        assert stats['in_flight'] == 0
+        assert stats['connections_created'] == 1
+        assert stats['connections_reused'] == 2
+
+        # The shared pool belongs to DataFetcher, so closing the strategy leaves it open
+        await strategy.close()
+        assert pool.get_stats()['open']
+        await pool.close()
+        assert not pool.get_stats()['open']
+
+@pytest.mark.asyncio
+async def test_standalone_strategy_owns_its_pool():
+    strategy = AlphaVantageStrategy('demo')
+
+    async with make_server() as server:
+        strategy.base_url = str(server.make_url('/query'))
+        await strategy.fetch_data('AAPL')
+        await strategy.close()
+
+    assert not strategy.session_pool.get_stats()['open']
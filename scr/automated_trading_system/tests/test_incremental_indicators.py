@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+import talib
+from analysis.incremental_indicators import IncrementalIndicatorEngine
+
+@pytest.fixture
+def market_data():
+    rng = np.random.default_rng(42)
+    size = 400
+    close = 100 + np.cumsum(rng.normal(0, 1, size))
+    return {
+        'timestamp': list(range(size)),
+        'open': close + rng.normal(0, 0.5, size),
+        'high': close + rng.uniform(0, 2, size),
+        'low': close - rng.uniform(0, 2, size),
+        'close': close,
+        'volume': rng.integers(1000, 5000, size).astype(float)
+    }
+
+def talib_reference(data):
+    high, low, close, volume = data['high'], data['low'], data['close'], data['volume']
+    reference = {
+        'SMA_10': talib.SMA(close, timeperiod=10),
+        'SMA_50': talib.SMA(close, timeperiod=50),
+        'EMA_10': talib.EMA(close, timeperiod=10),
+        'EMA_50': talib.EMA(close, timeperiod=50),
+        'RSI': talib.RSI(close, timeperiod=14),
+        'ATR': talib.ATR(high, low, close),
+        'MFI': talib.MFI(high, low, close, volume),
+        'CMF': talib.ADOSC(high, low, close, volume),
+        'CCI': talib.CCI(high, low, close),
+        'SAR': talib.SAR(high, low),
+    }
+    reference['MACD'], reference['MACD_Signal'], reference['MACD_Hist'] = talib.MACD(close)
+    reference['BB_Upper'], reference['BB_Middle'], reference['BB_Lower'] = talib.BBANDS(close, timeperiod=20)
+    reference['STOCH_K'], reference['STOCH_D'] = talib.STOCH(high, low, close)
+    return reference
+
+def head(data, size):
+    return {column: values[:size] for column, values in data.items()}
+
+def assert_matches_talib(results, data):
+    for name, expected in talib_reference(data).items():
+        np.testing.assert_allclose(results[name], expected, rtol=1e-7, atol=1e-7, err_msg=name)
+
+def test_incremental_updates_match_talib(market_data):
+    engine = IncrementalIndicatorEngine({})
+
+    for size in [120, 121, 250, 400]:
+        results = engine.update('AAPL', head(market_data, size))
+        assert_matches_talib(results, head(market_data, size))
+
+    stats = engine.get_stats()
+    assert stats['rebuilds'] == 1
+    assert stats['bars_applied'] == 400
+
+def test_revised_last_bar_matches_talib(market_data):
+    engine = IncrementalIndicatorEngine({})
+    engine.update('AAPL', head(market_data, 300))
+
+    revised = {column: np.array(values[:300], copy=True) if column != 'timestamp' else values[:300]
+               for column, values in market_data.items()}
+    revised['close'][-1] += 1.5
+    revised['high'][-1] = max(revised['high'][-1], revised['close'][-1])
+    results = engine.update('AAPL', revised)
+
+    assert_matches_talib(results, revised)
+    assert engine.get_stats()['bars_revised'] == 1
+
+def test_unrelated_history_triggers_rebuild(market_data):
+    engine = IncrementalIndicatorEngine({})
+    engine.update('AAPL', head(market_data, 200))
+
+    shifted = dict(market_data, timestamp=[ts + 10000 for ts in market_data['timestamp']])
+    results = engine.update('AAPL', shifted)
+
+    assert_matches_talib(results, shifted)
+    assert engine.get_stats()['rebuilds'] == 2
+
+def window(data, end, size):
+    return {column: values[end - size:end] for column, values in data.items()}
+
+def test_sliding_window_keeps_buffers_bounded_and_fibonacci_on_window(market_data):
+    engine = IncrementalIndicatorEngine({'bar_store_capacity': 100})
+
+    for end in range(100, 401, 30):
+        results = engine.update('AAPL', window(market_data, end, 100))
+        for name, expected in talib_reference(head(market_data, end)).items():
+            np.testing.assert_allclose(results[name], expected[-100:], rtol=1e-7, atol=1e-7, err_msg=name)
+        high, low = market_data['high'][end - 100:end].max(), market_data['low'][end - 100:end].min()
+        assert results['Fib_50.0'] == pytest.approx(high - 0.5 * (high - low))
+
+    state = engine.states['AAPL']
+    assert len(state.outputs['SMA_10']) == 100
+    assert state.outputs['SMA_10'].capacity == 100
+    assert engine.get_stats()['rebuilds'] == 1
+
+def test_revision_after_wraparound_matches_talib(market_data):
+    engine = IncrementalIndicatorEngine({'bar_store_capacity': 100})
+    engine.update('AAPL', window(market_data, 200, 100))
+    engine.update('AAPL', window(market_data, 250, 100))
+
+    revised = {column: np.array(values[:250], copy=True) for column, values in market_data.items()}
+    revised['close'][-1] -= 2.0
+    revised['low'][-1] = min(revised['low'][-1], revised['close'][-1])
+    for _ in range(2):
+        results = engine.update('AAPL', window(revised, 250, 100))
+
+    for name, expected in talib_reference(window(revised, 250, 150)).items():
+        np.testing.assert_allclose(results[name], expected[-100:], rtol=1e-7, atol=1e-7, err_msg=name)
+    assert results['Fib_61.8'] == pytest.approx(revised['high'][150:].max() - 0.618 * (revised['high'][150:].max() - revised['low'][150:].min()))
+    assert engine.get_stats()['bars_revised'] == 1
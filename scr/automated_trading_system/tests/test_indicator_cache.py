@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from analysis.indicator_cache import IndicatorCache, indicator_scope
+from analysis.trend_analysis import TrendAnalysis
+from analysis.volume_analysis import VolumeAnalysis
+
+@pytest.fixture
+def market_data():
+    rng = np.random.default_rng(7)
+    size = 200
+    close = 100 + np.cumsum(rng.normal(0, 1, size))
+    return {
+        'timestamp': list(range(size)),
+        'open': close,
+        'high': close + rng.uniform(0, 2, size),
+        'low': close - rng.uniform(0, 2, size),
+        'close': close,
+        'volume': rng.uniform(1000, 5000, size)
+    }
+
+def test_scope_keys_on_parameters_timeframe_and_version(market_data):
+    cache = IndicatorCache({})
+    calls = []
+    compute = lambda: calls.append(1) or len(calls)
+
+    base = indicator_scope(cache, {'market_data': market_data, 'symbol': 'AAPL'})
+    assert base.get('SMA', {'timeperiod': 10}, compute) == 1
+    assert base.get('SMA', {'timeperiod': 10}, compute) == 1
+    assert base.get('SMA', {'timeperiod': 20}, compute) == 2
+
+    hourly = indicator_scope(cache, {'market_data': market_data, 'symbol': 'AAPL', 'timeframe': '1h'})
+    assert hourly.get('SMA', {'timeperiod': 10}, compute) == 3
+
+    revised = dict(market_data, close=np.append(market_data['close'][:-1], 1.0))
+    assert indicator_scope(cache, {'market_data': revised, 'symbol': 'AAPL'}).get('SMA', {'timeperiod': 10}, compute) == 4
+
+    stats = cache.get_stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 4
+
+    cache.begin_cycle()
+    assert cache.get_stats()['entries'] == 0
+    assert base.get('SMA', {'timeperiod': 10}, compute) == 5
+
+@pytest.mark.asyncio
+async def test_analyzers_share_cached_indicators(market_data):
+    cache = IndicatorCache({})
+    data = {'market_data': market_data, 'symbol': 'AAPL'}
+
+    uncached = await TrendAnalysis({}).analyze(data)
+    cached = await TrendAnalysis({}, cache).analyze(data)
+    assert cached['chart_patterns'] == uncached['chart_patterns']
+    assert cached['fractals'] == uncached['fractals']
+    # Head and shoulders and double top scan the same peaks
+    assert cache.get_stats()['hits'] == 1
+
+    await VolumeAnalysis({}, cache).analyze(data)
+    mfi = indicator_scope(cache, data).get('MFI', {'timeperiod': 14}, lambda: pytest.fail('MFI recomputed'))
+    assert len(mfi) == len(market_data['close'])
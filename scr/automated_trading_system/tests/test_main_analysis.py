@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock
+from analysis.main_analysis import MainAnalysis
+
+SENTIMENT_CONFIG = {'sentiment_analysis': {'azure_text_analytics': {'key': 'test', 'endpoint': 'https://example.invalid/'}}}
+
+@pytest.fixture
+def market_data():
+    rng = np.random.default_rng(11)
+    size = 300
+    close = 100 + np.cumsum(rng.normal(0, 1, size))
+    return {
+        'symbol': 'AAPL',
+        'timestamp': np.arange(size) * 60,
+        'open': close + rng.normal(0, 0.5, size),
+        'high': close + rng.uniform(0.5, 2, size),
+        'low': close - rng.uniform(0.5, 2, size),
+        'close': close,
+        'volume': rng.uniform(1000, 5000, size)
+    }
+
+def create_main_analysis(config):
+    vector_db_enhancement = AsyncMock()
+    vector_db_enhancement.find_similar_patterns.return_value = []
+    main_analysis = MainAnalysis(dict(SENTIMENT_CONFIG, **config), AsyncMock(), vector_db_enhancement)
+    main_analysis.sentiment_analysis = AsyncMock()
+    main_analysis.sentiment_analysis.analyze.return_value = {'overall_sentiment': 0.1}
+    if main_analysis.execution_mode == 'concurrent':
+        main_analysis.executor = main_analysis._create_executor()
+    return main_analysis
+
+async def analyze(config, market_data):
+    main_analysis = create_main_analysis(config)
+    try:
+        return await main_analysis.analyze(market_data, []), main_analysis.get_indicator_cache_stats()
+    finally:
+        await main_analysis.close()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('config', [
+    {'analysis_execution_mode': 'concurrent', 'analysis_executor': 'thread', 'analysis_max_workers': 4},
+    {'analysis_execution_mode': 'concurrent', 'analysis_executor': 'process', 'analysis_max_workers': 2},
+])
+async def test_concurrent_modes_match_sequential(market_data, config):
+    expected, expected_stats = await analyze({}, market_data)
+    results, stats = await analyze(config, market_data)
+
+    assert results['summary'] == expected['summary']
+    assert results['patterns']['most_recent_pattern'] == expected['patterns']['most_recent_pattern']
+    assert stats['entries'] == expected_stats['entries']
+    assert set(results['timings']) == set(expected['timings'])
+
+@pytest.mark.asyncio
+async def test_analysis_results_are_not_stored_as_patterns(market_data):
+    # StockDataManager stores each fetched snapshot; the analysis results have no series to embed
+    main_analysis = create_main_analysis({})
+
+    await main_analysis.analyze(market_data, [])
+
+    main_analysis.vector_db_enhancement.enhance_database.assert_not_called()
+    main_analysis.vector_db_enhancement.find_similar_patterns.assert_awaited_once_with(market_data)
+
+@pytest.mark.asyncio
+async def test_process_workers_merge_indicators_into_the_shared_cache(market_data):
+    expected, expected_stats = await analyze({}, market_data)
+    results, stats = await analyze({'analysis_execution_mode': 'concurrent', 'analysis_executor': 'process',
+                                    'analysis_max_workers': 2}, market_data)
+
+    assert results['summary'] == expected['summary']
+    assert stats['entries'] == expected_stats['entries']
+
+@pytest.mark.asyncio
+async def test_incremental_technical_stage_stays_in_process(market_data):
+    config = {'analysis_execution_mode': 'concurrent', 'analysis_executor': 'process', 'analysis_max_workers': 2,
+              'incremental_indicators': True}
+    main_analysis = create_main_analysis(config)
+    try:
+        await main_analysis.analyze(market_data, [])
+        await main_analysis.analyze(dict(market_data), [])
+    finally:
+        await main_analysis.close()
+
+    assert main_analysis.technical_analysis.incremental_engine.get_stats()['rebuilds'] == 1
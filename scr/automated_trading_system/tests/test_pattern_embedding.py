@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock
+from sklearn.preprocessing import normalize
+from tslearn.preprocessing import TimeSeriesScalerMeanVariance
+from tslearn.piecewise import SymbolicAggregateApproximation
+from data.pattern_embedding import PatternEmbeddingService
+from data.vector_database_enhancement import VectorDatabaseEnhancement
+
+def market_data(symbol, bars=120, seed=0):
+    closes = 100 + np.cumsum(np.random.default_rng(seed).normal(size=bars))
+    return {'symbol': symbol, 'close': closes, 'timestamp': np.arange(bars) * 300}
+
+def test_vectors_match_sax_encoding_and_are_memoised_per_data_version():
+    service = PatternEmbeddingService({'pattern_window': 100})
+    data = market_data('AAPL')
+
+    vector = service.embed(data)
+
+    scaled = TimeSeriesScalerMeanVariance().fit_transform(data['close'][-100:].reshape(1, -1, 1))
+    expected = normalize(SymbolicAggregateApproximation(n_segments=10, alphabet_size_avg=5).fit_transform(scaled).reshape(1, -1))[0]
+    np.testing.assert_allclose(vector, expected)
+    assert service.embed(dict(data)) is vector
+
+    revised = dict(data, close=np.append(data['close'][:-1], data['close'][-1] + 1))
+    service.embed(revised)
+    assert service.get_stats()['hits'] == 1
+    assert service.get_stats()['misses'] == 2
+
+def test_batch_encodes_uncached_symbols_in_one_call():
+    service = PatternEmbeddingService({})
+    items = [market_data(f"SYM{index}", seed=index) for index in range(20)]
+    single = [PatternEmbeddingService({}).embed(item) for item in items]
+    service.embed(items[0])
+
+    vectors = service.embed_batch(items + [market_data('SHORT', bars=40)])
+
+    for vector, expected in zip(vectors, single):
+        np.testing.assert_allclose(vector, expected)
+    assert vectors[-1].shape == (10,)
+    # One call for the first symbol, then one per distinct window length
+    assert service.get_stats()['encode_calls'] == 3
+    assert service.get_stats()['hits'] == 1
+
+@pytest.mark.asyncio
+async def test_storing_and_querying_the_same_window_encode_it_once():
+    service = PatternEmbeddingService({})
+    vector_db = AsyncMock()
+    vector_db.query_similar_vectors.return_value = []
+    enhancement = VectorDatabaseEnhancement(vector_db, {}, AsyncMock(), pattern_embedding=service)
+    data = market_data('AAPL')
+    data['time_series'] = data['close']
+
+    await enhancement.enhance_database(data)
+    await enhancement.find_similar_patterns(data)
+    await enhancement.enhance_database_batch([data])
+
+    assert service.get_stats()['encode_calls'] == 1
+    stored = [call.args[0] for call in vector_db.store_vector.call_args_list]
+    assert stored[0] is stored[1] is vector_db.query_similar_vectors.call_args.args[0]
+
+@pytest.mark.asyncio
+async def test_stored_timestamps_are_epoch_seconds():
+    vector_db = AsyncMock()
+    enhancement = VectorDatabaseEnhancement(vector_db, {}, AsyncMock())
+    snapshot = {'symbol': 'AAPL', 'close': np.arange(120, dtype=float), 'timestamp': '2024-01-02 14:30:00'}
+
+    await enhancement.enhance_database(snapshot)
+    await enhancement.enhance_database(dict(snapshot, timestamp='2024-01-02T14:30:00'))
+    await enhancement.enhance_database(dict(snapshot, timestamp=np.array([1704205500, 1704205800])))
+
+    stored = [call.args[1] for call in vector_db.store_vector.call_args_list]
+    assert [metadata['timestamp'] for metadata in stored] == [1704205800] * 3
+    assert stored[0]['id'] == 'AAPL_1704205800'
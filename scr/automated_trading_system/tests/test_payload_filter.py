@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from qdrant_client.http.models import FieldCondition, MatchAny, MatchValue, PayloadSchemaType, Range
+from data.vector_database import EnhancedVectorDatabase
+from data.vector_index import LocalVectorIndex, ReadThroughVectorIndex, payload_filter
+
+SECTORS = ['Tech', 'Energy', 'Health']
+
+def filled_index(path, count=300):
+    rng = np.random.default_rng(3)
+    index = LocalVectorIndex(str(path))
+    index.upsert('patterns', [{'id': f"p{row}", 'vector': rng.normal(size=8).tolist(),
+                               'payload': {'row': row, 'symbol': f"S{row % 10}", 'sector': SECTORS[row % 3],
+                                           'timestamp': 1000 + row}}
+                              for row in range(count)])
+    return index, rng
+
+def test_payload_filter_builds_match_any_and_range_conditions():
+    query_filter = payload_filter({'symbol': np.str_('AAPL'), 'sector': ['Tech', 'Energy'],
+                                   'timestamp': {'gte': np.int64(10), 'lt': 20}})
+
+    assert query_filter.must == [
+        FieldCondition(key='sector', match=MatchAny(any=['Tech', 'Energy'])),
+        FieldCondition(key='symbol', match=MatchValue(value='AAPL')),
+        FieldCondition(key='timestamp', range=Range(gte=10, lt=20)),
+    ]
+    assert payload_filter(None) is None
+
+@pytest.mark.parametrize('indexed', [False, True])
+def test_filtered_search_ranks_only_matching_points(tmp_path, indexed):
+    index, rng = filled_index(tmp_path)
+    if indexed:
+        index.create_payload_index('patterns', 'sector', PayloadSchemaType.KEYWORD)
+        index.create_payload_index('patterns', 'timestamp', PayloadSchemaType.INTEGER)
+    query = rng.normal(size=8)
+
+    hits = index.search('patterns', query, limit=5,
+                        query_filter=payload_filter({'sector': ['Tech', 'Health'], 'timestamp': {'gte': 1100, 'lt': 1200}}))
+
+    rows = [row for row in range(300) if row % 3 != 1 and 100 <= row < 200]
+    expected = index.search('patterns', query, limit=300)
+    expected = [hit.payload['row'] for hit in expected if hit.payload['row'] in rows][:5]
+    assert [hit.payload['row'] for hit in hits] == expected
+
+def test_keyword_index_follows_payload_updates(tmp_path):
+    index, rng = filled_index(tmp_path, count=30)
+    index.create_payload_index('patterns', 'outcome')
+    index.update_payload('patterns', points=['p4', 'p7'], payload={'outcome': 'success'})
+    index.update_payload('patterns', points=['p7'], payload={'outcome': 'failure'})
+
+    hits = index.search('patterns', rng.normal(size=8), limit=10, query_filter=payload_filter({'outcome': 'success'}))
+
+    assert [hit.id for hit in hits] == ['p4']
+
+def test_payload_indexes_survive_reopen(tmp_path):
+    index, rng = filled_index(tmp_path, count=50)
+    index.create_payload_index('patterns', 'symbol')
+    index.close()
+
+    reopened = LocalVectorIndex(str(tmp_path))
+    reopened.upsert('patterns', [{'id': 'new', 'vector': rng.normal(size=8).tolist(), 'payload': {'symbol': 'S3'}}])
+    collection = reopened.get_collection('patterns')
+
+    assert collection.index_schemas == {'symbol': 'keyword'}
+    assert collection.keyword_indexes['symbol']['S3'] == {3, 13, 23, 33, 43, 50}
+
+def test_unsupported_condition_is_rejected(tmp_path):
+    index, rng = filled_index(tmp_path, count=5)
+    query_filter = payload_filter({'symbol': 'S1'})
+    query_filter.must[0] = FieldCondition(key='symbol', values_count={'gt': 1})
+
+    with pytest.raises(ValueError):
+        index.search('patterns', rng.normal(size=8), limit=1, query_filter=query_filter)
+
+def test_read_through_index_forwards_filters_and_indexes(tmp_path):
+    remote = MagicMock()
+    remote.scroll.return_value = ([], None)
+    cached = ReadThroughVectorIndex(LocalVectorIndex(str(tmp_path)), remote)
+    cached.upsert('patterns', [{'id': 'a', 'vector': [1.0, 0.0], 'payload': {'symbol': 'AAPL'}},
+                               {'id': 'b', 'vector': [1.0, 0.1], 'payload': {'symbol': 'MSFT'}}])
+
+    cached.create_payload_index('patterns', 'symbol', PayloadSchemaType.KEYWORD)
+    hits = cached.search('patterns', [1.0, 0.1], limit=2, query_filter=payload_filter({'symbol': 'AAPL'}))
+
+    remote.create_payload_index.assert_called_once_with(collection_name='patterns', field_name='symbol',
+                                                        field_schema=PayloadSchemaType.KEYWORD)
+    assert [hit.id for hit in hits] == ['a']
+
+@pytest.mark.asyncio
+async def test_query_similar_vectors_pushes_filter_down_and_caches_per_filter(tmp_path):
+    database = EnhancedVectorDatabase({'vector_db': {'backend': 'local', 'local_path': str(tmp_path),
+                                                     'write_behind': {'flush_interval': 10},
+                                                     'payload_indexes': {'symbol': 'keyword', 'outcome': 'keyword'}}},
+                                      AsyncMock())
+    await database.initialize()
+    await database.create_collection(2)
+    await database.store_vector(np.array([1.0, 0.0]), {'symbol': 'AAPL', 'timestamp': 1, 'outcome': 'success'})
+    await database.store_vector(np.array([1.0, 0.1]), {'symbol': 'AAPL', 'timestamp': 2})
+    await database.flush()
+    query = np.array([1.0, 0.1])
+
+    unfiltered = await database.query_similar_vectors(query, 1)
+    settled = await database.query_similar_vectors(query, 1, {'outcome': ['success', 'failure']})
+
+    assert database.client.get_collection('market_patterns').index_schemas == {'symbol': 'keyword', 'outcome': 'keyword'}
+    assert unfiltered[0]['metadata']['timestamp'] == 2
+    assert settled[0]['metadata']['outcome'] == 'success'
+    assert database.get_similarity_cache_stats()['entries'] == 2
+    await database.close()
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from ai_analysis.data_preparation import DataPreparation
+from ai_analysis.main_ai_analysis import MainAIAnalysis
+from ai_analysis.prompt_compaction import PromptCompactor, estimate_tokens
+
+@pytest.fixture
+def prepared_data():
+    size = 500
+    close = np.linspace(100, 150, size)
+    market_data = {
+        'timestamp': list(range(size)),
+        'open': close, 'high': close + 1, 'low': close - 1, 'close': close,
+        'volume': np.full(size, 1000.0),
+        'returns': np.append([np.nan], np.diff(close) / close[:-1]),
+    }
+    technical_indicators = {f'SMA_{period}': close for period in range(5, 60, 5)}
+    technical_indicators.update({'RSI': np.full(size, 62.5), 'trend': 'up', 'trend_strength': 0.8})
+    return {'market_data': market_data, 'technical_indicators': technical_indicators,
+            'sentiment_score': 0.2, 'intermarket_data': {}}
+
+def test_summary_is_far_smaller_than_raw_prompt(prepared_data):
+    compacted = PromptCompactor({'token_budget': 400}).compact(prepared_data)
+
+    assert estimate_tokens(compacted['market_data']) + estimate_tokens(compacted['technical_indicators']) <= 400
+    assert estimate_tokens(str(prepared_data['market_data'])) > 20 * estimate_tokens(compacted['market_data'])
+    assert 'regime=uptrend' in compacted['market_data']
+    assert 'close: last=150' in compacted['market_data']
+    assert 'timestamp' not in compacted['market_data']
+    assert 'trend: up' in compacted['technical_indicators']
+    assert compacted['sentiment_score'] == 0.2
+
+def test_tight_budget_keeps_highest_priority_series(prepared_data):
+    compactor = PromptCompactor({'token_budget': 40})
+    compacted = compactor.compact(prepared_data)
+
+    assert 'close: last=150' in compacted['market_data']
+    assert 'q50=' not in compacted['market_data']
+    assert 'SMA_55' not in compacted['technical_indicators']
+    assert compactor.get_stats()['dropped_series'] > 0
+
+def test_infinite_values_are_left_out_of_summaries(prepared_data):
+    prepared_data['market_data']['returns'][-1] = np.inf
+
+    compacted = PromptCompactor({}).compact(prepared_data)
+
+    assert 'nan' not in compacted['market_data']
+    assert 'inf' not in compacted['market_data']
+
+@pytest.mark.asyncio
+async def test_compacted_prompt_shows_raw_prices(prepared_data):
+    recommendation_system = MagicMock()
+    recommendation_system.collect_recommendations = AsyncMock(
+        return_value={'recommendations': {}, 'timed_out': [], 'failed': [], 'hedged': False})
+    analysis = MainAIAnalysis({'prompt_compaction': {'enabled': True}}, DataPreparation({}), recommendation_system,
+                              AsyncMock(), AsyncMock())
+    market_data = {column: prepared_data['market_data'][column] for column in ['open', 'high', 'low', 'close', 'volume']}
+
+    await analysis.analyze(market_data, [], {'technical': prepared_data['technical_indicators']})
+
+    prompt = recommendation_system.collect_recommendations.call_args.args[0]
+    assert 'close: last=150' in prompt['market_data']
+    assert 'regime=uptrend' in prompt['market_data']
+    assert 'nan' not in prompt['market_data']
@@ -0,0 +1,74 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock
+from data.data_fetcher import DataFetcher
+from data.rate_limiter import TokenBucketRateLimiter, PRIORITY_HIGH, PRIORITY_NORMAL
+from data.data_provider_strategy import DataProviderStrategy
+
+class CountingProvider(DataProviderStrategy):
+    def __init__(self):
+        self.fetched_at = []
+
+    async def fetch_data(self, symbol):
+        await self._throttle([symbol])
+        self.fetched_at.append(time.monotonic())
+        return {'symbol': symbol}
+
+@pytest.mark.asyncio
+async def test_requests_are_spaced_to_the_per_minute_quota():
+    provider = CountingProvider()
+    provider.rate_limiter = TokenBucketRateLimiter(max_requests_per_minute=1200)
+
+    await provider.fetch_many(['S1', 'S2', 'S3', 'S4', 'S5', 'S6'], max_concurrency=6)
+
+    gaps = [later - earlier for earlier, later in zip(provider.fetched_at, provider.fetched_at[1:])]
+    assert min(gaps) >= 0.045
+    assert provider.fetched_at[-1] - provider.fetched_at[0] < 0.4
+
+@pytest.mark.asyncio
+async def test_priority_waiters_are_served_first():
+    limiter = TokenBucketRateLimiter(max_requests_per_minute=1200)
+    limiter.set_priority_symbols(['AAPL'])
+    order = []
+
+    async def request(symbol):
+        await limiter.acquire_for([symbol])
+        order.append(symbol)
+
+    await limiter.acquire()
+    tasks = [asyncio.create_task(request(symbol)) for symbol in ['MSFT', 'GOOGL', 'AAPL']]
+    await asyncio.gather(*tasks)
+
+    assert order == ['AAPL', 'MSFT', 'GOOGL']
+    stats = limiter.get_stats()
+    assert stats['queue_depth'] == 0
+    assert stats['priorities']['high']['queued'] == 1
+    assert stats['priorities']['normal']['acquired'] == 3
+    assert stats['priorities']['high']['avg_wait'] < stats['priorities']['normal']['max_wait']
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_consume_a_token():
+    limiter = TokenBucketRateLimiter(max_requests_per_minute=600)
+    await limiter.acquire(PRIORITY_NORMAL)
+
+    cancelled = asyncio.create_task(limiter.acquire(PRIORITY_HIGH))
+    waiting = asyncio.create_task(limiter.acquire(PRIORITY_NORMAL))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    wait = await waiting
+
+    assert wait < 0.15
+    assert limiter.get_stats()['queue_depth'] == 0
+
+@pytest.mark.asyncio
+async def test_fetcher_reads_limits_from_the_stock_data_api_block():
+    data_fetcher = DataFetcher({'stock_data_api': {'provider': 'yahoo_finance', 'batch_size': 25,
+                                                   'max_requests_per_minute': 30, 'rate_limit_burst': 3}}, AsyncMock())
+
+    await data_fetcher.initialize()
+
+    assert data_fetcher.data_provider.batch_size == 25
+    assert data_fetcher.data_provider.rate_limiter is data_fetcher.rate_limiter
+    assert data_fetcher.rate_limiter.capacity == 3
+    await data_fetcher.close()
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock
+from ai_analysis.ai_provider_factory import CachedAIProvider
+from ai_analysis.response_cache import ResponseCache, prompt_key
+
+@pytest.fixture
+def prompt_data():
+    return {
+        'market_data': {'close': np.array([100.0, 101.25, 102.5])},
+        'technical_indicators': {'RSI': 55.123456789},
+        'sentiment_score': 0.3,
+        'intermarket_data': {}
+    }
+
+def test_prompt_key_ignores_noise_below_precision(prompt_data):
+    noisy = dict(prompt_data, technical_indicators={'RSI': 55.123456701})
+    moved = dict(prompt_data, technical_indicators={'RSI': 55.2})
+
+    assert prompt_key('claude', prompt_data) == prompt_key('claude', noisy)
+    assert prompt_key('claude', prompt_data) != prompt_key('claude', moved)
+    assert prompt_key('claude', prompt_data) != prompt_key('azure_openai', prompt_data)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('backend', ['memory', 'disk'])
+async def test_cached_provider_serves_repeated_prompts(backend, tmp_path, prompt_data):
+    cache = ResponseCache({'backend': backend, 'directory': str(tmp_path), 'max_entries': 10})
+    inner = AsyncMock()
+    inner.generate_recommendation.return_value = {'action': 'BUY', 'confidence': 0.7}
+    provider = CachedAIProvider('claude', inner, cache)
+
+    first = await provider.generate_recommendation(prompt_data)
+    second = await provider.generate_recommendation(prompt_data)
+
+    assert first == second == {'action': 'BUY', 'confidence': 0.7}
+    inner.generate_recommendation.assert_called_once()
+    stats = cache.get_stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['hit_rate'] == 0.5
+
+@pytest.mark.parametrize('backend', ['memory', 'disk'])
+def test_entries_expire_and_evict_least_recently_used(backend, tmp_path):
+    cache = ResponseCache({'backend': backend, 'directory': str(tmp_path), 'max_entries': 2, 'ttl': 60})
+    cache.set('a', {'action': 'BUY'}, 1.0)
+    cache.set('b', {'action': 'SELL'}, 1.0)
+    assert cache.get('a') == {'action': 'BUY'}
+    cache.set('c', {'action': 'HOLD'}, 1.0)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == {'action': 'BUY'}
+
+    cache.ttl = 0
+    assert cache.get('c') is None
+    assert cache.get_stats()['expired'] == 1
+    assert cache.get_stats()['saved_latency'] == 2.0
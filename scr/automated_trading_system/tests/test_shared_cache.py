@@ -0,0 +1,134 @@
+import asyncio
+import os
+import uuid
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock
+from benchmarks.fake_redis import FakePubSub, FakeRedis, FakeRedisServer
+from data.shared_cache import SharedMarketDataCache, encode_entry, decode_entry
+from data.stock_data_manager import StockDataManager
+
+@pytest.fixture
+def redis_client_factory():
+    # Set REDIS_URL to run against a local Redis instead of the in-memory fake
+    if os.environ.get('REDIS_URL'):
+        import redis.asyncio as redis
+        return lambda: redis.from_url(os.environ['REDIS_URL'])
+    server = FakeRedisServer()
+    return lambda: FakeRedis(server)
+
+def make_manager(redis_client_factory, key_prefix, config=None):
+    shared_cache = SharedMarketDataCache({'key_prefix': key_prefix}, client=redis_client_factory())
+    config_repository = AsyncMock()
+    config_repository.get_stock_configs.return_value = []
+    return StockDataManager(dict({'cache_ttl': 60}, **(config or {})), AsyncMock(), config_repository,
+                            AsyncMock(), AsyncMock(), shared_cache=shared_cache)
+
+async def wait_for(condition, timeout=5.0):
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.01)
+    await asyncio.wait_for(poll(), timeout)
+
+def test_entries_round_trip_with_binary_bar_arrays():
+    bars = {'timestamp': np.arange(0, 30000, 300, dtype=np.int64)}
+    bars.update({column: np.linspace(100, 110, 100) for column in ['open', 'high', 'low', 'close', 'volume']})
+    entry = {'timestamp': 1700000000.5, 'bars': bars,
+             'data': {'symbol': 'AAPL', 'price': np.float64(110.0), 'timestamp': 29700, 'time_series': bars['close']}}
+
+    payload = encode_entry(entry)
+    decoded = decode_entry(payload)
+
+    assert decoded['timestamp'] == 1700000000.5
+    assert decoded['data']['price'] == 110.0
+    np.testing.assert_array_equal(decoded['data']['time_series'], bars['close'])
+    for column, values in bars.items():
+        np.testing.assert_array_equal(decoded['bars'][column], values)
+    assert decoded['bars']['timestamp'].dtype == np.int64
+    # Seven arrays of 100 values at 8 bytes each, plus a small header
+    assert len(payload) < 7 * 100 * 8 + 400
+
+@pytest.mark.asyncio
+async def test_workers_share_fetches_and_invalidate_on_refresh(redis_client_factory):
+    key_prefix = f"test:{uuid.uuid4().hex}:"
+    first = make_manager(redis_client_factory, key_prefix)
+    second = make_manager(redis_client_factory, key_prefix)
+    snapshot = {'symbol': 'AAPL', 'price': 150.0, 'open': 149.0, 'high': 151.0, 'low': 148.0, 'volume': 1000.0, 'timestamp': 1700000000}
+    first.data_fetcher.fetch_data.return_value = snapshot
+    try:
+        await first.initialize()
+        await second.initialize()
+
+        await first.get_stock_data('AAPL')
+        data = await second.get_stock_data('AAPL')
+
+        second.data_fetcher.fetch_data.assert_not_called()
+        assert data['price'] == 150.0
+        np.testing.assert_array_equal(data['timestamp'], [1700000000])
+        assert second.get_cache_stats()['shared_hits'] == 1
+
+        first.data_fetcher.fetch_data.return_value = dict(snapshot, price=152.0, close=152.0, timestamp=1700000300)
+        await first.update_stock_data('AAPL')
+        await wait_for(lambda: 'AAPL' not in second.stock_data)
+
+        data = await second.get_stock_data('AAPL')
+        second.data_fetcher.fetch_data.assert_not_called()
+        assert data['price'] == 152.0
+        np.testing.assert_array_equal(data['close'], [150.0, 152.0])
+    finally:
+        await first.close()
+        await second.close()
+
+@pytest.mark.asyncio
+async def test_local_tier_evicts_least_recently_used(redis_client_factory):
+    manager = make_manager(redis_client_factory, f"test:{uuid.uuid4().hex}:", {'local_cache_size': 2})
+    manager.data_fetcher.fetch_data.side_effect = lambda symbol: {'symbol': symbol, 'price': 100.0}
+    try:
+        await manager.initialize()
+        await manager.get_stock_data('AAPL')
+        await manager.get_stock_data('MSFT')
+        await manager.get_stock_data('AAPL')
+        await manager.get_stock_data('GOOGL')
+
+        assert list(manager.stock_data) == ['AAPL', 'GOOGL']
+        assert manager.get_cache_stats()['local_evictions'] == 1
+
+        # One-off lookups lose their bars with the snapshot
+        assert not manager.bar_store.has_bars('MSFT')
+
+        # The evicted symbol comes back from the shared tier, not the provider
+        await manager.get_stock_data('MSFT')
+        assert manager.data_fetcher.fetch_data.call_count == 3
+    finally:
+        await manager.close()
+
+class DroppingPubSub(FakePubSub):
+    # Loses its connection the first time it is listened on
+    def __init__(self, server):
+        super().__init__(server)
+        self.dropped = False
+
+    async def listen(self):
+        if not self.dropped:
+            self.dropped = True
+            raise ConnectionError("connection lost")
+        async for message in super().listen():
+            yield message
+
+@pytest.mark.asyncio
+async def test_listener_resubscribes_after_a_dropped_connection():
+    server = FakeRedisServer()
+    client = FakeRedis(server)
+    client.pubsub = lambda: DroppingPubSub(server)
+    cache = SharedMarketDataCache({'resubscribe_delay': 0.01}, client=client)
+    invalidated = []
+    try:
+        await cache.connect(invalidated.append)
+        await wait_for(lambda: cache.get_stats()['resubscribes'] == 1)
+        assert invalidated == [None]
+
+        await FakeRedis(server).publish(cache.channel, "other:AAPL")
+        await wait_for(lambda: invalidated == [None, 'AAPL'])
+        assert cache.get_stats()['errors'] == 1
+    finally:
+        await cache.close()
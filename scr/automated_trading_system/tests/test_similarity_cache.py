@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from data.similarity_cache import SimilarityCache
+from data.vector_database import EnhancedVectorDatabase
+
+def local_database(path):
+    return EnhancedVectorDatabase({'vector_db': {'backend': 'local', 'local_path': str(path),
+                                                 'write_behind': {'flush_interval': 10}}}, AsyncMock())
+
+def test_results_of_a_search_that_raced_a_write_are_not_cached():
+    cache = SimilarityCache({})
+    key = cache.key(np.array([0.5, -0.0]), 5, {'symbol': 'AAPL'})
+    assert key == cache.key(np.array([0.50001, 0.0]), 5, {'symbol': 'AAPL'})
+    assert key != cache.key(np.array([0.5, 0.0]), 5, {'symbol': 'MSFT'})
+
+    generation = cache.generation
+    cache.invalidate()
+    cache.set(key, [{'id': 'a'}], generation)
+    assert cache.get(key) is None
+
+    cache.set(key, [{'id': 'a'}], cache.generation)
+    assert cache.get(key) == [{'id': 'a'}]
+
+@pytest.mark.asyncio
+async def test_repeated_similarity_queries_are_cached_until_points_land(tmp_path):
+    database = local_database(tmp_path)
+    await database.initialize()
+    await database.store_vector(np.array([1.0, 0.0, 0.0, 0.0]), {'symbol': 'AAPL', 'timestamp': 1})
+    await database.flush()
+    database.client.search = MagicMock(wraps=database.client.search)
+
+    first = await database.query_similar_vectors(np.array([0.6, 0.8, 0.0, 0.0]), 2)
+    # Float noise below the quantisation step maps to the same entry
+    second = await database.query_similar_vectors(np.array([0.6 + 1e-9, 0.8, 0.0, 0.0]), 2)
+    assert first == second
+    assert database.client.search.call_count == 1
+    await database.query_similar_vectors(np.array([0.6, 0.8, 0.0, 0.0]), 1)
+    assert database.client.search.call_count == 2
+
+    await database.store_vector(np.array([0.0, 1.0, 0.0, 0.0]), {'symbol': 'MSFT', 'timestamp': 1})
+    await database.flush()
+    results = await database.query_similar_vectors(np.array([0.6, 0.8, 0.0, 0.0]), 2)
+    assert results[0]['id'] == 'MSFT_1_1'
+    assert database.client.search.call_count == 3
+
+    database.similarity_cache.ttl = 0
+    await database.query_similar_vectors(np.array([0.6, 0.8, 0.0, 0.0]), 2)
+    stats = database.get_similarity_cache_stats()
+    assert stats['hits'] == 1
+    assert stats['expired'] == 1
+    assert stats['invalidations'] == 1
+    await database.close()
@@ -1,3 +1,6 @@
+import asyncio
+import time
+import numpy as np
 import pytest
 from unittest.mock import MagicMock, AsyncMock
 from data.stock_data_manager import StockDataManager
@@ -15,9 +18,13 @@ def mock_logging_service():
     return AsyncMock()
 
 @pytest.fixture
-def stock_data_manager(mock_data_fetcher, mock_config_repository, mock_logging_service):
+def mock_vector_db_enhancement():
+    return AsyncMock()
+
+@pytest.fixture
+def stock_data_manager(mock_data_fetcher, mock_config_repository, mock_logging_service, mock_vector_db_enhancement):
     config = {'cache_ttl': 60}
-    return StockDataManager(config, mock_data_fetcher, mock_config_repository, mock_logging_service)
+    return StockDataManager(config, mock_data_fetcher, mock_config_repository, mock_logging_service, mock_vector_db_enhancement)
 
 @pytest.mark.asyncio
 async def test_initialize(stock_data_manager):
@@ -41,10 +48,142 @@ async def test_get_stock_data(stock_data_manager):
 @pytest.mark.asyncio
 async def test_refresh_cache(stock_data_manager):
     stock_data_manager.active_stocks = ['AAPL', 'GOOGL']
-    stock_data_manager.data_fetcher.fetch_data.side_effect = [{'price': 150.0}, {'price': 2800.0}]
+    stock_data_manager.data_fetcher.fetch_many.return_value = {'AAPL': {'price': 150.0}, 'GOOGL': {'price': 2800.0}}
     
     await stock_data_manager.refresh_cache()
     
-    assert stock_data_manager.data_fetcher.fetch_data.call_count == 2
+    stock_data_manager.data_fetcher.fetch_many.assert_called_once_with(['AAPL', 'GOOGL'])
+    stock_data_manager.data_fetcher.fetch_data.assert_not_called()
     assert 'AAPL' in stock_data_manager.stock_data
     assert 'GOOGL' in stock_data_manager.stock_data
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_fetch(stock_data_manager):
+    async def slow_fetch(symbol):
+        await asyncio.sleep(0.01)
+        return {'price': 150.0}
+    stock_data_manager.data_fetcher.fetch_data.side_effect = slow_fetch
+
+    results = await asyncio.gather(*(stock_data_manager.get_stock_data('AAPL') for _ in range(3)),
+                                   stock_data_manager.find_similar_patterns('AAPL'))
+
+    assert results[:3] == [{'price': 150.0}] * 3
+    stock_data_manager.data_fetcher.fetch_data.assert_called_once_with('AAPL')
+    assert stock_data_manager.get_fetch_stats() == {'in_flight': 0, 'fetches': 1, 'coalesced': 3, 'delta_bars': 0}
+
+@pytest.mark.asyncio
+async def test_fetch_failure_reaches_every_waiter(stock_data_manager):
+    async def failing_fetch(symbol):
+        await asyncio.sleep(0.01)
+        raise ValueError("provider down")
+    stock_data_manager.data_fetcher.fetch_data.side_effect = failing_fetch
+
+    results = await asyncio.gather(*(stock_data_manager.get_stock_data('AAPL') for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert stock_data_manager.data_fetcher.fetch_data.call_count == 1
+    assert 'AAPL' not in stock_data_manager.in_flight
+
+@pytest.mark.asyncio
+async def test_stale_data_is_served_while_revalidating(mock_data_fetcher, mock_config_repository, mock_logging_service, mock_vector_db_enhancement):
+    config = {'cache_ttl': 60, 'cache_mode': 'stale_while_revalidate', 'max_staleness': 300, 'symbol_max_staleness': {'GOOGL': 90}}
+    manager = StockDataManager(config, mock_data_fetcher, mock_config_repository, mock_logging_service, mock_vector_db_enhancement)
+    manager.stock_data = {'AAPL': {'data': {'price': 150.0}, 'timestamp': time.time() - 120},
+                          'GOOGL': {'data': {'price': 2800.0}, 'timestamp': time.time() - 120}}
+    mock_data_fetcher.fetch_data.side_effect = lambda symbol: {'price': 155.0 if symbol == 'AAPL' else 2850.0}
+
+    assert await manager.get_stock_data('AAPL') == {'price': 150.0}
+    assert await manager.get_stock_data('GOOGL') == {'price': 2850.0}
+    await asyncio.gather(*manager.revalidations)
+    assert await manager.get_stock_data('AAPL') == {'price': 155.0}
+
+    stats = manager.get_cache_stats()
+    assert stats['served_stale'] == 1
+    assert stats['blocking_fetches'] == 1
+    assert stats['revalidations'] == 1
+    assert stats['max_served_age'] >= 120
+
+@pytest.mark.asyncio
+async def test_close_cancels_pending_revalidations(mock_data_fetcher, mock_config_repository, mock_logging_service, mock_vector_db_enhancement):
+    config = {'cache_ttl': 60, 'cache_mode': 'stale_while_revalidate', 'max_staleness': 300}
+    manager = StockDataManager(config, mock_data_fetcher, mock_config_repository, mock_logging_service, mock_vector_db_enhancement)
+    manager.stock_data = {'AAPL': {'data': {'price': 150.0}, 'timestamp': time.time() - 120}}
+    started = asyncio.Event()
+
+    async def slow_fetch(symbol):
+        started.set()
+        await asyncio.sleep(10)
+
+    mock_data_fetcher.fetch_data.side_effect = slow_fetch
+
+    assert await manager.get_stock_data('AAPL') == {'price': 150.0}
+    pending = list(manager.revalidations)
+    await started.wait()
+    await manager.close()
+
+    assert pending and all(task.cancelled() for task in pending)
+    assert not manager.revalidations
+
+@pytest.mark.asyncio
+async def test_incremental_fetch_requests_bars_after_the_last_stored_one(mock_data_fetcher, mock_config_repository, mock_logging_service, mock_vector_db_enhancement):
+    manager = StockDataManager({'incremental_fetch': True}, mock_data_fetcher, mock_config_repository, mock_logging_service, mock_vector_db_enhancement)
+
+    def bars(timestamps, closes):
+        closes = np.asarray(closes, dtype=np.float64)
+        return {'timestamp': np.asarray(timestamps), 'open': closes, 'high': closes, 'low': closes, 'close': closes, 'volume': closes}
+    mock_data_fetcher.fetch_bars_since.side_effect = [bars([1000, 1300, 1600], [1.0, 2.0, 3.0]), bars([1600, 1900], [3.5, 4.0])]
+
+    await manager.update_stock_data('AAPL')
+    await manager.update_stock_data('AAPL')
+
+    assert [call.args for call in mock_data_fetcher.fetch_bars_since.call_args_list] == [('AAPL', None), ('AAPL', 1600)]
+    np.testing.assert_array_equal(manager.get_market_data('AAPL')['close'], [1.0, 2.0, 3.5, 4.0])
+    assert manager.stock_data['AAPL']['data']['price'] == 4.0
+    assert manager.get_fetch_stats()['delta_bars'] == 5
+    mock_data_fetcher.fetch_data.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_polled_snapshots_serve_their_full_history(stock_data_manager):
+    closes = np.array([1.0, 2.0, 3.0])
+    history = {'timestamp': np.array([1000, 1300, 1600]), 'open': closes, 'high': closes, 'low': closes,
+               'close': closes, 'volume': closes}
+    stock_data_manager.data_fetcher.fetch_data.return_value = {
+        'symbol': 'AAPL', 'price': 3.0, 'volume': 3.0, 'timestamp': 1600, 'open': 3.0, 'high': 3.0, 'low': 3.0,
+        'time_series': closes.tolist(), 'bars': history}
+
+    await stock_data_manager.update_stock_data('AAPL')
+
+    np.testing.assert_array_equal(stock_data_manager.get_market_data('AAPL')['close'], closes)
+    assert 'bars' not in stock_data_manager.stock_data['AAPL']['data']
+
+@pytest.mark.asyncio
+async def test_snapshot_is_served_until_the_bar_store_covers_its_history(stock_data_manager):
+    snapshot = {'symbol': 'AAPL', 'price': 3.0, 'volume': 3.0, 'timestamp': 1600, 'open': 3.0, 'high': 3.0, 'low': 3.0,
+                'time_series': [1.0, 2.0, 3.0]}
+    stock_data_manager.data_fetcher.fetch_data.return_value = snapshot
+
+    await stock_data_manager.update_stock_data('AAPL')
+
+    assert stock_data_manager.get_market_data('AAPL') == snapshot
+
+@pytest.mark.asyncio
+async def test_watchlist_bars_outlive_an_evicted_snapshot(mock_data_fetcher, mock_config_repository, mock_logging_service, mock_vector_db_enhancement):
+    manager = StockDataManager({'local_cache_size': 1}, mock_data_fetcher, mock_config_repository, mock_logging_service, mock_vector_db_enhancement)
+    manager.active_stocks = ['AAPL', 'MSFT']
+    closes = np.array([1.0, 2.0])
+    mock_data_fetcher.fetch_data.side_effect = lambda symbol: {
+        'symbol': symbol, 'price': 2.0, 'volume': 2.0, 'timestamp': 1300, 'open': 2.0, 'high': 2.0, 'low': 2.0,
+        'time_series': closes.tolist(), 'bars': {'timestamp': np.array([1000, 1300]), 'open': closes, 'high': closes,
+                                                 'low': closes, 'close': closes, 'volume': closes}}
+
+    await manager.update_stock_data('AAPL')
+    await manager.update_stock_data('MSFT')
+    await manager.update_stock_data('TSLA')
+
+    assert list(manager.stock_data) == ['TSLA']
+    np.testing.assert_array_equal(manager.get_market_data('AAPL')['close'], closes)
+    assert manager.bar_store.has_bars('MSFT')
+    await manager.update_stock_data('AAPL')
+    assert not manager.bar_store.has_bars('TSLA')
+    with pytest.raises(ValueError):
+        manager.get_market_data('TSLA')
@@ -0,0 +1,122 @@
+import asyncio
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock
+from benchmarks.replay_server import ReplayServer
+from benchmarks.synthetic_data import generate_watchlist, generate_ticks
+from data.data_fetcher import DataFetcher
+from data.stock_data_manager import StockDataManager
+from data.streaming_provider import TickAggregator, StreamingStrategy
+from infrastructure.market_data_subject import MarketDataSubject
+
+async def wait_for(condition, timeout=5.0):
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.01)
+    await asyncio.wait_for(poll(), timeout)
+
+def test_ticks_become_bars_closed_by_the_stream_clock():
+    aggregator = TickAggregator(bar_seconds=60)
+    assert aggregator.add_tick('AAPL', 0, 10.0, 1) == []
+    assert aggregator.add_tick('MSFT', 30, 50.0, 1) == []
+    assert aggregator.add_tick('AAPL', 59, 12.0, 2) == []
+    assert aggregator.add_tick('AAPL', 20, 9.0, 1) == []
+
+    # MSFT has no new ticks but closes once the stream clock passes the end of its bar
+    closed = aggregator.add_tick('AAPL', 60, 11.0, 1)
+    assert closed == [
+        {'symbol': 'AAPL', 'timestamp': 0, 'open': 10.0, 'high': 12.0, 'low': 9.0, 'close': 12.0, 'volume': 4},
+        {'symbol': 'MSFT', 'timestamp': 0, 'open': 50.0, 'high': 50.0, 'low': 50.0, 'close': 50.0, 'volume': 1}
+    ]
+    assert aggregator.add_tick('MSFT', 45, 51.0, 1) == []
+    assert aggregator.late_ticks == 1
+
+@pytest.mark.asyncio
+async def test_streamed_bars_reach_the_stock_data_manager():
+    watchlist = generate_watchlist(2, 6, seed=3)
+    server = ReplayServer(generate_ticks(watchlist))
+    url = await server.start()
+    config_repository = AsyncMock()
+    config_repository.get_stock_configs.return_value = [{'symbol': symbol, 'is_active': True} for symbol in watchlist]
+    data_fetcher = DataFetcher({'data_provider': {'type': 'streaming', 'url': url}}, AsyncMock())
+    manager = StockDataManager({}, data_fetcher, config_repository, AsyncMock(), AsyncMock())
+    try:
+        await manager.initialize()
+        await wait_for(lambda: data_fetcher.data_provider.stats['ticks'] == len(server.ticks))
+
+        for symbol, bars in watchlist.items():
+            # The last bar is still forming when the replay ends
+            stored = manager.get_market_data(symbol)
+            np.testing.assert_array_equal(stored['timestamp'], bars['timestamp'][:-1])
+            np.testing.assert_allclose(stored['high'], bars['high'][:-1])
+            np.testing.assert_allclose(stored['close'], bars['close'][:-1])
+            assert (await data_fetcher.fetch_data(symbol))['price'] == bars['close'][-1]
+        assert data_fetcher.data_provider.get_stats()['bars'] == 10
+    finally:
+        await manager.close()
+        await server.stop()
+
+@pytest.mark.asyncio
+async def test_reconnects_and_resubscribes_without_losing_ticks():
+    watchlist = generate_watchlist(1, 4, seed=5)
+    server = ReplayServer(generate_ticks(watchlist), disconnect_after=5)
+    url = await server.start()
+    bars = []
+
+    class Collector:
+        async def update(self, data):
+            bars.append(data)
+
+    subject = MarketDataSubject()
+    subject.attach(Collector())
+    strategy = StreamingStrategy(url, subject, reconnect_delay=0.01)
+    try:
+        await strategy.subscribe(list(watchlist))
+        await wait_for(lambda: strategy.stats['ticks'] == len(server.ticks))
+
+        assert server.connections == 2
+        assert strategy.stats['connections'] == 2
+        assert [bar['close'] for bar in bars] == list(watchlist['SYM0000']['close'][:-1])
+    finally:
+        await strategy.close()
+        await server.stop()
+
+@pytest.mark.asyncio
+async def test_a_failing_observer_does_not_starve_the_others():
+    bars = []
+
+    class Failing:
+        async def update(self, data):
+            raise RuntimeError('observer down')
+
+    class Collector:
+        async def update(self, data):
+            bars.append(data)
+
+    subject = MarketDataSubject()
+    subject.attach(Failing())
+    subject.attach(Collector())
+    logging_service = AsyncMock()
+    strategy = StreamingStrategy('ws://127.0.0.1:9/stream', subject, bar_seconds=60, logging_service=logging_service)
+    strategy.symbols.add('AAPL')
+
+    await strategy._on_message({'type': 'tick', 'symbol': 'AAPL', 'price': 10.0, 'size': 1, 'timestamp': 0})
+    await strategy._on_message({'type': 'tick', 'symbol': 'AAPL', 'price': 11.0, 'size': 1, 'timestamp': 60})
+
+    assert [bar['close'] for bar in bars] == [10.0]
+    assert strategy.stats['notify_errors'] == 1
+    assert 'observer down' in logging_service.log_error.call_args.args[0]
+
+@pytest.mark.asyncio
+async def test_connection_errors_are_logged_before_reconnecting():
+    logging_service = AsyncMock()
+    strategy = StreamingStrategy('ws://127.0.0.1:9/stream', MarketDataSubject(), reconnect_delay=0.01,
+                                 logging_service=logging_service)
+    try:
+        await strategy.subscribe(['AAPL'])
+        await wait_for(lambda: strategy.stats['connection_errors'] >= 2)
+
+        assert 'Error in streaming connection to ws://127.0.0.1:9/stream' in logging_service.log_error.call_args.args[0]
+        assert strategy.stats['disconnects'] >= 2
+    finally:
+        await strategy.close()
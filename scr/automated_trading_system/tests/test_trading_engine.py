@@ -1,5 +1,6 @@
+import asyncio
 import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from business_logic.trading_engine import TradingEngine
 
 @pytest.fixture
@@ -43,3 +44,70 @@ async def test_run(trading_engine):
         
         assert mock_trading_cycle.call_count == 3
         trading_engine.error_handler.handle_error.assert_called_once()
+
+@pytest.fixture
+def concurrent_trading_engine():
+    dependencies = ['config_repository', 'logging_service', 'main_analysis', 'main_ai_analysis',
+                    'decision_engine', 'smart_order_router', 'stock_data_manager', 'vector_database',
+                    'message_broker', 'risk_management', 'performance_tracker', 'post_trade_analysis']
+    engine = TradingEngine(stock_watchlist=MagicMock(), strategies=[MagicMock()],
+                           **{name: AsyncMock() for name in dependencies})
+    engine.config = {'concurrent_cycle': True, 'max_concurrent_symbols': 2, 'symbol_timeout': 0.2}
+    engine.post_cycle_tasks = AsyncMock()
+    engine.main_analysis.begin_cycle = MagicMock()
+    engine.main_analysis.get_indicator_cache_stats = MagicMock(return_value={})
+    engine.stock_data_manager.set_priority_symbols = MagicMock()
+    engine.stock_data_manager.get_rate_limiter_stats = MagicMock(return_value={})
+    engine.stock_data_manager.get_cache_stats = MagicMock(return_value={})
+    return engine
+
+@pytest.mark.asyncio
+async def test_concurrent_trading_cycle(concurrent_trading_engine):
+    engine = concurrent_trading_engine
+    engine.stock_watchlist.get_active_stocks.return_value = ['AAPL', 'STALL', 'FAIL', 'MSFT', 'GOOGL']
+    in_flight = 0
+    max_in_flight = 0
+
+    async def fake_process_stock(symbol):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        try:
+            await asyncio.sleep(1 if symbol == 'STALL' else 0.01)
+            return symbol != 'FAIL'
+        finally:
+            in_flight -= 1
+
+    engine.process_stock = fake_process_stock
+
+    await engine.trading_cycle()
+
+    stats = engine.get_cycle_stats()
+    assert max_in_flight == 2
+    assert stats['symbols'] == 5
+    assert stats['pool_size'] == 2
+    assert stats['saturated'] == 3
+    assert stats['timed_out'] == 1
+    assert stats['failed'] == 1
+    assert stats['throughput'] > 0
+    engine.post_cycle_tasks.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_cycle_settings_come_from_system_settings(concurrent_trading_engine):
+    engine = concurrent_trading_engine
+    engine.config_repository.get_system_settings.return_value = {
+        'trading_interval': 300, 'max_concurrent_trades': 5, 'concurrent_cycle': True,
+        'max_concurrent_symbols': 3, 'symbol_timeout': None, 'batch_analysis': True}
+    engine.stock_watchlist.initialize = AsyncMock()
+    engine.stock_data_manager.get_stock_data.return_value = {'close': [1.0]}
+    engine.stock_watchlist.get_active_stocks.return_value = ['AAPL', 'MSFT']
+    engine.process_stock = AsyncMock(return_value=True)
+
+    await engine.initialize()
+    await engine.trading_cycle()
+
+    stats = engine.get_cycle_stats()
+    assert stats['pool_size'] == 3
+    assert stats['timed_out'] == 0
+    assert engine.process_stock.await_count == 2
+    engine.main_analysis.analyze_batch.assert_awaited_once_with({'AAPL': {'close': [1.0]}, 'MSFT': {'close': [1.0]}})
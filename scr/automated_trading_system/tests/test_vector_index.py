@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from qdrant_client.http.models import CountResult, Record
+from data.vector_database import EnhancedVectorDatabase
+from data.vector_index import LocalVectorIndex, ReadThroughVectorIndex, payload_filter
+
+def local_database(path):
+    return EnhancedVectorDatabase({'vector_db': {'backend': 'local', 'local_path': str(path),
+                                                 'write_behind': {'flush_interval': 10}}}, AsyncMock())
+
+def test_search_matches_brute_force_cosine_similarity(tmp_path):
+    rng = np.random.default_rng(7)
+    vectors = rng.normal(size=(500, 10))
+    index = LocalVectorIndex(str(tmp_path))
+    index.upsert('patterns', [{'id': f"p{row}", 'vector': vector.tolist(), 'payload': {'row': row}}
+                              for row, vector in enumerate(vectors)])
+    query = rng.normal(size=10)
+
+    hits = index.search('patterns', query, limit=5)
+
+    similarity = vectors @ query / (np.linalg.norm(vectors, axis=1) * np.linalg.norm(query))
+    expected = np.argsort(-similarity)[:5]
+    assert [hit.payload['row'] for hit in hits] == expected.tolist()
+    np.testing.assert_allclose([hit.score for hit in hits], similarity[expected], rtol=1e-5)
+
+@pytest.mark.asyncio
+async def test_local_backend_persists_across_restarts(tmp_path):
+    database = local_database(tmp_path)
+    await database.initialize()
+    await database.create_collection(4)
+    await database.store_vector(np.array([1.0, 0.0, 0.0, 0.0]), {'symbol': 'AAPL', 'timestamp': 1})
+    await database.store_vector(np.array([0.0, 1.0, 0.0, 0.0]), {'symbol': 'MSFT', 'timestamp': 1})
+    await database.flush()
+    await database.update_metadata('AAPL_1_1', {'outcome': 'win'})
+    await database.close()
+
+    reopened = local_database(tmp_path)
+    await reopened.initialize()
+    results = await reopened.query_similar_vectors(np.array([0.9, 0.1, 0.0, 0.0]), 1)
+
+    assert results[0]['id'] == 'AAPL_1_1'
+    assert results[0]['metadata']['outcome'] == 'win'
+    assert isinstance(reopened.client.collections['market_patterns'].vectors, np.memmap)
+    await reopened.store_vector(np.array([0.0, 0.0, 1.0, 0.0]), {'symbol': 'GOOGL', 'timestamp': 2})
+    await reopened.close()
+    assert LocalVectorIndex(str(tmp_path)).get_collection('market_patterns').count == 3
+
+def test_read_through_index_warms_from_qdrant_once(tmp_path):
+    remote = MagicMock()
+    remote.scroll.side_effect = [
+        ([Record(id='a', vector=[1.0, 0.0], payload={'symbol': 'AAPL'})], 'next'),
+        ([Record(id='b', vector=[0.0, 1.0], payload={'symbol': 'MSFT'})], None)
+    ]
+    index = ReadThroughVectorIndex(LocalVectorIndex(str(tmp_path)), remote)
+
+    assert index.search('patterns', [0.0, 2.0], limit=1)[0].id == 'b'
+    index.upsert('patterns', [{'id': 'c', 'vector': [1.0, 1.0], 'payload': {}}])
+    assert index.search('patterns', [1.0, 0.9], limit=1)[0].id == 'c'
+
+    assert remote.scroll.call_count == 2
+    remote.upsert.assert_called_once()
+    remote.search.assert_not_called()
+    assert index.get_stats()['warmed_points'] == 2
+
+def persisted_copy(path):
+    remote = MagicMock()
+    remote.scroll.return_value = ([Record(id='a', vector=[1.0, 0.0], payload={'outcome': None})], None)
+    index = ReadThroughVectorIndex(LocalVectorIndex(str(path)), remote)
+    index.create_payload_index('patterns', 'outcome')
+    index.close()
+
+def reopen(path, count, **kwargs):
+    remote = MagicMock()
+    remote.count.return_value = CountResult(count=count)
+    remote.scroll.return_value = ([Record(id='a', vector=[1.0, 0.0], payload={'outcome': 'win'}),
+                                   Record(id='b', vector=[0.0, 1.0], payload={'outcome': 'loss'})], None)
+    return ReadThroughVectorIndex(LocalVectorIndex(str(path)), remote, **kwargs), remote
+
+def test_persisted_copy_is_reused_while_current(tmp_path):
+    persisted_copy(tmp_path)
+    index, remote = reopen(tmp_path, count=1)
+
+    assert [hit.id for hit in index.search('patterns', [0.0, 1.0], limit=2)] == ['a']
+    remote.scroll.assert_not_called()
+    assert index.get_stats()['resyncs'] == 0
+
+@pytest.mark.parametrize('count, elapsed', [(2, 0), (1, 7200)])
+def test_persisted_copy_is_resynced_when_counts_differ_or_ttl_expires(tmp_path, count, elapsed):
+    persisted_copy(tmp_path)
+    index, remote = reopen(tmp_path, count=count)
+
+    with patch('data.vector_index.time.time', return_value=LocalVectorIndex(str(tmp_path)).get_synced_at('patterns') + elapsed):
+        hits = index.search('patterns', [0.0, 1.0], limit=2, query_filter=payload_filter({'outcome': ['win', 'loss']}))
+
+    assert [hit.id for hit in hits] == ['b', 'a']
+    assert index.local.get_collection('patterns').index_schemas == {'outcome': 'keyword'}
+    assert index.get_stats()['resyncs'] == 1
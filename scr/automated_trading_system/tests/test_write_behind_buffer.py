@@ -0,0 +1,81 @@
+import asyncio
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from data.vector_database import EnhancedVectorDatabase
+from infrastructure.write_behind_buffer import WriteBehindBuffer
+
+@pytest.mark.asyncio
+async def test_flushes_full_batches_and_the_remainder_on_interval():
+    batches = []
+    async def flush(batch):
+        batches.append(batch)
+    buffer = WriteBehindBuffer(flush, batch_size=3, flush_interval=0.05)
+
+    for item in range(4):
+        await buffer.add(item)
+    await asyncio.sleep(0.01)
+    assert batches == [[0, 1, 2]]
+
+    await asyncio.sleep(0.1)
+    assert batches == [[0, 1, 2], [3]]
+    assert buffer.get_stats()['avg_batch_size'] == 2.0
+    await buffer.close()
+
+@pytest.mark.asyncio
+async def test_writers_wait_while_the_backend_is_behind():
+    release = asyncio.Event()
+    batches = []
+    async def flush(batch):
+        await release.wait()
+        batches.append(batch)
+    buffer = WriteBehindBuffer(flush, batch_size=2, flush_interval=10, max_pending=4)
+
+    for item in range(4):
+        await buffer.add(item)
+    blocked = asyncio.create_task(buffer.add(4))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+    assert buffer.pending() == 4
+
+    release.set()
+    await asyncio.wait_for(blocked, 1)
+    await buffer.close()
+    assert batches == [[0, 1], [2, 3], [4]]
+    assert buffer.get_stats()['backpressure_waits'] >= 1
+
+@pytest.mark.asyncio
+async def test_failed_batches_are_retried_then_dropped():
+    calls = []
+    async def flush(batch):
+        calls.append(batch)
+        if batch[0] == 'bad':
+            raise ConnectionError("qdrant unavailable")
+    buffer = WriteBehindBuffer(flush, batch_size=1, flush_interval=10, max_retries=2)
+    await buffer.add('bad')
+    await buffer.add('good')
+
+    with pytest.raises(RuntimeError, match="1 writes dropped"):
+        await buffer.close()
+
+    assert calls == [['bad'], ['bad'], ['bad'], ['good']]
+    stats = buffer.get_stats()
+    assert stats['dropped'] == 1
+    assert stats['flushed'] == 1
+    with pytest.raises(RuntimeError):
+        await buffer.add('late')
+
+@pytest.mark.asyncio
+async def test_vector_database_batches_upserts_and_flushes_on_close():
+    database = EnhancedVectorDatabase({'vector_db': {'write_behind': {'batch_size': 10, 'flush_interval': 10}}}, AsyncMock())
+    database.client = MagicMock()
+
+    for timestamp in range(25):
+        await database.store_vector(np.ones(4), {'symbol': 'AAPL', 'timestamp': timestamp})
+    await asyncio.sleep(0.01)
+    assert [len(call.kwargs['points']) for call in database.client.upsert.call_args_list] == [10, 10]
+
+    await database.close()
+    assert [len(call.kwargs['points']) for call in database.client.upsert.call_args_list] == [10, 10, 5]
+    assert database.client.upsert.call_args_list[2].kwargs['points'][-1]['id'] == 'AAPL_24_1'
+    database.client.close.assert_called_once()